@@ -1,16 +1,71 @@
-from flask import Flask, render_template, request, redirect, jsonify, send_from_directory
-from openpyxl import Workbook, load_workbook
+import time
+# Mốc bắt đầu import để đo cả thời gian nạp thư viện trong báo cáo khởi động
+_import_started = time.perf_counter()
+from flask import Flask, Response, render_template, request, redirect, jsonify, send_file, send_from_directory, stream_with_context
 import os
 from datetime import datetime, timedelta
 import base64
-from werkzeug.utils import secure_filename
-import time
-from learning_path_ai import LearningPathAI
-from generate_training_data import generate_training_data
+from learning_path_ai import CONTENT_TABLES, LearningPathAI
+from catalog_store import CatalogStore
+from storage import TABLES, create_backend
+from user_directory import UserDirectory
+from retrain_worker import RetrainWorker
+from online_model import OutcomeBuffer
+from plan_store import PlanStore, ProgressTracker
+from question_bank import QuestionBank
+from avatar_store import AvatarStore, AvatarTooLarge
+from plan_format import COMPACT_FORMAT, COMPACT_FORMAT_VERSION, PlanCompactor, compact_learning_path
+from logging_config import setup_logging
 import pandas as pd
+import threading
+import logging
+import json
+
+# Cấp độ và định dạng log lấy từ LOG_LEVEL / LOG_FORMAT (mặc định INFO, dạng text)
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Ngân sách thời gian khởi động (ms); vượt quá thì ghi cảnh báo
+STARTUP_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', '2000'))
+# Cách tải mô hình: 'background' (luồng nền, mặc định), 'lazy' (ở request đầu tiên cần dự đoán)
+# hoặc 'eager' (tải xong mới nhận request)
+MODEL_LOADING = os.environ.get('MODEL_LOADING', 'background').lower()
+# File đánh dấu dữ liệu mẫu đã được thêm, để không thêm lại ở mỗi lần khởi động
+SAMPLE_DATA_MARKER = os.environ.get('SAMPLE_DATA_MARKER', 'sample_data.seeded')
+# Huấn luyện lại ở luồng nền: kiểm tra dữ liệu huấn luyện mỗi RETRAIN_INTERVAL giây (0 = chỉ khi được yêu cầu)
+RETRAIN_INTERVAL = float(os.environ.get('RETRAIN_INTERVAL', '0'))
+RETRAIN_DATA_PATH = os.environ.get('RETRAIN_DATA_PATH', 'training_data.csv')
+RETRAIN_MIN_R2 = float(os.environ.get('RETRAIN_MIN_R2', '0'))
+# Số kết quả thực tế gom lại trước mỗi lần cập nhật mô hình học tăng dần (MODEL_ESTIMATOR=sgd)
+ONLINE_BATCH_SIZE = int(os.environ.get('ONLINE_BATCH_SIZE', '32'))
+# Số lộ trình đã lưu giữ các ngày học trong bộ nhớ (dùng gần nhất), các lộ trình khác đọc lại từ lưu trữ
+PLAN_STORE_CACHE_SIZE = int(os.environ.get('PLAN_STORE_CACHE_SIZE', '256'))
+# Tiến độ học tập được gom trong bộ nhớ và ghi xuống daily_plans mỗi PROGRESS_FLUSH_INTERVAL giây
+# (hoặc ngay khi có PROGRESS_MAX_PENDING ngày đang chờ)
+PROGRESS_FLUSH_INTERVAL = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', '5'))
+PROGRESS_MAX_PENDING = int(os.environ.get('PROGRESS_MAX_PENDING', '5000'))
+# Số sự kiện tiến độ tối đa trong một request
+MAX_PROGRESS_EVENTS = 1000
+# Ảnh đại diện: thư mục lưu theo sha256 nội dung, dung lượng tối đa (KB) và cạnh ảnh thu nhỏ (px)
+AVATAR_DIR = os.environ.get('AVATAR_DIR', 'static/avatars')
+AVATAR_MAX_KB = int(os.environ.get('AVATAR_MAX_KB', '2048'))
+AVATAR_THUMB_SIZE = int(os.environ.get('AVATAR_THUMB_SIZE', '128'))
+# Kích thước tối đa của body một request (KB), mặc định đủ cho ảnh đại diện và các trường của form
+MAX_REQUEST_KB = int(os.environ.get('MAX_REQUEST_KB', str(AVATAR_MAX_KB + 512)))
+
+# (giai đoạn, thời gian ms) của quá trình khởi động
+startup_phases = [('imports', (time.perf_counter() - _import_started) * 1000)]
+
+def _timed(phase, func, *args):
+    """Chạy một bước khởi động và ghi lại thời gian của nó"""
+    started = time.perf_counter()
+    result = func(*args)
+    startup_phases.append((phase, (time.perf_counter() - started) * 1000))
+    return result
 
 app = Flask(__name__)
-ai = LearningPathAI()
+# Werkzeug từ chối body lớn hơn mức này (413) trước khi đọc form vào bộ nhớ hoặc file tạm
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_KB * 1024
 
 # Excel file constants
 USERS_EXCEL = "users.xlsx"
@@ -22,7 +77,48 @@ TOPIC_EXCEL = "topic.xlsx"
 THEORY_EXCEL = "theory.xlsx"
 PRACTICE_EXCEL = "practice.xlsx"
 
+# Backend lưu trữ (Excel mặc định, SQLite khi đặt STORAGE_BACKEND=sqlite)
+db = _timed('storage', create_backend)
+
+# Nội dung học tập được đọc qua backend (kể cả các thay đổi còn trong nhật ký)
+ai = _timed('content', LearningPathAI, None, db)
+
+# Kho danh mục trong bộ nhớ, mỗi bảng chỉ được đọc một lần cho cả tiến trình
+catalog = CatalogStore(db)
+
+def _on_catalog_change(table):
+    """Dựng lại chỉ mục nội dung từ kho danh mục rồi bỏ các lộ trình đã lưu trong bộ nhớ đệm"""
+    if table is None or table in CONTENT_TABLES:
+        ai.load_content(catalog.get_all)
+    ai.plan_cache.clear()
+
+catalog.add_listener(_on_catalog_change)
+
+# Danh bạ người dùng có chỉ mục theo email
+users = UserDirectory(db)
+
+# Lộ trình đã tạo được lưu ở server (bảng learning_path và daily_plans)
+plans = PlanStore(db, max_cached_paths=PLAN_STORE_CACHE_SIZE)
+progress = ProgressTracker(plans, interval=PROGRESS_FLUSH_INTERVAL, max_pending=PROGRESS_MAX_PENDING)
+progress.start()
+
+# Khóa dùng khi sinh ID mới để hai request không nhận cùng một ID
+_id_lock = threading.Lock()
+
+# Số hồ sơ tối đa trong một request dự đoán theo lô
+MAX_BATCH_PROFILES = 1000
+# Ngân hàng câu hỏi đánh giá, đọc một lần khi khởi động
+question_bank = _timed('question_bank', QuestionBank, os.environ.get('QUESTION_BANK_PATH', 'question_bank.json'))
+# Số câu hỏi mặc định/tối đa của một bài đánh giá và số bài nộp tối đa trong một request chấm điểm
+QUIZ_DEFAULT_QUESTIONS = 5
+QUIZ_MAX_QUESTIONS = 50
+MAX_QUIZ_SUBMISSIONS = 1000
+
+# Ảnh tải lên trước đây (static/uploads/<thời gian>_<tên>) vẫn được phục vụ như file tĩnh
 UPLOAD_FOLDER = 'static/uploads'
+avatars = AvatarStore(AVATAR_DIR, max_bytes=AVATAR_MAX_KB * 1024, thumb_size=AVATAR_THUMB_SIZE)
+# Ảnh theo nội dung không bao giờ đổi nên trình duyệt được giữ lâu
+AVATAR_CACHE_CONTROL = 'public, max-age=31536000, immutable'
 DEFAULT_AVATAR = 'static/default-avatar.svg'
 
 # Tạo thư mục uploads nếu chưa tồn tại
@@ -42,209 +138,29 @@ if not os.path.exists(DEFAULT_AVATAR):
     with open(DEFAULT_AVATAR, 'w') as f:
         f.write(svg_content)
 
-def init_all_excel_files():
-    """Khởi tạo tất cả các file Excel cần thiết"""
-    excel_files = {
-        USERS_EXCEL: {
-            'sheet_name': 'Users',
-            'headers': ['student_id', 'full_name', 'email', 'password', 'dob', 'join_date', 'image_url']
-        },
-        LEARNING_PATH_EXCEL: {
-            'sheet_name': 'LearningPaths',
-            'headers': ['path_id', 'user_id', 'subject', 'current_score', 'target_score', 
-                       'duration_weeks', 'daily_study_hours', 'learning_style', 
-                       'success_rate', 'start_date', 'end_date', 'status']
-        },
-        DAILY_PLANS_EXCEL: {
-            'sheet_name': 'DailyPlans',
-            'headers': ['plan_id', 'path_id', 'date', 'theory_topics', 'practice_exercises',
-                       'theory_hours', 'practice_hours', 'learning_resources', 'completed']
-        },
-        GRADE_EXCEL: {
-            'sheet_name': 'Grades',
-            'headers': ['ID_grade', 'Name_grade']
-        },
-        SUBJECT_EXCEL: {
-            'sheet_name': 'Subjects',
-            'headers': ['ID_subject', 'name_subject', 'ID_grade']
-        },
-        TOPIC_EXCEL: {
-            'sheet_name': 'Topics',
-            'headers': ['ID_topic', 'topic_name', 'ID_subject', 'ID_grade']
-        },
-        THEORY_EXCEL: {
-            'sheet_name': 'Theory',
-            'headers': ['ID_theory', 'theory_name', 'ID_topic', 'ID_subject', 'ID_grade',
-                       'level', 'URL', 'completion_time']
-        },
-        PRACTICE_EXCEL: {
-            'sheet_name': 'Practice',
-            'headers': ['ID_practice', 'practice_name', 'ID_topic', 'ID_subject', 'ID_grade',
-                       'level', 'ID_theory']
-        }
-    }
-
-    for file_name, config in excel_files.items():
-        try:
-            if not os.path.exists(file_name):
-                wb = Workbook()
-                ws = wb.active
-                ws.title = config['sheet_name']
-                ws.append(config['headers'])
-                wb.save(file_name)
-                print(f"Đã tạo file Excel mới: {file_name}")
-            else:
-                # Kiểm tra xem file có phải là file Excel hợp lệ không
-                try:
-                    wb = load_workbook(file_name)
-                    print(f"File Excel đã tồn tại và hợp lệ: {file_name}")
-                except Exception as e:
-                    print(f"File Excel không hợp lệ, đang tạo lại: {e}")
-                    os.remove(file_name)
-                    wb = Workbook()
-                    ws = wb.active
-                    ws.title = config['sheet_name']
-                    ws.append(config['headers'])
-                    wb.save(file_name)
-                    print(f"Đã tạo lại file Excel: {file_name}")
-        except Exception as e:
-            print(f"Lỗi khi khởi tạo Excel {file_name}: {e}")
-            raise
-
-# Gọi hàm khởi tạo Excel khi khởi động ứng dụng
-init_all_excel_files()
-
-# Kiểm tra xem mô hình đã được huấn luyện chưa
-print("\nKiểm tra và khởi tạo mô hình AI...")
-if os.path.exists('learning_path_model.joblib'):
-    try:
-        print("Tìm thấy file mô hình, đang tải...")
-        ai.load_model()
-        if not ai.is_trained:
-            print("Mô hình chưa được huấn luyện, đang huấn luyện lại...")
-            # Tạo và lưu dữ liệu training mới
-            training_file = generate_training_data()
-            print(f"Đã tạo dữ liệu training mới: {training_file}")
-            # Đổi tên file mới nhất thành training_data.csv
-            if training_file != 'training_data.csv':
-                if os.path.exists('training_data.csv'):
-                    os.remove('training_data.csv')
-                os.rename(training_file, 'training_data.csv')
-            ai.train()
-    except Exception as e:
-        print(f"Lỗi khi tải mô hình: {e}")
-        print("Đang tạo mô hình mới...")
-        # Tạo và lưu dữ liệu training mới
-        training_file = generate_training_data()
-        print(f"Đã tạo dữ liệu training mới: {training_file}")
-        # Đổi tên file mới nhất thành training_data.csv
-        if training_file != 'training_data.csv':
-            if os.path.exists('training_data.csv'):
-                os.remove('training_data.csv')
-            os.rename(training_file, 'training_data.csv')
-        ai.train()
-else:
-    print("Không tìm thấy file mô hình, đang tạo mới...")
-    # Tạo và lưu dữ liệu training mới
-    training_file = generate_training_data()
-    print(f"Đã tạo dữ liệu training mới: {training_file}")
-    # Đổi tên file mới nhất thành training_data.csv
-    if training_file != 'training_data.csv':
-        if os.path.exists('training_data.csv'):
-            os.remove('training_data.csv')
-        os.rename(training_file, 'training_data.csv')
-    ai.train()
-
-print("Khởi tạo mô hình AI hoàn tất!")
-
-# ✅ Khởi tạo file Excel nếu chưa tồn tại
-def init_excel():
-    try:
-        if not os.path.exists(USERS_EXCEL):
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Users"
-            # Thêm header
-            headers = ['student_id', 'full_name', 'email', 'password', 'dob', 'join_date', 'image_url']
-            ws.append(headers)
-            wb.save(USERS_EXCEL)
-            print(f"Đã tạo file Excel mới: {USERS_EXCEL}")
-        else:
-            # Kiểm tra xem file có phải là file Excel hợp lệ không
-            try:
-                wb = load_workbook(USERS_EXCEL)
-                print(f"File Excel đã tồn tại và hợp lệ: {USERS_EXCEL}")
-            except Exception as e:
-                print(f"File Excel không hợp lệ, đang tạo lại: {e}")
-                os.remove(USERS_EXCEL)
-                wb = Workbook()
-                ws = wb.active
-                ws.title = "Users"
-                headers = ['student_id', 'full_name', 'email', 'password', 'dob', 'join_date', 'image_url']
-                ws.append(headers)
-                wb.save(USERS_EXCEL)
-                print(f"Đã tạo lại file Excel: {USERS_EXCEL}")
-    except Exception as e:
-        print(f"Lỗi khi khởi tạo Excel: {e}")
-        raise
-
-# ✅ Đọc người dùng từ Excel
-def read_excel():
-    try:
-        wb = load_workbook(USERS_EXCEL)
-        ws = wb.active
-        users = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0]:  # Kiểm tra nếu có dữ liệu
-                users.append({
-                    'student_id': row[0],
-                    'full_name': row[1],
-                    'email': row[2],
-                    'password': row[3],
-                    'dob': row[4],
-                    'join_date': row[5],
-                    'image_url': row[6]
-                })
-        return users
-    except Exception as e:
-        print(f"Lỗi khi đọc file Excel: {e}")
-        return []
-
 # ✅ Thêm người dùng mới
 def add_user(name, dob, email, password):
     try:
-        wb = load_workbook(USERS_EXCEL)
-        ws = wb.active
-        student_id = generate_student_id()
-        join_date = datetime.now().strftime('%Y-%m-%d')
-        ws.append([student_id, name, email, password, dob, join_date, None])
-        wb.save(USERS_EXCEL)
-        print(f"Đã thêm người dùng mới: {email}")
+        user = users.add_user(name, dob, email, password)
+        logger.info("Đã thêm người dùng mới: %s", email)
+        return user
     except Exception as e:
-        print(f"Lỗi khi thêm người dùng: {e}")
+        logger.error("Lỗi khi thêm người dùng: %s", e)
         raise
 
-# ✅ Tạo mã học sinh mới
-def generate_student_id():
-    users = read_excel()
-    if not users:
-        return 'HS0001'
-    last_id = max(user['student_id'] for user in users)
-    num = int(last_id[2:]) + 1
-    return f'HS{num:04d}'
-
 # ✅ API đăng ký
 @app.route("/api/register", methods=["POST"])
 def register_user():
     try:
         data = request.get_json()
-        users = read_excel()
-        if any(user["email"] == data["email"] for user in users):
+        if users.exists(data["email"]):
             return jsonify({"success": False, "message": "Email đã tồn tại."}), 400
         add_user(data["name"], data["dob"], data["email"], data["password"])
         return jsonify({"success": True})
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
-        print(f"Lỗi khi đăng ký: {e}")
+        logger.error("Lỗi khi đăng ký: %s", e)
         return jsonify({"success": False, "message": "Có lỗi xảy ra khi đăng ký."}), 500
 
 # ✅ API đăng nhập
@@ -252,13 +168,12 @@ def register_user():
 def do_login():
     try:
         data = request.get_json()
-        users = read_excel()
-        for user in users:
-            if user["email"] == data["email"] and user["password"] == data["password"]:
-                return jsonify({"success": True})
+        user = users.get_by_email(data["email"])
+        if user and user["password"] == data["password"]:
+            return jsonify({"success": True})
         return jsonify({"success": False, "message": "Sai email hoặc mật khẩu."}), 401
     except Exception as e:
-        print(f"Lỗi khi đăng nhập: {e}")
+        logger.error("Lỗi khi đăng nhập: %s", e)
         return jsonify({"success": False, "message": "Có lỗi xảy ra khi đăng nhập."}), 500
 
 # ✅ API lấy thông tin hồ sơ
@@ -286,9 +201,8 @@ def get_profile():
                 }
             })
 
-        users = read_excel()
-        user = next((u for u in users if u["email"] == email), None)
-        
+        user = users.get_by_email(email)
+
         if not user:
             return jsonify({"success": False, "message": "Không tìm thấy thông tin người dùng"}), 404
         
@@ -315,6 +229,13 @@ def get_profile():
 @app.route('/api/update-profile', methods=['POST'])
 def update_profile():
     try:
+        # Từ chối request quá lớn trước khi đọc form (phần dư cho các trường văn bản); body không có
+        # Content-Length (chunked) không kiểm tra trước được nên cũng bị từ chối
+        if request.content_length is None and request.headers.get('Transfer-Encoding'):
+            return jsonify({'success': False, 'message': 'Cần header Content-Length'}), 411
+        if request.content_length and request.content_length > avatars.max_bytes + 64 * 1024:
+            return jsonify({'success': False, 'message': f'Ảnh vượt quá {AVATAR_MAX_KB} KB'}), 413
+
         # Lấy dữ liệu từ form
         full_name = request.form.get('full_name')
         email = request.form.get('email')
@@ -324,51 +245,43 @@ def update_profile():
         if not email:
             return jsonify({'success': False, 'message': 'Email không được để trống'})
 
-        # Đọc dữ liệu từ Excel
-        wb = load_workbook(USERS_EXCEL)
-        ws = wb.active
-        
         # Tìm người dùng theo email
-        user_found = False
-        for row in ws.iter_rows(min_row=2):
-            if row[2].value == email:  # Email ở cột thứ 3
-                user_found = True
-                # Cập nhật thông tin
-                row[1].value = full_name  # Tên ở cột thứ 2
-                
-                # Xử lý upload ảnh nếu có
-                if 'image' in request.files:
-                    image = request.files['image']
-                    if image and image.filename:
-                        # Tạo tên file an toàn
-                        filename = secure_filename(image.filename)
-                        # Thêm timestamp để tránh trùng tên
-                        filename = f"{int(time.time())}_{filename}"
-                        # Lưu file
-                        image_path = os.path.join('static/uploads', filename)
-                        image.save(image_path)
-                        # Cập nhật đường dẫn ảnh trong Excel
-                        row[6].value = f'/static/uploads/{filename}'  # Image URL ở cột thứ 7
-                
-                # Lưu lại vào Excel
-                wb.save(USERS_EXCEL)
-                
-                return jsonify({
-                    'success': True,
-                    'message': 'Cập nhật hồ sơ thành công',
-                    'profile': {
-                        'full_name': full_name,
-                        'email': email,
-                        'student_id': student_id,
-                        'image_url': row[6].value or '/static/default-avatar.svg'
-                    }
-                })
-        
-        if not user_found:
+        user = users.get_by_email(email)
+        if not user:
             return jsonify({'success': False, 'message': 'Không tìm thấy người dùng'})
-        
+
+        # Cập nhật thông tin
+        changes = {'full_name': full_name}
+        image_url = user['image_url']
+
+        # Xử lý upload ảnh nếu có: lưu theo nội dung (ảnh trùng chỉ lưu một lần), hiển thị ảnh thu nhỏ
+        if 'image' in request.files:
+            image = request.files['image']
+            if image and image.filename:
+                try:
+                    key = avatars.save(image.stream)
+                except AvatarTooLarge as e:
+                    return jsonify({'success': False, 'message': str(e)}), 413
+                except ValueError as e:
+                    return jsonify({'success': False, 'message': str(e)}), 400
+                image_url = f'/avatars/thumb/{key}'
+                changes['image_url'] = image_url
+
+        users.update_user(email, changes)
+
+        return jsonify({
+            'success': True,
+            'message': 'Cập nhật hồ sơ thành công',
+            'profile': {
+                'full_name': full_name,
+                'email': email,
+                'student_id': student_id,
+                'image_url': image_url or '/static/default-avatar.svg'
+            }
+        })
+
     except Exception as e:
-        print(f"Error updating profile: {str(e)}")
+        logger.error("Error updating profile: %s", e)
         return jsonify({'success': False, 'message': 'Có lỗi xảy ra khi cập nhật hồ sơ'})
 
 # ✅ API đổi mật khẩu
@@ -383,21 +296,16 @@ def change_password():
         if not all([email, current_password, new_password]):
             return jsonify({"success": False, "message": "Vui lòng điền đầy đủ thông tin"}), 400
 
-        wb = load_workbook(USERS_EXCEL)
-        ws = wb.active
-        
-        # Tìm dòng chứa email và kiểm tra mật khẩu hiện tại
-        for row in ws.iter_rows(min_row=2):
-            if row[2].value == email:  # Email ở cột thứ 3
-                if row[3].value != current_password:  # Password ở cột thứ 4
-                    return jsonify({"success": False, "message": "Mật khẩu hiện tại không đúng"}), 400
-                
-                # Cập nhật mật khẩu mới
-                row[3].value = new_password
-                wb.save(USERS_EXCEL)
-                return jsonify({"success": True, "message": "Đổi mật khẩu thành công"}), 200
-        
-        return jsonify({"success": False, "message": "Không tìm thấy thông tin người dùng"}), 404
+        # Tìm người dùng theo email và kiểm tra mật khẩu hiện tại
+        user = users.get_by_email(email)
+        if not user:
+            return jsonify({"success": False, "message": "Không tìm thấy thông tin người dùng"}), 404
+        if user['password'] != current_password:
+            return jsonify({"success": False, "message": "Mật khẩu hiện tại không đúng"}), 400
+
+        # Cập nhật mật khẩu mới
+        users.update_user(email, {'password': new_password})
+        return jsonify({"success": True, "message": "Đổi mật khẩu thành công"}), 200
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
@@ -424,19 +332,14 @@ def dashboard():
 @app.route('/api/generate-study-plan', methods=['POST'])
 def generate_study_plan():
     try:
-        print("\n[DEBUG] ====== Bắt đầu xử lý request generate-study-plan ======")
-        
         # Lấy dữ liệu từ request
         data = request.get_json()
-        print("[DEBUG] Received data:", data)
+        logger.debug("generate-study-plan nhận dữ liệu: %s", data)
         
         # Kiểm tra dữ liệu đầu vào
         required_fields = ['subject', 'grade', 'current_score', 'target_score', 
                          'duration_weeks', 'daily_study_hours', 'learning_style']
         
-        # In ra kiểu dữ liệu của các trường
-        print("[DEBUG] Data types:", {k: type(v).__name__ for k, v in data.items()})
-        
         # Kiểm tra các trường bắt buộc
         for field in required_fields:
             if field not in data:
@@ -450,12 +353,6 @@ def generate_study_plan():
             target_score = float(data['target_score'])
             duration_weeks = int(data['duration_weeks'])
             daily_study_hours = float(data['daily_study_hours'])
-            
-            print(f"[DEBUG] Converted values: current_score={current_score} ({type(current_score)}), "
-                  f"target_score={target_score} ({type(target_score)}), "
-                  f"duration_weeks={duration_weeks} ({type(duration_weeks)}), "
-                  f"daily_study_hours={daily_study_hours} ({type(daily_study_hours)})")
-            
         except ValueError as e:
             return jsonify({
                 'error': f'Giá trị không hợp lệ: {str(e)}'
@@ -472,17 +369,20 @@ def generate_study_plan():
                 'error': 'Thời gian học phải lớn hơn 0'
             }), 400
         
+        # Lộ trình được lưu ở server khi request có email của người dùng (trừ khi "save": false)
+        owner = None
+        if data.get('email') and data.get('save', True):
+            user = users.get_by_email(data['email'])
+            if not user:
+                return jsonify({'error': 'Không tìm thấy thông tin người dùng'}), 404
+            owner = user['student_id']
+
+        compact = _wants_compact(data)
+        if _wants_stream():
+            return _stream_study_plan(data, current_score, target_score, duration_weeks, daily_study_hours,
+                                      compact, owner)
+
         # Gọi AI để tạo lộ trình học tập
-        print("[DEBUG] Calling AI generate_learning_path with:", {
-            'subject': data['subject'],
-            'current_score': current_score,
-            'target_score': target_score,
-            'duration_weeks': duration_weeks,
-            'daily_study_hours': daily_study_hours,
-            'learning_style': data['learning_style'],
-            'grade': data['grade']
-        })
-        
         learning_path = ai.generate_learning_path(
             subject=data['subject'],
             current_score=current_score,
@@ -494,33 +394,317 @@ def generate_study_plan():
         )
         
         if learning_path is None:
-            print("[ERROR] AI returned None (không thể tạo lộ trình học tập)")
+            logger.warning("Không thể tạo lộ trình học tập cho %s", data)
             return jsonify({
                 'error': 'Không thể tạo lộ trình học tập. Vui lòng thử lại.'
             }), 500
             
-        print("[DEBUG] Learning path generated successfully")
-        print("[DEBUG] Learning path structure:", {
-            'type': type(learning_path).__name__,
-            'weekly_plans_count': len(learning_path['weekly_plans']) if learning_path else 0,
-            'first_week': type(learning_path['weekly_plans'][0]).__name__ if learning_path and learning_path['weekly_plans'] else None
-        })
+        logger.debug("Đã tạo lộ trình %d tuần", len(learning_path['weekly_plans']))
         
+        if owner is not None:
+            path_id = plans.save(owner, learning_path, current_score, target_score)['path_id']
+            # Mã lộ trình và mã từng ngày để client gửi tiến độ, lấy bài đánh giá theo ngày
+            learning_path = dict(
+                learning_path,
+                path_id=path_id,
+                weekly_plans=[plans.with_ids(path_id, week_plan) for week_plan in learning_path['weekly_plans']]
+            )
+        return _plan_response(learning_path, compact)
+        
+    except Exception:
+        logger.exception("Lỗi khi xử lý generate-study-plan")
+        return jsonify({
+            'error': 'Đã xảy ra lỗi khi tạo lộ trình học tập'
+        }), 500
+
+def _wants_stream():
+    """Client yêu cầu trả lộ trình dạng NDJSON (?stream=1 hoặc Accept: application/x-ndjson)"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+def _wants_compact(data):
+    """Client yêu cầu dạng gọn (?format=compact hoặc trường "format": "compact" trong body)"""
+    requested = request.args.get('format') or data.get('format') or ''
+    return str(requested).lower() == COMPACT_FORMAT
+
+def _plan_response(learning_path, compact):
+    if compact:
         return jsonify({
             'success': True,
-            'learning_path': learning_path
+            'format': COMPACT_FORMAT,
+            'format_version': COMPACT_FORMAT_VERSION,
+            'learning_path': compact_learning_path(learning_path)
         })
-        
-    except Exception as e:
-        print("\n[ERROR] Exception in generate_study_plan:")
-        print(f"[ERROR] Error type: {type(e).__name__}")
-        print(f"[ERROR] Error message: {str(e)}")
-        import traceback
-        print("[ERROR] Stack trace:")
-        traceback.print_exc()
+    return jsonify({
+        'success': True,
+        'learning_path': learning_path
+    })
+
+def _ndjson_line(obj):
+    return json.dumps(obj, ensure_ascii=False) + '\n'
+
+def _stream_study_plan(data, current_score, target_score, duration_weeks, daily_study_hours,
+                       compact=False, owner=None):
+    """Trả lộ trình theo từng dòng JSON: dòng 'header' (thông tin chung), mỗi tuần một dòng
+    'week' ngay khi dựng xong, cuối cùng là dòng 'end' (hoặc 'error' nếu lỗi giữa chừng).
+
+    Ở dạng gọn, dòng 'week' kèm resources/exercises là các tài liệu, bài tập lần đầu xuất hiện.
+    Khi có owner, mã lộ trình được cấp trước (có trong 'header', mỗi ngày có plan_id), lộ trình
+    được lưu sau tuần cuối và dòng 'end' kèm path_id.
+    """
+    plan = ai.stream_learning_path(
+        subject=data['subject'],
+        current_score=current_score,
+        target_score=target_score,
+        duration_weeks=duration_weeks,
+        daily_study_hours=daily_study_hours,
+        learning_style=data['learning_style'],
+        grade=data['grade']
+    )
+    if plan is None:
+        logger.warning("Không thể tạo lộ trình học tập cho %s", data)
         return jsonify({
-            'error': 'Đã xảy ra lỗi khi tạo lộ trình học tập'
+            'error': 'Không thể tạo lộ trình học tập. Vui lòng thử lại.'
         }), 500
+    header, weeks = plan
+    path_id = plans.new_path_id() if owner is not None else None
+    if path_id is not None:
+        header = dict(header, path_id=path_id)
+
+    def generate():
+        header_line = {'type': 'header', 'success': True, 'learning_path': header}
+        if compact:
+            header_line.update(format=COMPACT_FORMAT, format_version=COMPACT_FORMAT_VERSION)
+        yield _ndjson_line(header_line)
+        compactor = PlanCompactor() if compact else None
+        saved_weeks = [] if owner is not None else None
+        count = 0
+        try:
+            for week_plan in weeks:
+                count += 1
+                if path_id is not None:
+                    week_plan = plans.with_ids(path_id, week_plan)
+                if saved_weeks is not None:
+                    saved_weeks.append(week_plan)
+                if compactor is None:
+                    yield _ndjson_line({'type': 'week', 'week': week_plan})
+                    continue
+                week_plan = compactor.compact_week(week_plan)
+                resources, exercises = compactor.take_new()
+                yield _ndjson_line({'type': 'week', 'week': week_plan,
+                                    'resources': resources, 'exercises': exercises})
+        except Exception:
+            logger.exception("Lỗi khi tạo tuần %d của lộ trình", count + 1)
+            yield _ndjson_line({'type': 'error', 'error': 'Đã xảy ra lỗi khi tạo lộ trình học tập'})
+            return
+        end_line = {'type': 'end', 'total_weeks': count}
+        if saved_weeks:
+            try:
+                plans.save(owner, dict(header, weekly_plans=saved_weeks), current_score, target_score, path_id)
+                end_line['path_id'] = path_id
+            except Exception:
+                logger.exception("Lỗi khi lưu lộ trình học tập")
+                end_line['save_error'] = 'Không lưu được lộ trình học tập'
+        yield _ndjson_line(end_line)
+
+    # X-Accel-Buffering tắt bộ đệm của proxy (nginx) để từng tuần tới client ngay
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+@app.route('/api/learning-paths', methods=['GET'])
+def get_learning_paths():
+    """Danh sách lộ trình đã lưu của một người dùng (?email=...)"""
+    try:
+        email = request.args.get('email')
+        if not email:
+            return jsonify({'success': False, 'message': 'Thiếu email'}), 400
+        user = users.get_by_email(email)
+        if not user:
+            return jsonify({'success': False, 'message': 'Không tìm thấy thông tin người dùng'}), 404
+        return jsonify({'success': True, 'learning_paths': plans.paths_for_user(user['student_id'])})
+    except Exception:
+        logger.exception("Lỗi khi lấy danh sách lộ trình")
+        return jsonify({'success': False, 'message': 'Đã xảy ra lỗi khi lấy danh sách lộ trình'}), 500
+
+@app.route('/api/learning-paths/<path_id>', methods=['GET'])
+def get_learning_path(path_id):
+    """Lộ trình đã lưu, cùng cấu trúc với /api/generate-study-plan (hỗ trợ ?format=compact)"""
+    try:
+        learning_path = plans.load_learning_path(path_id)
+        if learning_path is None:
+            return jsonify({'success': False, 'message': 'Không tìm thấy lộ trình'}), 404
+        return _plan_response(learning_path, request.args.get('format', '').lower() == COMPACT_FORMAT)
+    except Exception:
+        logger.exception("Lỗi khi lấy lộ trình %s", path_id)
+        return jsonify({'success': False, 'message': 'Đã xảy ra lỗi khi lấy lộ trình'}), 500
+
+@app.route('/api/progress', methods=['POST'])
+def record_progress():
+    """Nhận một lô sự kiện hoàn thành ngày học {plan_id, date, completed}; ghi xuống lưu trữ theo lô"""
+    try:
+        data = request.get_json(silent=True) or {}
+        events = data.get('events')
+        if not isinstance(events, list):
+            return jsonify({'success': False, 'message': 'Cần danh sách events'}), 400
+        if len(events) > MAX_PROGRESS_EVENTS:
+            return jsonify({
+                'success': False,
+                'message': f'Mỗi request chỉ được gửi tối đa {MAX_PROGRESS_EVENTS} sự kiện'
+            }), 400
+        accepted, errors = progress.record(events)
+        return jsonify({
+            'success': not errors,
+            'accepted': accepted,
+            'errors': errors,
+            'pending': len(progress)
+        })
+    except Exception:
+        logger.exception("Lỗi khi ghi tiến độ học tập")
+        return jsonify({'success': False, 'message': 'Đã xảy ra lỗi khi ghi tiến độ học tập'}), 500
+
+@app.route('/api/learning-paths/<path_id>/progress', methods=['GET'])
+def get_progress(path_id):
+    """Các ngày đã hoàn thành của một lộ trình (gồm cả sự kiện chưa được ghi xuống lưu trữ)"""
+    try:
+        if plans.get_path(path_id) is None:
+            return jsonify({'success': False, 'message': 'Không tìm thấy lộ trình'}), 404
+        days = plans.daily_plans(path_id)
+        completed = [day for day in days if day['completed']]
+        return jsonify({
+            'success': True,
+            'path_id': path_id,
+            'total_days': len(days),
+            'completed_days': len(completed),
+            'completed': [{'plan_id': day['plan_id'], 'date': day['date']} for day in completed]
+        })
+    except Exception:
+        logger.exception("Lỗi khi lấy tiến độ lộ trình %s", path_id)
+        return jsonify({'success': False, 'message': 'Đã xảy ra lỗi khi lấy tiến độ học tập'}), 500
+
+@app.route('/api/progress/stats', methods=['GET'])
+def progress_stats():
+    """Số ngày đang chờ ghi và số lần đã ghi của bộ gom tiến độ"""
+    return jsonify({'success': True, 'stats': progress.stats()})
+
+@app.route('/api/quiz', methods=['GET'])
+def get_quiz():
+    """Bài đánh giá cho một ngày học: ?plan_id=<mã ngày> (hoặc mã lộ trình kèm &date=),
+    hoặc chọn trực tiếp theo ?subject=&grade=&topic=&level=. Câu hỏi không kèm đáp án."""
+    try:
+        try:
+            count = int(request.args.get('count', QUIZ_DEFAULT_QUESTIONS))
+        except ValueError:
+            return jsonify({'success': False, 'message': 'count phải là số nguyên'}), 400
+        if count < 1:
+            return jsonify({'success': False, 'message': 'count phải lớn hơn 0'}), 400
+        count = min(count, QUIZ_MAX_QUESTIONS)
+
+        plan_id = request.args.get('plan_id')
+        if plan_id:
+            day = plans.get_day(plan_id, request.args.get('date'))
+            if day is None:
+                return jsonify({'success': False, 'message': 'Không tìm thấy ngày học'}), 404
+            path = plans.get_path(day['path_id'])
+            topics = [detail['topic'] for detail in day['topic_details']]
+            questions = question_bank.sample(path['subject'], path['grade'], topics, path['level'],
+                                             count=count, seed=day['plan_id'])
+        else:
+            subject = request.args.get('subject')
+            if not subject:
+                return jsonify({'success': False, 'message': 'Cần plan_id hoặc subject'}), 400
+            topic = request.args.get('topic')
+            questions = question_bank.sample(subject, request.args.get('grade'), [topic] if topic else [],
+                                             request.args.get('level'), count=count)
+        return jsonify({'success': True, 'questions': questions})
+    except Exception:
+        logger.exception("Lỗi khi tạo bài đánh giá")
+        return jsonify({'success': False, 'message': 'Đã xảy ra lỗi khi tạo bài đánh giá'}), 500
+
+@app.route('/api/quiz/score', methods=['POST'])
+def score_quiz():
+    """Chấm một lô bài nộp: {"submissions": [{"answers": {"q001": 0, ...}}, ...]}"""
+    try:
+        data = request.get_json(silent=True) or {}
+        submissions = data.get('submissions')
+        if not isinstance(submissions, list) or not all(
+                isinstance(sub, dict) and isinstance(sub.get('answers'), dict) for sub in submissions):
+            return jsonify({'success': False, 'message': 'Cần danh sách submissions, mỗi bài có answers'}), 400
+        if len(submissions) > MAX_QUIZ_SUBMISSIONS:
+            return jsonify({
+                'success': False,
+                'message': f'Mỗi request chỉ được gửi tối đa {MAX_QUIZ_SUBMISSIONS} bài nộp'
+            }), 400
+        results = question_bank.score([sub['answers'] for sub in submissions])
+        return jsonify({'success': True, 'results': results})
+    except Exception:
+        logger.exception("Lỗi khi chấm bài đánh giá")
+        return jsonify({'success': False, 'message': 'Đã xảy ra lỗi khi chấm bài đánh giá'}), 500
+
+@app.route('/api/predict-success-rate/batch', methods=['POST'])
+def predict_success_rate_batch():
+    """Dự đoán tỷ lệ thành công cho nhiều hồ sơ học sinh trong một request"""
+    try:
+        data = request.get_json(silent=True) or {}
+        profiles = data.get('profiles')
+        if not isinstance(profiles, list) or not all(isinstance(p, dict) for p in profiles):
+            return jsonify({'error': 'Trường profiles phải là danh sách các hồ sơ'}), 400
+        if len(profiles) > MAX_BATCH_PROFILES:
+            return jsonify({
+                'error': f'Mỗi request chỉ được gửi tối đa {MAX_BATCH_PROFILES} hồ sơ'
+            }), 400
+
+        rates = ai.predict_success_rate_batch(profiles)
+        # Hồ sơ không hợp lệ trả về null
+        return jsonify({
+            'success': True,
+            'success_rates': [None if rate != rate else float(rate) for rate in rates.tolist()],
+            'invalid_count': int((rates != rates).sum())
+        })
+    except Exception:
+        logger.exception("Lỗi khi dự đoán theo lô")
+        return jsonify({'error': 'Đã xảy ra lỗi khi dự đoán tỷ lệ thành công'}), 500
+
+@app.route('/api/plan-cache/stats', methods=['GET'])
+def plan_cache_stats():
+    """Thống kê bộ nhớ đệm lộ trình (số mục, số lần trúng/trượt)"""
+    return jsonify({'success': True, 'stats': ai.plan_cache.stats()})
+
+@app.route('/avatars/<key>')
+def avatar(key):
+    """Ảnh đại diện gốc theo khóa nội dung"""
+    path = avatars.path(key)
+    if path is None or not os.path.exists(path):
+        return jsonify({'success': False, 'message': 'Không tìm thấy ảnh'}), 404
+    response = send_file(path, mimetype=avatars.mimetype(key), conditional=True)
+    response.headers['Cache-Control'] = AVATAR_CACHE_CONTROL
+    return response
+
+@app.route('/avatars/thumb/<key>')
+def avatar_thumbnail(key):
+    """Ảnh đại diện thu nhỏ; khi chưa tạo xong thì trả ảnh gốc với thời hạn cache ngắn"""
+    path = avatars.path(key)
+    if path is None or not os.path.exists(path):
+        return jsonify({'success': False, 'message': 'Không tìm thấy ảnh'}), 404
+    thumb_path = avatars.thumbnail_path(key)
+    if os.path.exists(thumb_path):
+        response = send_file(thumb_path, mimetype=avatars.mimetype(avatars.thumbnail_key(key)), conditional=True)
+        response.headers['Cache-Control'] = AVATAR_CACHE_CONTROL
+        return response
+    avatars.enqueue_thumbnail(key)
+    response = send_file(path, mimetype=avatars.mimetype(key), conditional=True)
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({'success': False, 'message': f'Dữ liệu gửi lên vượt quá {MAX_REQUEST_KB} KB'}), 413
+
+@app.before_request
+def limit_request_size():
+    # Kiểm tra trước khi vào route: các route bắt mọi Exception nên lỗi 413 khi đọc body sẽ thành 500
+    if request.content_length is not None and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        return request_too_large(None)
 
 @app.route('/favicon.ico')
 def favicon():
@@ -530,160 +714,96 @@ def favicon():
 # Hàm quản lý Grade
 def add_grade(name_grade):
     try:
-        wb = load_workbook(GRADE_EXCEL)
-        ws = wb.active
-        grade_id = f"G{len(list(ws.rows)):03d}"
-        ws.append([grade_id, name_grade])
-        wb.save(GRADE_EXCEL)
+        with _id_lock:
+            grade_id = f"G{db.count('grade') + 1:03d}"
+            db.insert('grade', [grade_id, name_grade])
+        catalog.add_row('grade', [grade_id, name_grade])
         return grade_id
     except Exception as e:
-        print(f"Lỗi khi thêm grade: {e}")
+        logger.error("Lỗi khi thêm grade: %s", e)
         raise
 
 def get_all_grades():
     try:
-        wb = load_workbook(GRADE_EXCEL)
-        ws = wb.active
-        grades = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0]:
-                grades.append({
-                    'ID_grade': row[0],
-                    'Name_grade': row[1]
-                })
-        return grades
+        return catalog.get_all('grade')
     except Exception as e:
-        print(f"Lỗi khi đọc grades: {e}")
+        logger.error("Lỗi khi đọc grades: %s", e)
         return []
 
 # Hàm quản lý Subject
 def add_subject(name_subject, grade_id):
     try:
-        wb = load_workbook(SUBJECT_EXCEL)
-        ws = wb.active
-        subject_id = f"S{len(list(ws.rows)):03d}"
-        ws.append([subject_id, name_subject, grade_id])
-        wb.save(SUBJECT_EXCEL)
+        with _id_lock:
+            subject_id = f"S{db.count('subject') + 1:03d}"
+            db.insert('subject', [subject_id, name_subject, grade_id])
+        catalog.add_row('subject', [subject_id, name_subject, grade_id])
         return subject_id
     except Exception as e:
-        print(f"Lỗi khi thêm subject: {e}")
+        logger.error("Lỗi khi thêm subject: %s", e)
         raise
 
 def get_subjects_by_grade(grade_id):
     try:
-        wb = load_workbook(SUBJECT_EXCEL)
-        ws = wb.active
-        subjects = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0] and row[2] == grade_id:
-                subjects.append({
-                    'ID_subject': row[0],
-                    'name_subject': row[1],
-                    'ID_grade': row[2]
-                })
-        return subjects
+        return catalog.get_children('subject', grade_id)
     except Exception as e:
-        print(f"Lỗi khi đọc subjects: {e}")
+        logger.error("Lỗi khi đọc subjects: %s", e)
         return []
 
 # Hàm quản lý Topic
 def add_topic(topic_name, subject_id, grade_id):
     try:
-        wb = load_workbook(TOPIC_EXCEL)
-        ws = wb.active
-        topic_id = f"T{len(list(ws.rows)):03d}"
-        ws.append([topic_id, topic_name, subject_id, grade_id])
-        wb.save(TOPIC_EXCEL)
+        with _id_lock:
+            topic_id = f"T{db.count('topic') + 1:03d}"
+            db.insert('topic', [topic_id, topic_name, subject_id, grade_id])
+        catalog.add_row('topic', [topic_id, topic_name, subject_id, grade_id])
         return topic_id
     except Exception as e:
-        print(f"Lỗi khi thêm topic: {e}")
+        logger.error("Lỗi khi thêm topic: %s", e)
         raise
 
 def get_topics_by_subject(subject_id):
     try:
-        wb = load_workbook(TOPIC_EXCEL)
-        ws = wb.active
-        topics = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0] and row[2] == subject_id:
-                topics.append({
-                    'ID_topic': row[0],
-                    'topic_name': row[1],
-                    'ID_subject': row[2],
-                    'ID_grade': row[3]
-                })
-        return topics
+        return catalog.get_children('topic', subject_id)
     except Exception as e:
-        print(f"Lỗi khi đọc topics: {e}")
+        logger.error("Lỗi khi đọc topics: %s", e)
         return []
 
 # Hàm quản lý Theory
 def add_theory(theory_name, topic_id, subject_id, grade_id, level, url, completion_time):
     try:
-        wb = load_workbook(THEORY_EXCEL)
-        ws = wb.active
-        theory_id = f"TH{len(list(ws.rows)):03d}"
-        ws.append([theory_id, theory_name, topic_id, subject_id, grade_id, level, url, completion_time])
-        wb.save(THEORY_EXCEL)
+        with _id_lock:
+            theory_id = f"TH{db.count('theory') + 1:03d}"
+            db.insert('theory', [theory_id, theory_name, topic_id, subject_id, grade_id, level, url, completion_time])
+        catalog.add_row('theory', [theory_id, theory_name, topic_id, subject_id, grade_id, level, url, completion_time])
         return theory_id
     except Exception as e:
-        print(f"Lỗi khi thêm theory: {e}")
+        logger.error("Lỗi khi thêm theory: %s", e)
         raise
 
 def get_theories_by_topic(topic_id):
     try:
-        wb = load_workbook(THEORY_EXCEL)
-        ws = wb.active
-        theories = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0] and row[2] == topic_id:
-                theories.append({
-                    'ID_theory': row[0],
-                    'theory_name': row[1],
-                    'ID_topic': row[2],
-                    'ID_subject': row[3],
-                    'ID_grade': row[4],
-                    'level': row[5],
-                    'URL': row[6],
-                    'completion_time': row[7]
-                })
-        return theories
+        return catalog.get_children('theory', topic_id)
     except Exception as e:
-        print(f"Lỗi khi đọc theories: {e}")
+        logger.error("Lỗi khi đọc theories: %s", e)
         return []
 
 # Hàm quản lý Practice
 def add_practice(practice_name, topic_id, subject_id, grade_id, level, theory_id):
     try:
-        wb = load_workbook(PRACTICE_EXCEL)
-        ws = wb.active
-        practice_id = f"P{len(list(ws.rows)):03d}"
-        ws.append([practice_id, practice_name, topic_id, subject_id, grade_id, level, theory_id])
-        wb.save(PRACTICE_EXCEL)
+        with _id_lock:
+            practice_id = f"P{db.count('practice') + 1:03d}"
+            db.insert('practice', [practice_id, practice_name, topic_id, subject_id, grade_id, level, theory_id])
+        catalog.add_row('practice', [practice_id, practice_name, topic_id, subject_id, grade_id, level, theory_id])
         return practice_id
     except Exception as e:
-        print(f"Lỗi khi thêm practice: {e}")
+        logger.error("Lỗi khi thêm practice: %s", e)
         raise
 
 def get_practices_by_theory(theory_id):
     try:
-        wb = load_workbook(PRACTICE_EXCEL)
-        ws = wb.active
-        practices = []
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0] and row[6] == theory_id:
-                practices.append({
-                    'ID_practice': row[0],
-                    'practice_name': row[1],
-                    'ID_topic': row[2],
-                    'ID_subject': row[3],
-                    'ID_grade': row[4],
-                    'level': row[5],
-                    'ID_theory': row[6]
-                })
-        return practices
+        return catalog.get_children('practice', theory_id)
     except Exception as e:
-        print(f"Lỗi khi đọc practices: {e}")
+        logger.error("Lỗi khi đọc practices: %s", e)
         return []
 
 # API endpoints cho quản lý dữ liệu
@@ -805,8 +925,22 @@ def create_practice():
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
+def _get_or_add(table, match, add_func, *args):
+    """Trả về ID của dòng danh mục khớp match, chỉ thêm mới khi chưa có"""
+    key = TABLES[table]['key']
+    for row in catalog.get_all(table):
+        if all(row[column] == value for column, value in match.items()):
+            return row[key]
+    return add_func(*args)
+
 def init_sample_data():
-    """Khởi tạo dữ liệu mẫu cho các file Excel"""
+    """Khởi tạo dữ liệu mẫu cho các file Excel.
+
+    Chỉ chạy khi chưa có file đánh dấu SAMPLE_DATA_MARKER; các dòng đã có (cùng tên,
+    cùng dòng cha) được dùng lại nên chạy lại nhiều lần cũng không tạo bản trùng.
+    """
+    if os.path.exists(SAMPLE_DATA_MARKER):
+        return True
     try:
         # Thêm các lớp học
         grades = [
@@ -816,7 +950,7 @@ def init_sample_data():
         ]
         grade_ids = {}
         for grade in grades:
-            grade_id = add_grade(grade)
+            grade_id = _get_or_add('grade', {'Name_grade': grade}, add_grade, grade)
             grade_ids[grade] = grade_id
 
         # Thêm các môn học
@@ -829,7 +963,8 @@ def init_sample_data():
         for grade, subject_list in subjects.items():
             grade_id = grade_ids[grade]
             for subject in subject_list:
-                subject_id = add_subject(subject, grade_id)
+                subject_id = _get_or_add('subject', {'name_subject': subject, 'ID_grade': grade_id},
+                                         add_subject, subject, grade_id)
                 subject_ids[f"{grade}_{subject}"] = subject_id
 
         # Thêm các chủ đề cho Toán lớp 10
@@ -842,7 +977,8 @@ def init_sample_data():
         ]
         topic_ids = {}
         for topic in math_10_topics:
-            topic_id = add_topic(topic, subject_ids["Lớp 10_Toán"], grade_ids["Lớp 10"])
+            topic_id = _get_or_add('topic', {'topic_name': topic, 'ID_subject': subject_ids["Lớp 10_Toán"]},
+                                   add_topic, topic, subject_ids["Lớp 10_Toán"], grade_ids["Lớp 10"])
             topic_ids[f"Lớp 10_Toán_{topic}"] = topic_id
 
         # Thêm bài học lý thuyết mẫu cho chủ đề "Mệnh đề – Tập hợp"
@@ -861,10 +997,13 @@ def init_sample_data():
             }
         ]
         theory_ids = {}
+        topic_id = topic_ids["Lớp 10_Toán_Mệnh đề – Tập hợp"]
         for lesson in theory_lessons:
-            theory_id = add_theory(
+            theory_id = _get_or_add(
+                'theory', {'theory_name': lesson["name"], 'ID_topic': topic_id},
+                add_theory,
                 lesson["name"],
-                topic_ids["Lớp 10_Toán_Mệnh đề – Tập hợp"],
+                topic_id,
                 subject_ids["Lớp 10_Toán"],
                 grade_ids["Lớp 10"],
                 lesson["level"],
@@ -873,53 +1012,110 @@ def init_sample_data():
             )
             theory_ids[lesson["name"]] = theory_id
 
-        print("Đã khởi tạo dữ liệu mẫu thành công!")
+        with open(SAMPLE_DATA_MARKER, 'w') as f:
+            f.write(datetime.now().isoformat(timespec='seconds'))
+        logger.info("Đã khởi tạo dữ liệu mẫu thành công!")
         return True
     except Exception as e:
-        print(f"Lỗi khi khởi tạo dữ liệu mẫu: {e}")
+        logger.error("Lỗi khi khởi tạo dữ liệu mẫu: %s", e)
         return False
 
-# Gọi hàm khởi tạo dữ liệu mẫu khi khởi động ứng dụng
-init_sample_data()
+def start_model_loading():
+    """Tải mô hình theo MODEL_LOADING mà không chặn việc khởi động (trừ chế độ 'eager')"""
+    if MODEL_LOADING == 'eager':
+        _timed('model', ai.ensure_model)
+    elif MODEL_LOADING == 'background':
+        threading.Thread(target=ai.ensure_model, name='model-loader', daemon=True).start()
+    # 'lazy': ai.ensure_model() được gọi ở request đầu tiên cần dự đoán
+
+def report_startup():
+    """Ghi thời gian từng bước khởi động và cảnh báo nếu vượt ngân sách"""
+    total = sum(ms for _, ms in startup_phases)
+    details = ', '.join(f'{phase} {ms:.0f} ms' for phase, ms in startup_phases)
+    if total > STARTUP_BUDGET_MS:
+        logger.warning("Khởi động mất %.0f ms, vượt ngân sách %.0f ms (%s)", total, STARTUP_BUDGET_MS, details)
+    else:
+        logger.info("Khởi động mất %.0f ms / ngân sách %.0f ms (%s)", total, STARTUP_BUDGET_MS, details)
+
+# Các bước khởi động còn lại: dữ liệu mẫu, mô hình (thường ở luồng nền), báo cáo thời gian
+_timed('sample_data', init_sample_data)
+start_model_loading()
+retrainer = RetrainWorker(ai, RETRAIN_DATA_PATH, interval=RETRAIN_INTERVAL, min_r2=RETRAIN_MIN_R2)
+if RETRAIN_INTERVAL > 0:
+    retrainer.start()
+outcome_buffer = OutcomeBuffer(
+    lambda rows: ai.update_with_outcomes(rows, model_path='learning_path_model.joblib'),
+    batch_size=ONLINE_BATCH_SIZE
+)
+report_startup()
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Trạng thái ứng dụng: mô hình đã sẵn sàng chưa và thời gian các bước khởi động"""
+    return jsonify({
+        'success': True,
+        'model_ready': ai.is_trained,
+        'model_loading': MODEL_LOADING,
+        'startup_ms': {phase: round(ms, 1) for phase, ms in startup_phases}
+    })
+
+@app.route('/api/model/retrain', methods=['POST'])
+def retrain_model():
+    """Yêu cầu huấn luyện lại mô hình ở luồng nền; mô hình cũ vẫn phục vụ đến khi thay xong"""
+    try:
+        retrainer.trigger()
+        return jsonify({'success': True, 'message': 'Đã yêu cầu huấn luyện lại mô hình'}), 202
+    except Exception:
+        logger.exception("Lỗi khi yêu cầu huấn luyện lại mô hình")
+        return jsonify({'error': 'Không thể huấn luyện lại mô hình'}), 500
+
+@app.route('/api/model/outcomes', methods=['POST'])
+def record_outcomes():
+    """Nhận kết quả thực tế của các lộ trình đã hoàn thành để cập nhật mô hình theo lô nhỏ"""
+    try:
+        data = request.get_json() or {}
+        outcomes = data.get('outcomes')
+        if not isinstance(outcomes, list) or not all(isinstance(o, dict) for o in outcomes):
+            return jsonify({'error': 'Cần danh sách outcomes gồm các đối tượng JSON'}), 400
+        if not ai.ensure_model():
+            return jsonify({'error': 'Mô hình chưa sẵn sàng'}), 503
+        if not ai.supports_online_updates:
+            return jsonify({'error': 'Mô hình hiện tại không hỗ trợ cập nhật tăng dần (đặt MODEL_ESTIMATOR=sgd)'}), 409
+
+        applied = outcome_buffer.add(outcomes)
+        if data.get('flush'):
+            applied += outcome_buffer.flush()
+        return jsonify({
+            'success': True,
+            'applied': applied,
+            'buffered': len(outcome_buffer)
+        })
+    except Exception:
+        logger.exception("Lỗi khi cập nhật mô hình từ kết quả học tập")
+        return jsonify({'error': 'Đã xảy ra lỗi khi cập nhật mô hình'}), 500
+
+@app.route('/api/model', methods=['GET'])
+def model_status():
+    """Thông tin mô hình đang dùng và lần huấn luyện lại gần nhất"""
+    return jsonify({
+        'success': True,
+        'ready': ai.is_trained,
+        'estimator': ai.estimator_kind,
+        'online_updates': ai.supports_online_updates,
+        'buffered_outcomes': len(outcome_buffer),
+        **retrainer.status()
+    })
 
 def generate_practice_exercises(theory_id):
     """Tạo bài tập thực hành dựa trên bài học lý thuyết sử dụng AI"""
     try:
         # Lấy thông tin bài học lý thuyết
-        wb = load_workbook(THEORY_EXCEL)
-        ws = wb.active
-        theory_info = None
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0] == theory_id:
-                theory_info = {
-                    'ID_theory': row[0],
-                    'theory_name': row[1],
-                    'ID_topic': row[2],
-                    'ID_subject': row[3],
-                    'ID_grade': row[4],
-                    'level': row[5],
-                    'URL': row[6],
-                    'completion_time': row[7]
-                }
-                break
-        
+        theory_info = catalog.get_by_id('theory', theory_id)
         if not theory_info:
             raise Exception("Không tìm thấy bài học lý thuyết")
 
         # Lấy thông tin chủ đề
-        wb = load_workbook(TOPIC_EXCEL)
-        ws = wb.active
-        topic_info = None
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            if row[0] == theory_info['ID_topic']:
-                topic_info = {
-                    'ID_topic': row[0],
-                    'topic_name': row[1],
-                    'ID_subject': row[2],
-                    'ID_grade': row[3]
-                }
-                break
-
+        topic_info = catalog.get_by_id('topic', theory_info['ID_topic'])
         if not topic_info:
             raise Exception("Không tìm thấy thông tin chủ đề")
 
@@ -958,7 +1154,7 @@ def generate_practice_exercises(theory_id):
 
         return practice_ids
     except Exception as e:
-        print(f"Lỗi khi tạo bài tập thực hành: {e}")
+        logger.error("Lỗi khi tạo bài tập thực hành: %s", e)
         raise
 
 @app.route('/api/generate-practice/<theory_id>', methods=['POST'])
@@ -979,13 +1175,4 @@ def generate_practice(theory_id):
 
 # ✅ Khởi chạy app
 if __name__ == "__main__":
-    init_excel()
-    # Tạo và lưu dữ liệu training mới khi khởi động app
-    training_file = generate_training_data()
-    print(f"Đã tạo dữ liệu training mới: {training_file}")
-    # Đổi tên file mới nhất thành training_data.csv
-    if training_file != 'training_data.csv':
-        if os.path.exists('training_data.csv'):
-            os.remove('training_data.csv')
-        os.rename(training_file, 'training_data.csv')
     app.run(debug=True)
@@ -0,0 +1,175 @@
+import hashlib
+import logging
+import os
+import queue
+import re
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Số byte đọc mỗi lần khi ghi file tải lên
+CHUNK_SIZE = 64 * 1024
+
+# Chữ ký đầu file -> phần mở rộng; chỉ nhận ảnh raster (không nhận SVG vì có thể chứa script)
+IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+]
+
+MIMETYPES = {'png': 'image/png', 'jpg': 'image/jpeg', 'gif': 'image/gif', 'webp': 'image/webp'}
+
+# Khóa của ảnh: sha256 nội dung + phần mở rộng
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}\.(png|jpg|gif|webp)$')
+
+
+class AvatarTooLarge(ValueError):
+    pass
+
+
+def _sniff(head):
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+class AvatarStore:
+    """Kho ảnh đại diện đánh địa chỉ theo nội dung.
+
+    File tải lên được ghi dần ra file tạm trong khi tính sha256 và đếm dung lượng (vượt
+    max_bytes thì dừng ngay), rồi đổi tên thành <sha256>.<đuôi>; file trùng nội dung chỉ được
+    lưu một lần. Ảnh thu nhỏ kích thước cố định (thumb_size x thumb_size) được tạo ở luồng nền
+    nếu có Pillow; khi chưa có ảnh thu nhỏ thì dùng ảnh gốc.
+    """
+
+    def __init__(self, directory='static/avatars', max_bytes=2 * 1024 * 1024, thumb_size=128):
+        self.directory = directory
+        self.thumb_directory = os.path.join(directory, 'thumbs')
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        os.makedirs(self.thumb_directory, exist_ok=True)
+        self._jobs = queue.Queue()
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def path(self, key):
+        """Đường dẫn ảnh gốc của khóa, None nếu khóa không hợp lệ"""
+        if not KEY_PATTERN.match(key):
+            return None
+        return os.path.join(self.directory, key[:2], key)
+
+    def thumbnail_key(self, key):
+        digest, ext = key.split('.')
+        # Ảnh GIF thu nhỏ thành PNG (chỉ lấy khung đầu)
+        return f'{digest}_{self.thumb_size}.{"png" if ext == "gif" else ext}'
+
+    def thumbnail_path(self, key):
+        return os.path.join(self.thumb_directory, self.thumbnail_key(key))
+
+    @staticmethod
+    def mimetype(key):
+        return MIMETYPES[key.rsplit('.', 1)[1]]
+
+    def save(self, stream):
+        """Ghi ảnh từ stream (file-like), trả về khóa của ảnh.
+
+        Báo AvatarTooLarge nếu vượt max_bytes, ValueError nếu không phải ảnh PNG/JPEG/GIF/WebP.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        ext = None
+        fd, tmp_path = tempfile.mkstemp(prefix='.upload-', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if ext is None:
+                        ext = _sniff(chunk)
+                        if ext is None:
+                            raise ValueError('Chỉ nhận ảnh PNG, JPEG, GIF hoặc WebP')
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise AvatarTooLarge(f'Ảnh vượt quá {self.max_bytes // 1024} KB')
+                    digest.update(chunk)
+                    f.write(chunk)
+            if ext is None:
+                raise ValueError('File ảnh rỗng')
+
+            key = f'{digest.hexdigest()}.{ext}'
+            path = self.path(key)
+            # Ảnh đã có (cùng nội dung) thì bỏ file tạm, không lưu thêm bản sao
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if not os.path.exists(self.thumbnail_path(key)):
+            self.enqueue_thumbnail(key)
+        return key
+
+    def enqueue_thumbnail(self, key):
+        """Yêu cầu tạo ảnh thu nhỏ ở luồng nền (bỏ qua nếu đang chờ hoặc không có Pillow)"""
+        if not _pillow_available():
+            return
+        with self._lock:
+            if key in self._queued:
+                return
+            self._queued.add(key)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='avatar-thumbnails', daemon=True)
+                self._thread.start()
+        self._jobs.put(key)
+
+    def _run(self):
+        while True:
+            key = self._jobs.get()
+            try:
+                self.make_thumbnail(key)
+            except Exception:
+                logger.exception("Lỗi khi tạo ảnh thu nhỏ cho %s", key)
+            finally:
+                with self._lock:
+                    self._queued.discard(key)
+                self._jobs.task_done()
+
+    def make_thumbnail(self, key):
+        """Cắt giữa ảnh thành hình vuông và thu về thumb_size x thumb_size"""
+        from PIL import Image, ImageOps
+
+        target = self.thumbnail_path(key)
+        with Image.open(self.path(key)) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+            thumb = ImageOps.fit(image, (self.thumb_size, self.thumb_size))
+            if target.endswith('.jpg') and thumb.mode == 'RGBA':
+                thumb = thumb.convert('RGB')
+            tmp_path = target + '.tmp'
+            thumb.save(tmp_path, format={'png': 'PNG', 'jpg': 'JPEG', 'webp': 'WEBP'}[target.rsplit('.', 1)[1]])
+            os.replace(tmp_path, target)
+        return target
+
+
+_pillow = None
+
+
+def _pillow_available():
+    global _pillow
+    if _pillow is None:
+        try:
+            import PIL  # noqa: F401
+            _pillow = True
+        except ImportError:
+            logger.warning("Chưa cài Pillow (xem requirements.txt), ảnh đại diện được phục vụ ở kích thước gốc")
+            _pillow = False
+    return _pillow
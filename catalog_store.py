@@ -0,0 +1,97 @@
+import threading
+from storage import TABLES
+
+# Khóa ngoại dùng để tra cứu các dòng con của từng bảng danh mục
+CATALOG_PARENTS = {
+    'grade': None,
+    'subject': 'ID_grade',
+    'topic': 'ID_subject',
+    'theory': 'ID_topic',
+    'practice': 'ID_theory'
+}
+
+
+class CatalogStore:
+    """Kho danh mục dùng chung cho cả tiến trình.
+
+    Mỗi bảng chỉ được đọc từ backend lưu trữ một lần, sau đó được đánh chỉ mục theo
+    khóa chính (ID -> dòng) và khóa ngoại (ID cha -> danh sách dòng con).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.RLock()
+        # table -> (rows, by_key, by_parent), được gán một lần để người đọc luôn thấy dữ liệu trọn vẹn
+        self._tables = {}
+        # Hàm được gọi với tên bảng mỗi khi danh mục thay đổi
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Đăng ký hàm callback(table) được gọi khi một bảng danh mục thay đổi"""
+        self._listeners.append(callback)
+
+    def _notify(self, table):
+        for callback in self._listeners:
+            callback(table)
+
+    def _build_indexes(self, table, rows):
+        key = TABLES[table]['key']
+        parent = CATALOG_PARENTS[table]
+        by_key = {}
+        by_parent = {}
+        for row in rows:
+            by_key[row[key]] = row
+            if parent:
+                by_parent.setdefault(row[parent], []).append(row)
+        return rows, by_key, by_parent
+
+    def _table(self, table):
+        data = self._tables.get(table)
+        if data is None:
+            with self._lock:
+                data = self._tables.get(table)
+                if data is None:
+                    data = self._build_indexes(table, self.backend.read_all(table))
+                    self._tables[table] = data
+        return data
+
+    def get_all(self, table):
+        """Lấy toàn bộ dòng của một bảng"""
+        rows, _, _ = self._table(table)
+        return list(rows)
+
+    def get_by_id(self, table, key):
+        """Tra cứu một dòng theo khóa chính"""
+        _, by_key, _ = self._table(table)
+        return by_key.get(key)
+
+    def get_children(self, table, parent_id):
+        """Lấy các dòng thuộc về một ID cha (grade->subject, subject->topic, ...)"""
+        _, _, by_parent = self._table(table)
+        return list(by_parent.get(parent_id, ()))
+
+    def add_row(self, table, values):
+        """Cập nhật kho sau khi một dòng mới đã được ghi vào backend"""
+        with self._lock:
+            data = self._tables.get(table)
+            # Nếu bảng chưa được nạp thì lần đọc đầu tiên sẽ thấy dòng mới trong backend
+            if data is not None:
+                # Dựng danh sách và dict mới rồi thay cả bộ bằng một lần gán: người đọc không
+                # giữ khóa nên không được sửa tại chỗ các đối tượng họ có thể đang duyệt
+                row = dict(zip(TABLES[table]['columns'], values))
+                rows, by_key, by_parent = data
+                by_key = {**by_key, row[TABLES[table]['key']]: row}
+                parent = CATALOG_PARENTS[table]
+                if parent:
+                    by_parent = {**by_parent, row[parent]: by_parent.get(row[parent], []) + [row]}
+                self._tables[table] = (rows + [row], by_key, by_parent)
+        self._notify(table)
+
+    def invalidate(self, table=None):
+        """Xóa dữ liệu đã nạp để lần đọc sau nạp lại từ backend"""
+        with self._lock:
+            if table:
+                self._tables.pop(table, None)
+            else:
+                self._tables.clear()
+        self._notify(table)
@@ -0,0 +1,150 @@
+import threading
+
+# Các tên của môn học trong bảng subject (so không phân biệt hoa thường)
+SUBJECT_NAMES = {
+    'math': ('Toán học', 'Toán'),
+    'physics': ('Vật lý',),
+    'chemistry': ('Hóa học',)
+}
+
+
+def _sorted_records(df):
+    """Chuyển DataFrame thành danh sách dict, sắp theo priority nếu có cột này"""
+    if 'priority' in df.columns:
+        df = df.sort_values('priority', kind='stable')
+    return df.to_dict('records')
+
+
+class ContentIndex:
+    """Chỉ mục nội dung học tập dựng một lần từ các bảng Excel đã đọc.
+
+    Chủ đề lý thuyết được nhóm theo (ID_subject, ID_grade, level), bài tập theo
+    (ID_subject, level) và tài liệu theo (ID_subject, level); mỗi nhóm là danh sách
+    dict đã sắp theo priority, sẵn sàng trả về. Tra cứu theo ngày chỉ còn là cắt danh sách.
+    Bảng nào thiếu cột cần thiết thì nhóm tương ứng là None.
+    """
+
+    def __init__(self, excel_data):
+        self.has_theory = 'theory' in excel_data
+        self.has_practice = 'practice' in excel_data
+        self.has_topic = 'topic' in excel_data
+
+        # Tên môn học (chữ thường) -> ID_subject đầu tiên, và (tên, ID_grade) -> ID_subject của
+        # môn ở lớp đó (mỗi lớp có dòng môn học riêng); None nếu không có bảng subject
+        self._subject_ids = None
+        self._grade_subject_ids = {}
+        subject_df = excel_data.get('subject')
+        if subject_df is not None and {'name_subject', 'ID_subject'} <= set(subject_df.columns):
+            self._subject_ids = {}
+            grade_ids = subject_df['ID_grade'] if 'ID_grade' in subject_df.columns else [None] * len(subject_df)
+            for name, subject_id, grade_id in zip(subject_df['name_subject'], subject_df['ID_subject'], grade_ids):
+                name = str(name).strip().lower()
+                self._subject_ids.setdefault(name, subject_id)
+                self._grade_subject_ids.setdefault((name, grade_id), subject_id)
+
+        # 'Lớp 10' -> ID_grade đầu tiên
+        self._grade_ids = None
+        grade_df = excel_data.get('grade')
+        if grade_df is not None and {'Name_grade', 'ID_grade'} <= set(grade_df.columns):
+            self._grade_ids = {}
+            for name, grade_id in zip(grade_df['Name_grade'], grade_df['ID_grade']):
+                self._grade_ids.setdefault(name, grade_id)
+
+        self.theory = self._group(
+            excel_data.get('theory'), ['ID_subject', 'ID_grade', 'level'],
+            lambda row: {
+                'name': row['theory_name'],
+                'description': row.get('content', ''),
+                'estimated_hours': float(row.get('estimated_time', 2.0))
+            }
+        )
+        self.practice = self._group(
+            excel_data.get('practice'), ['ID_subject', 'level'],
+            lambda row: {
+                'name': row['practice_name'],
+                'description': row.get('description', ''),
+                'difficulty': row.get('difficulty', 'medium')
+            }
+        )
+        self._resource_names = self._group(
+            excel_data.get('topic'), ['ID_subject', 'level'],
+            lambda row: row['topic_name']
+        )
+        # (subject, grade, level) -> danh sách tài liệu đã dựng (mô tả phụ thuộc tham số gọi)
+        self._resources = {}
+        self._lock = threading.Lock()
+
+    def _group(self, df, keys, make_item):
+        if df is None or not set(keys) <= set(df.columns):
+            return None
+        groups = {}
+        for row in _sorted_records(df):
+            groups.setdefault(tuple(row[key] for key in keys), []).append(make_item(row))
+        return groups
+
+    def subject_id(self, subject, grade_id=None):
+        """ID_subject của môn học (của lớp grade_id nếu có dòng riêng), None nếu không tra được"""
+        if self._subject_ids is None:
+            return None
+        for name in SUBJECT_NAMES.get(subject.lower(), ()):
+            name = name.lower()
+            subject_id = self._grade_subject_ids.get((name, grade_id)) or self._subject_ids.get(name)
+            if subject_id is not None:
+                return subject_id
+        return None
+
+    def grade_id(self, grade):
+        if self._grade_ids is None:
+            return None
+        return self._grade_ids.get(f'Lớp {grade}')
+
+    @staticmethod
+    def _week_slice(items, week_number, total_weeks):
+        """Phần của danh sách dành cho một tuần học"""
+        per_week = max(1, len(items) // total_weeks)
+        start_idx = (week_number - 1) * per_week
+        return items[start_idx:start_idx + per_week]
+
+    def theory_topics(self, subject, grade, level, week_number, total_weeks):
+        if not self.has_theory or self.theory is None:
+            return []
+        grade_id = self.grade_id(grade)
+        subject_id = self.subject_id(subject, grade_id)
+        if subject_id is None or grade_id is None:
+            return []
+        items = self.theory.get((subject_id, grade_id, level), [])
+        return self._week_slice(items, week_number, total_weeks)
+
+    def practice_exercises(self, subject, level, week_number, total_weeks):
+        if not self.has_practice or self.practice is None:
+            return []
+        subject_id = self.subject_id(subject)
+        if subject_id is None:
+            return []
+        items = self.practice.get((subject_id, level), [])
+        return self._week_slice(items, week_number, total_weeks)
+
+    def learning_resources(self, subject, grade, level):
+        """Tài liệu học tập; None nếu bảng topic không lọc được theo level"""
+        if not self.has_topic:
+            return []
+        subject_id = self.subject_id(subject)
+        if subject_id is None:
+            return []
+        if self._resource_names is None:
+            return None
+        key = (subject, grade, level)
+        resources = self._resources.get(key)
+        if resources is None:
+            resources = [
+                {
+                    'name': name,
+                    'type': 'document',
+                    'url': '',
+                    'description': f'Tài liệu học tập {subject} cho học sinh lớp {grade}'
+                }
+                for name in self._resource_names.get((subject_id, level), [])
+            ]
+            with self._lock:
+                resources = self._resources.setdefault(key, resources)
+        return resources
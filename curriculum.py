@@ -0,0 +1,44 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CurriculumStore:
+    """Chương trình học đọc một lần từ file JSON.
+
+    Mỗi (môn, lớp) có danh sách chủ đề theo thứ tự học, mỗi chủ đề gồm số giờ lý thuyết
+    ước tính và (nếu có) danh sách bài học. Các bảng tra được dựng sẵn khi tải nên
+    mọi truy vấn chỉ là tra dict.
+    """
+
+    def __init__(self, path='curriculum.json'):
+        self.path = path
+        self.default_topic_hours = 2.0
+        # (môn, lớp) -> {tên chủ đề: số giờ}
+        self._hours = {}
+        # (môn, lớp) -> [(tên chủ đề, [bài học])], chỉ các chủ đề đã có danh sách bài học
+        self._lessons = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logger.exception("Không đọc được chương trình học %s", path)
+            return
+
+        self.default_topic_hours = float(data.get('default_topic_hours', self.default_topic_hours))
+        for subject, grades in data.get('subjects', {}).items():
+            for grade, topics in grades.items():
+                key = (subject.lower(), str(grade))
+                self._hours[key] = {topic['name']: float(topic['hours']) for topic in topics}
+                self._lessons[key] = [
+                    (topic['name'], list(topic['lessons'])) for topic in topics if topic.get('lessons')
+                ]
+
+    def topic_hours(self, subject, grade, topic_name):
+        """Số giờ lý thuyết ước tính của một chủ đề (mặc định nếu chưa có trong chương trình)"""
+        return self._hours.get((subject.lower(), str(grade)), {}).get(topic_name, self.default_topic_hours)
+
+    def lesson_topics(self, subject, grade):
+        """Các chủ đề có danh sách bài học của (môn, lớp): [(tên chủ đề, [bài học])]"""
+        return self._lessons.get((subject.lower(), str(grade)), [])
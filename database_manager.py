@@ -1,80 +1,71 @@
-import pandas as pd
+import logging
 from typing import Dict, List, Optional
+from storage import StorageBackend, create_backend
+
+logger = logging.getLogger(__name__)
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, backend: Optional[StorageBackend] = None):
         try:
-            self.subjects_df = pd.read_excel('subject.xlsx')
-            self.grades_df = pd.read_excel('grade.xlsx')
-            self.topics_df = pd.read_excel('topic.xlsx')
-            self.theories_df = pd.read_excel('theory.xlsx')
-            self.practices_df = pd.read_excel('practice.xlsx')
+            # Mặc định dùng backend theo cấu hình STORAGE_BACKEND (Excel hoặc SQLite)
+            self.backend = backend or create_backend()
         except Exception as e:
-            print(f"[ERROR] Lỗi khi đọc file Excel: {str(e)}")
+            logger.error("Lỗi khi khởi tạo backend lưu trữ: %s", e)
             raise
 
     def get_subjects(self) -> List[Dict]:
         """Get all subjects"""
-        return self.subjects_df.to_dict('records')
+        return self.backend.read_all('subject')
 
     def get_grades(self) -> List[Dict]:
         """Get all grades"""
-        return self.grades_df.to_dict('records')
+        return self.backend.read_all('grade')
 
-    def get_topics_by_subject_grade(self, subject_id: int, grade_id: int) -> List[Dict]:
+    def get_topics_by_subject_grade(self, subject_id: str, grade_id: str) -> List[Dict]:
         """Get topics for a specific subject and grade"""
-        return self.topics_df[
-            (self.topics_df['ID_subject'] == subject_id) & 
-            (self.topics_df['ID_grade'] == grade_id)
-        ].to_dict('records')
+        return [
+            topic for topic in self.backend.find('topic', 'ID_subject', subject_id)
+            if topic['ID_grade'] == grade_id
+        ]
 
-    def get_theories_by_topic(self, topic_id: int) -> List[Dict]:
+    def get_theories_by_topic(self, topic_id: str) -> List[Dict]:
         """Get theories for a specific topic"""
-        return self.theories_df[
-            self.theories_df['ID_topic'] == topic_id
-        ].to_dict('records')
+        return self.backend.find('theory', 'ID_topic', topic_id)
 
-    def get_practices_by_theory(self, theory_id: int) -> List[Dict]:
+    def get_practices_by_theory(self, theory_id: str) -> List[Dict]:
         """Get practices for a specific theory"""
-        return self.practices_df[
-            self.practices_df['ID_theory'] == theory_id
-        ].to_dict('records')
+        return self.backend.find('practice', 'ID_theory', theory_id)
 
-    def get_subject_by_id(self, subject_id: int) -> Optional[Dict]:
+    def get_subject_by_id(self, subject_id: str) -> Optional[Dict]:
         """Get subject by ID"""
-        result = self.subjects_df[self.subjects_df['ID_subject'] == subject_id]
-        return result.to_dict('records')[0] if not result.empty else None
+        return self.backend.get('subject', subject_id)
 
-    def get_grade_by_id(self, grade_id: int) -> Optional[Dict]:
+    def get_grade_by_id(self, grade_id: str) -> Optional[Dict]:
         """Get grade by ID"""
-        result = self.grades_df[self.grades_df['ID_grade'] == grade_id]
-        return result.to_dict('records')[0] if not result.empty else None
+        return self.backend.get('grade', grade_id)
 
-    def get_topic_by_id(self, topic_id: int) -> Optional[Dict]:
+    def get_topic_by_id(self, topic_id: str) -> Optional[Dict]:
         """Get topic by ID"""
-        result = self.topics_df[self.topics_df['ID_topic'] == topic_id]
-        return result.to_dict('records')[0] if not result.empty else None
+        return self.backend.get('topic', topic_id)
 
-    def get_theory_by_id(self, theory_id: int) -> Optional[Dict]:
+    def get_theory_by_id(self, theory_id: str) -> Optional[Dict]:
         """Get theory by ID"""
-        result = self.theories_df[self.theories_df['ID_theory'] == theory_id]
-        return result.to_dict('records')[0] if not result.empty else None
+        return self.backend.get('theory', theory_id)
 
-    def get_practice_by_id(self, practice_id: int) -> Optional[Dict]:
+    def get_practice_by_id(self, practice_id: str) -> Optional[Dict]:
         """Get practice by ID"""
-        result = self.practices_df[self.practices_df['ID_practice'] == practice_id]
-        return result.to_dict('records')[0] if not result.empty else None
+        return self.backend.get('practice', practice_id)
 
-    def get_learning_path(self, subject_id: int, grade_id: int) -> Dict:
+    def get_learning_path(self, subject_id: str, grade_id: str) -> Dict:
         """Get complete learning path for a subject and grade"""
         subject = self.get_subject_by_id(subject_id)
         grade = self.get_grade_by_id(grade_id)
-        
+
         if not subject or not grade:
             return None
 
         topics = self.get_topics_by_subject_grade(subject_id, grade_id)
-        
+
         learning_path = {
             'subject': subject,
             'grade': grade,
@@ -86,7 +77,7 @@ class DatabaseManager:
                 'topic': topic,
                 'theories': []
             }
-            
+
             theories = self.get_theories_by_topic(topic['ID_topic'])
             for theory in theories:
                 theory_data = {
@@ -94,7 +85,7 @@ class DatabaseManager:
                     'practices': self.get_practices_by_theory(theory['ID_theory'])
                 }
                 topic_data['theories'].append(theory_data)
-            
+
             learning_path['topics'].append(topic_data)
 
-        return learning_path 
\ No newline at end of file
+        return learning_path
\ No newline at end of file
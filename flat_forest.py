@@ -0,0 +1,110 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Các mảng lưu trong bundle mô hình (được ánh xạ bộ nhớ khi tải với mmap_mode='r')
+ARRAY_NAMES = ('feature', 'threshold', 'children', 'value', 'roots')
+
+# Số dòng xử lý mỗi lượt khi dự đoán theo lô, để mảng trung gian (dòng x cây) không quá lớn
+BLOCK_ROWS = 4096
+
+
+class FlatForest:
+    """Rừng cây hồi quy dạng mảng phẳng để dự đoán không qua pandas/scikit-learn.
+
+    Nút của mọi cây nằm nối tiếp trong các mảng feature, threshold, value; con trái và
+    con phải của nút i là children[2i] và children[2i + 1]; roots là chỉ số nút gốc của
+    từng cây. Nút lá trỏ về chính nó nên mọi cây được duyệt cùng lúc trong đúng max_depth
+    bước. Kết quả giống hệt RandomForestRegressor.predict: đặc trưng được ép về float32
+    như scikit-learn, giá trị lá được cộng lần lượt theo thứ tự cây rồi chia cho số cây.
+    Đầu vào không được chứa NaN (các hàm dự đoán đã loại hồ sơ thiếu giá trị từ trước).
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_estimator(cls, model):
+        """Tạo từ RandomForestRegressor (hoặc rừng hồi quy một đầu ra tương tự); None nếu không hỗ trợ"""
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators or getattr(model, 'n_outputs_', 1) != 1:
+            return None
+        if not all(hasattr(tree, 'tree_') for tree in estimators):
+            return None
+
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            n = tree.node_count
+            own = np.arange(offset, offset + n, dtype=np.int64)
+            is_leaf = tree.children_left < 0
+            left = np.where(is_leaf, own, tree.children_left + offset)
+            right = np.where(is_leaf, own, tree.children_right + offset)
+            children.append(np.stack([left, right], axis=1).ravel())
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold.astype(np.float64))
+            values.append(tree.value[:, 0, 0].astype(np.float64))
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n
+        return cls(
+            np.concatenate(features).astype(np.int32), np.concatenate(thresholds),
+            np.concatenate(children).astype(np.int32), np.concatenate(values),
+            np.array(roots, dtype=np.int32), max_depth
+        )
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(*(arrays[name] for name in ARRAY_NAMES), arrays['max_depth'])
+
+    def to_arrays(self):
+        arrays = {name: getattr(self, name) for name in ARRAY_NAMES}
+        arrays['max_depth'] = self.max_depth
+        return arrays
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) <= BLOCK_ROWS:
+            return self._predict_block(X)
+        return np.concatenate([self._predict_block(X[start:start + BLOCK_ROWS])
+                               for start in range(0, len(X), BLOCK_ROWS)])
+
+    def _predict_block(self, X):
+        n_rows, n_features = X.shape
+        flat = np.ascontiguousarray(X).ravel()
+        row_base = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees))
+        for _ in range(self.max_depth):
+            # Như scikit-learn: đi sang trái khi X <= ngưỡng
+            go_right = flat[row_base + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+        # cumsum cộng lần lượt theo thứ tự cây như vòng lặp của scikit-learn
+        total = np.cumsum(self.value[nodes], axis=1)[:, -1]
+        return total / self.n_trees
+
+    def matches(self, model, n_features, n_samples=512, seed=0):
+        """Kiểm tra kết quả trùng từng bit với model.predict trên các điểm ngẫu nhiên và ngưỡng của cây"""
+        rng = np.random.default_rng(seed)
+        X = rng.uniform(-1, 21, size=(n_samples, n_features))
+        # Thêm các điểm nằm đúng trên ngưỡng để kiểm tra phép so sánh <=
+        internal = self.children[0::2] != np.arange(len(self.feature))
+        picks = rng.choice(np.flatnonzero(internal), size=min(n_samples, int(internal.sum())), replace=False)
+        edge = X[:len(picks)].copy()
+        edge[np.arange(len(picks)), self.feature[picks]] = self.threshold[picks]
+        X = np.vstack([X, edge])
+        return np.array_equal(self.predict(X), np.asarray(model.predict(X), dtype=np.float64))
@@ -1,188 +1,183 @@
-import pandas as pd
-import numpy as np
+import argparse
+import json
+import logging
+import os
 from datetime import datetime
 
-def generate_training_data():
-    # Tạo dữ liệu cơ bản
-    subjects = ['math', 'physics', 'chemistry']
-    grades = ['10', '11', '12']
-    learning_styles = ['practical', 'theory', 'combined']
-    
-    # Tạo các mẫu dữ liệu đa dạng
-    data = []
-    
-    # 1. Mẫu cho học sinh có điểm số thấp (3.0 - 5.0)
-    for subject in subjects:
-        for grade in grades:
-            for style in learning_styles:
-                # Thời gian học ngắn (1-2 giờ/ngày)
-                data.append({
-                    'subject': subject,
-                    'grade': grade,
-                    'current_score': round(np.random.uniform(3.0, 4.0), 1),
-                    'target_score': round(np.random.uniform(5.0, 6.0), 1),
-                    'duration_weeks': np.random.choice([12, 14, 16]),
-                    'daily_study_hours': round(np.random.uniform(1.0, 2.0), 1),
-                    'learning_style': style,
-                    'success_rate': round(np.random.uniform(45.0, 55.0), 1)
-                })
-                
-                # Thời gian học trung bình (2-3 giờ/ngày)
-                data.append({
-                    'subject': subject,
-                    'grade': grade,
-                    'current_score': round(np.random.uniform(3.5, 4.5), 1),
-                    'target_score': round(np.random.uniform(5.5, 6.5), 1),
-                    'duration_weeks': np.random.choice([10, 12, 14]),
-                    'daily_study_hours': round(np.random.uniform(2.0, 3.0), 1),
-                    'learning_style': style,
-                    'success_rate': round(np.random.uniform(55.0, 65.0), 1)
-                })
-    
-    # 2. Mẫu cho học sinh có điểm số trung bình (5.0 - 7.0)
-    for subject in subjects:
-        for grade in grades:
-            for style in learning_styles:
-                # Thời gian học trung bình (2-3 giờ/ngày)
-                data.append({
-                    'subject': subject,
-                    'grade': grade,
-                    'current_score': round(np.random.uniform(5.0, 6.0), 1),
-                    'target_score': round(np.random.uniform(7.0, 8.0), 1),
-                    'duration_weeks': np.random.choice([8, 10, 12]),
-                    'daily_study_hours': round(np.random.uniform(2.0, 3.0), 1),
-                    'learning_style': style,
-                    'success_rate': round(np.random.uniform(65.0, 75.0), 1)
-                })
-                
-                # Thời gian học nhiều (3-4 giờ/ngày)
-                data.append({
-                    'subject': subject,
-                    'grade': grade,
-                    'current_score': round(np.random.uniform(5.5, 6.5), 1),
-                    'target_score': round(np.random.uniform(7.5, 8.5), 1),
-                    'duration_weeks': np.random.choice([6, 8, 10]),
-                    'daily_study_hours': round(np.random.uniform(3.0, 4.0), 1),
-                    'learning_style': style,
-                    'success_rate': round(np.random.uniform(75.0, 85.0), 1)
-                })
-    
-    # 3. Mẫu cho học sinh có điểm số khá (7.0 - 8.5)
-    for subject in subjects:
-        for grade in grades:
-            for style in learning_styles:
-                # Thời gian học trung bình (2-3 giờ/ngày)
-                data.append({
-                    'subject': subject,
-                    'grade': grade,
-                    'current_score': round(np.random.uniform(7.0, 7.5), 1),
-                    'target_score': round(np.random.uniform(8.5, 9.0), 1),
-                    'duration_weeks': np.random.choice([6, 8, 10]),
-                    'daily_study_hours': round(np.random.uniform(2.0, 3.0), 1),
-                    'learning_style': style,
-                    'success_rate': round(np.random.uniform(80.0, 90.0), 1)
-                })
-                
-                # Thời gian học nhiều (3-4 giờ/ngày)
-                data.append({
-                    'subject': subject,
-                    'grade': grade,
-                    'current_score': round(np.random.uniform(7.5, 8.0), 1),
-                    'target_score': round(np.random.uniform(9.0, 9.5), 1),
-                    'duration_weeks': np.random.choice([4, 6, 8]),
-                    'daily_study_hours': round(np.random.uniform(3.0, 4.0), 1),
-                    'learning_style': style,
-                    'success_rate': round(np.random.uniform(85.0, 95.0), 1)
-                })
-    
-    # 4. Mẫu cho học sinh có điểm số giỏi (8.5 - 10.0)
-    for subject in subjects:
-        for grade in grades:
-            for style in learning_styles:
-                # Thời gian học trung bình (2-3 giờ/ngày)
-                data.append({
-                    'subject': subject,
-                    'grade': grade,
-                    'current_score': round(np.random.uniform(8.5, 9.0), 1),
-                    'target_score': round(np.random.uniform(9.5, 10.0), 1),
-                    'duration_weeks': np.random.choice([4, 6, 8]),
-                    'daily_study_hours': round(np.random.uniform(2.0, 3.0), 1),
-                    'learning_style': style,
-                    'success_rate': round(np.random.uniform(90.0, 95.0), 1)
-                })
-                
-                # Thời gian học nhiều (3-4 giờ/ngày)
-                data.append({
-                    'subject': subject,
-                    'grade': grade,
-                    'current_score': round(np.random.uniform(9.0, 9.5), 1),
-                    'target_score': 10.0,
-                    'duration_weeks': np.random.choice([2, 4, 6]),
-                    'daily_study_hours': round(np.random.uniform(3.0, 4.0), 1),
-                    'learning_style': style,
-                    'success_rate': round(np.random.uniform(95.0, 100.0), 1)
-                })
-    
-    # 5. Thêm một số trường hợp đặc biệt
-    special_cases = [
-        # Trường hợp học cấp tốc (thời gian ngắn, cường độ cao)
-        {
-            'subject': 'math',
-            'grade': '12',
-            'current_score': 7.0,
-            'target_score': 9.0,
-            'duration_weeks': 4,
-            'daily_study_hours': 4.0,
-            'learning_style': 'combined',
-            'success_rate': 85.0
-        },
-        # Trường hợp học từ từ (thời gian dài, cường độ thấp)
-        {
-            'subject': 'physics',
-            'grade': '10',
-            'current_score': 4.0,
-            'target_score': 6.0,
-            'duration_weeks': 20,
-            'daily_study_hours': 1.5,
-            'learning_style': 'theory',
-            'success_rate': 60.0
-        },
-        # Trường hợp học thực hành nhiều
-        {
-            'subject': 'chemistry',
-            'grade': '11',
-            'current_score': 6.0,
-            'target_score': 8.0,
-            'duration_weeks': 12,
-            'daily_study_hours': 3.0,
-            'learning_style': 'practical',
-            'success_rate': 75.0
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SUBJECTS = ['math', 'physics', 'chemistry']
+GRADES = ['10', '11', '12']
+LEARNING_STYLES = ['practical', 'theory', 'combined']
+
+COLUMNS = [
+    'subject', 'grade', 'current_score', 'target_score',
+    'duration_weeks', 'daily_study_hours', 'learning_style', 'success_rate'
+]
+
+# Các nhóm học sinh: khoảng điểm hiện tại/mục tiêu, số tuần có thể chọn, số giờ mỗi ngày
+# và tỷ lệ thành công. Mỗi mẫu thuộc một nhóm (chọn theo weight, mặc định như nhau).
+DEFAULT_PROFILES = [
+    # Điểm thấp (3.0 - 5.0): học ít và học trung bình
+    {'current_score': (3.0, 4.0), 'target_score': (5.0, 6.0), 'duration_weeks': (12, 14, 16),
+     'daily_study_hours': (1.0, 2.0), 'success_rate': (45.0, 55.0)},
+    {'current_score': (3.5, 4.5), 'target_score': (5.5, 6.5), 'duration_weeks': (10, 12, 14),
+     'daily_study_hours': (2.0, 3.0), 'success_rate': (55.0, 65.0)},
+    # Điểm trung bình (5.0 - 7.0)
+    {'current_score': (5.0, 6.0), 'target_score': (7.0, 8.0), 'duration_weeks': (8, 10, 12),
+     'daily_study_hours': (2.0, 3.0), 'success_rate': (65.0, 75.0)},
+    {'current_score': (5.5, 6.5), 'target_score': (7.5, 8.5), 'duration_weeks': (6, 8, 10),
+     'daily_study_hours': (3.0, 4.0), 'success_rate': (75.0, 85.0)},
+    # Điểm khá (7.0 - 8.5)
+    {'current_score': (7.0, 7.5), 'target_score': (8.5, 9.0), 'duration_weeks': (6, 8, 10),
+     'daily_study_hours': (2.0, 3.0), 'success_rate': (80.0, 90.0)},
+    {'current_score': (7.5, 8.0), 'target_score': (9.0, 9.5), 'duration_weeks': (4, 6, 8),
+     'daily_study_hours': (3.0, 4.0), 'success_rate': (85.0, 95.0)},
+    # Điểm giỏi (8.5 - 10.0)
+    {'current_score': (8.5, 9.0), 'target_score': (9.5, 10.0), 'duration_weeks': (4, 6, 8),
+     'daily_study_hours': (2.0, 3.0), 'success_rate': (90.0, 95.0)},
+    {'current_score': (9.0, 9.5), 'target_score': (10.0, 10.0), 'duration_weeks': (2, 4, 6),
+     'daily_study_hours': (3.0, 4.0), 'success_rate': (95.0, 100.0)},
+]
+
+# Số mẫu mặc định, xấp xỉ bộ dữ liệu cũ
+DEFAULT_ROWS = 220
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+class _ProfileTable:
+    """Các nhóm học sinh dưới dạng mảng để lấy mẫu cả cột một lần"""
+
+    RANGES = ['current_score', 'target_score', 'daily_study_hours', 'success_rate']
+
+    def __init__(self, profiles):
+        if not profiles:
+            raise ValueError("Cần ít nhất một nhóm học sinh")
+        self.ranges = {
+            col: np.array([profile[col] for profile in profiles], dtype=np.float64)
+            for col in self.RANGES
+        }
+        # Số lựa chọn số tuần có thể khác nhau giữa các nhóm: đệm bằng lựa chọn cuối
+        choices = [list(profile['duration_weeks']) for profile in profiles]
+        width = max(len(c) for c in choices)
+        self.durations = np.array([c + [c[-1]] * (width - len(c)) for c in choices], dtype=np.int64)
+        self.n_durations = np.array([len(c) for c in choices], dtype=np.int64)
+        weights = np.array([profile.get('weight', 1.0) for profile in profiles], dtype=np.float64)
+        self.weights = weights / weights.sum()
+
+    def sample(self, n, rng):
+        group = rng.choice(len(self.weights), size=n, p=self.weights)
+        columns = {
+            'subject': np.take(SUBJECTS, rng.integers(0, len(SUBJECTS), n)),
+            'grade': np.take(GRADES, rng.integers(0, len(GRADES), n)),
         }
-    ]
-    data.extend(special_cases)
-    
-    # Tạo DataFrame và lưu vào file CSV
-    df = pd.DataFrame(data)
-    
-    # Sắp xếp dữ liệu theo subject, grade và current_score
-    df = df.sort_values(['subject', 'grade', 'current_score'])
-    
-    # Lưu file với timestamp
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f'training_data_{timestamp}.csv'
-    df.to_csv(filename, index=False)
-    print(f"Đã tạo file {filename} với {len(df)} mẫu dữ liệu")
-    
-    # In thống kê cơ bản
-    print("\nThống kê dữ liệu:")
-    print(f"Số lượng mẫu theo môn học:\n{df['subject'].value_counts()}")
-    print(f"\nSố lượng mẫu theo lớp:\n{df['grade'].value_counts()}")
-    print(f"\nSố lượng mẫu theo phong cách học:\n{df['learning_style'].value_counts()}")
-    print("\nThống kê điểm số:")
-    print(df[['current_score', 'target_score', 'success_rate']].describe())
-    
-    return filename  # Trả về tên file đã tạo
+        for col in self.RANGES:
+            low, high = self.ranges[col][group, 0], self.ranges[col][group, 1]
+            columns[col] = np.round(low + (high - low) * rng.random(n), 1)
+        pick = (rng.random(n) * self.n_durations[group]).astype(np.int64)
+        columns['duration_weeks'] = self.durations[group, pick]
+        columns['learning_style'] = np.take(LEARNING_STYLES, rng.integers(0, len(LEARNING_STYLES), n))
+        return {col: columns[col] for col in COLUMNS}
+
+
+def generate_columns(n, seed=None, profiles=None):
+    """Tạo n mẫu dữ liệu huấn luyện, trả về dict tên cột -> mảng numpy"""
+    rng = np.random.default_rng(seed)
+    return _ProfileTable(profiles or DEFAULT_PROFILES).sample(n, rng)
+
+
+def _iter_chunks(n, chunk_size, rng, table):
+    for start in range(0, n, chunk_size):
+        yield pd.DataFrame(table.sample(min(chunk_size, n - start), rng), columns=COLUMNS)
+
+
+def _write_parquet(path, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Cần cài pyarrow để ghi file Parquet (pip install pyarrow)")
+    writer = None
+    try:
+        for df in chunks:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_csv(path, chunks):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        for i, df in enumerate(chunks):
+            df.to_csv(f, index=False, header=(i == 0))
+
+
+def generate_training_data(n=DEFAULT_ROWS, seed=None, output_path=None, fmt=None,
+                           chunk_size=DEFAULT_CHUNK_SIZE, profiles=None):
+    """Tạo dữ liệu huấn luyện giả lập và ghi ra file CSV hoặc Parquet.
+
+    Dữ liệu được tạo và ghi theo từng khối chunk_size dòng nên không giữ cả bộ dữ liệu
+    trong bộ nhớ. Cùng seed và chunk_size cho cùng một file. Không truyền output_path thì
+    tên file có timestamp như trước; định dạng lấy theo đuôi file nếu không truyền fmt.
+    Trả về đường dẫn file đã tạo.
+    """
+    if n <= 0:
+        raise ValueError("Số mẫu phải lớn hơn 0")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size phải lớn hơn 0")
+    if output_path is None:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_path = f"training_data_{timestamp}.{'parquet' if fmt == 'parquet' else 'csv'}"
+    if fmt is None:
+        fmt = 'parquet' if output_path.endswith('.parquet') else 'csv'
+    if fmt not in ('csv', 'parquet'):
+        raise ValueError(f"Định dạng không hỗ trợ: {fmt}")
+
+    rng = np.random.default_rng(seed)
+    chunks = _iter_chunks(n, chunk_size, rng, _ProfileTable(profiles or DEFAULT_PROFILES))
+    # Ghi ra file tạm rồi đổi tên để nơi đọc (huấn luyện lại) không gặp file ghi dở
+    tmp_path = output_path + '.tmp'
+    try:
+        if fmt == 'parquet':
+            _write_parquet(tmp_path, chunks)
+        else:
+            _write_csv(tmp_path, chunks)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    logger.info("Đã tạo file %s với %d mẫu dữ liệu", output_path, n)
+    return output_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tạo dữ liệu huấn luyện giả lập')
+    parser.add_argument('-n', '--rows', type=int, default=DEFAULT_ROWS, help='Số mẫu')
+    parser.add_argument('--seed', type=int, default=None, help='Seed để tạo lại đúng bộ dữ liệu')
+    parser.add_argument('-o', '--output', default=None, help='File kết quả (.csv hoặc .parquet)')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Số dòng mỗi khối ghi')
+    parser.add_argument('--profiles', default=None,
+                        help='File JSON danh sách nhóm học sinh (cùng cấu trúc DEFAULT_PROFILES)')
+    args = parser.parse_args(argv)
+
+    profiles = None
+    if args.profiles:
+        with open(args.profiles, encoding='utf-8') as f:
+            profiles = json.load(f)
+    filename = generate_training_data(args.rows, args.seed, args.output, args.format,
+                                      args.chunk_size, profiles)
+    print(f"File đã được tạo: {filename}")
+
 
 if __name__ == "__main__":
-    filename = generate_training_data()
-    print(f"\nFile đã được tạo: {filename}") 
\ No newline at end of file
+    from logging_config import setup_logging
+    setup_logging()
+    main()
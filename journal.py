@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class MutationJournal:
+    """Nhật ký ghi trước (append-only), mỗi thay đổi là một dòng JSON đã được fsync.
+
+    Khi gộp vào file dữ liệu, nhật ký hiện tại được chuyển sang file .compacting;
+    các thay đổi mới tiếp tục được ghi vào một file nhật ký mới.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rotated_path = path + '.compacting'
+        self._lock = threading.Lock()
+        self._file = None
+
+    def append(self, entry):
+        """Ghi một thay đổi và chỉ trả về khi dữ liệu đã nằm trên đĩa"""
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def read_all(self):
+        """Đọc lại các thay đổi chưa được gộp (file đang gộp dở trước, rồi đến nhật ký hiện tại)"""
+        entries = []
+        for path in (self.rotated_path, self.path):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # Dòng cuối bị ghi dở khi tiến trình dừng đột ngột
+                        logger.warning("Bỏ qua dòng nhật ký không hợp lệ trong %s", path)
+                        break
+        return entries
+
+    def rotate(self):
+        """Chuyển nhật ký hiện tại sang file .compacting để bắt đầu gộp"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if not os.path.exists(self.path):
+                return
+            if os.path.exists(self.rotated_path):
+                # Lần gộp trước chưa hoàn tất: nối tiếp để file .compacting chứa mọi thay đổi còn chờ
+                with open(self.path, encoding='utf-8') as src, \
+                        open(self.rotated_path, 'a', encoding='utf-8') as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+
+    def discard_rotated(self):
+        """Xóa file .compacting sau khi đã gộp xong vào file dữ liệu"""
+        with self._lock:
+            if os.path.exists(self.rotated_path):
+                os.remove(self.rotated_path)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
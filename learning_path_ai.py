@@ -1,69 +1,246 @@
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
+import sklearn
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 import joblib
 from datetime import datetime, timedelta
-import traceback
+import argparse
+import sys
+import copy
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
+from plan_cache import PlanCache
+from content_index import ContentIndex
+from curriculum import CurriculumStore
+from training_data import load_training_data
+from online_model import OnlineRegressor
+from flat_forest import FlatForest
+from success_lut import DEFAULT_AXES, SuccessRateLUT
+from storage import TABLES, create_backend
 
-class LearningPathAI:
-    def __init__(self):
-        self.model = RandomForestRegressor(
+logger = logging.getLogger(__name__)
+
+# Phiên bản định dạng file mô hình (tăng khi cấu trúc bundle thay đổi)
+MODEL_BUNDLE_VERSION = 2
+
+# Thứ tự đặc trưng đưa vào mô hình
+FEATURES = [
+    'subject', 'grade', 'current_score', 'target_score',
+    'duration_weeks', 'daily_study_hours', 'learning_style'
+]
+
+
+# Các bảng nội dung dùng để dựng lộ trình
+CONTENT_TABLES = ('theory', 'practice', 'topic', 'subject', 'grade')
+
+CATEGORICAL_FEATURES = [FEATURES.index(col) for col in ('subject', 'grade', 'learning_style')]
+
+# Các loại estimator: 'random_forest' (mặc định), 'hist_gradient_boosting', 'linear'
+# (hồi quy Ridge làm mốc so sánh) hoặc 'sgd' (học tăng dần bằng partial_fit)
+ESTIMATOR_KINDS = ('random_forest', 'hist_gradient_boosting', 'linear', 'sgd')
+
+
+def _hist_gradient_boosting_class():
+    try:
+        from sklearn.ensemble import HistGradientBoostingRegressor
+    except ImportError:
+        # scikit-learn < 1.0 cần bật tính năng thử nghiệm
+        from sklearn.experimental import enable_hist_gradient_boosting  # noqa: F401
+        from sklearn.ensemble import HistGradientBoostingRegressor
+    return HistGradientBoostingRegressor
+
+
+def check_estimator_kind(kind):
+    """Báo ValueError nếu kind không phải một loại trong ESTIMATOR_KINDS"""
+    if kind not in ESTIMATOR_KINDS:
+        raise ValueError(f"Loại mô hình không hợp lệ: {kind}. Chỉ chấp nhận: {', '.join(ESTIMATOR_KINDS)}")
+    return kind
+
+
+def make_estimator(kind='random_forest', n_jobs=None):
+    """Tạo estimator chưa huấn luyện theo loại.
+
+    n_jobs là số luồng khi huấn luyện Random Forest (mặc định MODEL_N_JOBS, -1 = mọi lõi).
+    """
+    check_estimator_kind(kind)
+    if n_jobs is None:
+        n_jobs = int(os.environ.get('MODEL_N_JOBS', '-1'))
+    if kind == 'random_forest':
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(
             n_estimators=100,
             max_depth=10,
+            random_state=42,
+            n_jobs=n_jobs
+        )
+    if kind == 'hist_gradient_boosting':
+        return _hist_gradient_boosting_class()(
+            categorical_features=CATEGORICAL_FEATURES,
             random_state=42
         )
-        self.label_encoders = {
-            'subject': LabelEncoder(),
-            'learning_style': LabelEncoder(),
-            'grade': LabelEncoder()
-        }
-        self.is_trained = False
+    if kind == 'linear':
+        from sklearn.compose import ColumnTransformer
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+        encode = ColumnTransformer(
+            [('categorical', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES)],
+            remainder=StandardScaler()
+        )
+        return make_pipeline(encode, Ridge(alpha=1.0))
+    # 'sgd'
+    return OnlineRegressor(categorical_features=CATEGORICAL_FEATURES)
+
+
+def _file_fingerprint(path):
+    """Tính SHA-256 của file dữ liệu huấn luyện"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LearningPathAI:
+    def __init__(self, estimator=None, backend=None):
+        # Loại estimator lấy từ tham số hoặc MODEL_ESTIMATOR
+        self.estimator_kind = check_estimator_kind(estimator or os.environ.get('MODEL_ESTIMATOR', 'random_forest'))
+        self._init_model_state()
+        # Khung lộ trình đã tạo, dùng lại cho các yêu cầu có cùng tham số chuẩn hóa
+        self.plan_cache = PlanCache(
+            max_entries=int(os.environ.get('PLAN_CACHE_SIZE', 256)),
+            ttl=float(os.environ.get('PLAN_CACHE_TTL', 3600))
+        )
+        # Khóa để chỉ một luồng tải/huấn luyện/thay mô hình tại một thời điểm
+        self._model_lock = threading.Lock()
+        # Bảng tra tỷ lệ thành công dựng sẵn (tùy chọn, đặt đường dẫn bằng SUCCESS_RATE_LUT)
+        self.lut_path = os.environ.get('SUCCESS_RATE_LUT')
+        self.lut = None
         
         # Giới hạn môn học và cấp lớp
         self.ALLOWED_SUBJECTS = ['math', 'physics', 'chemistry']
         self.ALLOWED_GRADES = ['10', '11', '12']
         
-        # Đọc dữ liệu từ các file Excel
+        # Bảng nội dung học tập (DataFrame theo tên bảng) và chỉ mục dựng từ chúng, đọc qua
+        # backend lưu trữ để thấy cả các dòng còn trong nhật ký chưa được gộp vào file .xlsx
+        self.backend = backend
         self.excel_data = {}
+        self.content_index = ContentIndex(self.excel_data)
+        # (chỉ mục nội dung đã dùng để tính, {(môn, lớp, cấp độ) -> kết quả estimate_total_time})
+        self._time_estimates = (self.content_index, {})
+        if backend is not None:
+            self.load_content()
+        # Chương trình học (chủ đề, bài học, số giờ ước tính), đổi file bằng CURRICULUM_PATH
+        self.curriculum = CurriculumStore(os.environ.get('CURRICULUM_PATH', 'curriculum.json'))
+        
+    def load_content(self, read_rows=None):
+        """Dựng lại excel_data và chỉ mục nội dung từ read_rows(table) -> danh sách dòng (dict).
+
+        Mặc định đọc từ self.backend; chỉ mục mới được thay vào bằng một lần gán.
+        """
+        read_rows = read_rows or self.backend.read_all
+        excel_data = {}
+        for table in CONTENT_TABLES:
+            try:
+                excel_data[table] = pd.DataFrame(read_rows(table), columns=TABLES[table]['columns'])
+            except Exception:
+                logger.exception("Lỗi khi đọc bảng %s", table)
+        content_index = ContentIndex(excel_data)
+        self.excel_data = excel_data
+        self.content_index = content_index
+        self._time_estimates = (content_index, {})
+        logger.debug("Đã nạp nội dung học tập: %s",
+                     {table: len(df) for table, df in excel_data.items()})
+        return content_index
+
+    def _init_model_state(self):
+        """Tạo estimator và encoder mới chưa huấn luyện"""
+        self.model = make_estimator(self.estimator_kind)
+        self.label_encoders = {
+            'subject': LabelEncoder(),
+            'learning_style': LabelEncoder(),
+            'grade': LabelEncoder()
+        }
+        # Bảng mã giá trị phân loại -> số, dựng từ các encoder đã fit (dùng khi dự đoán)
+        self.category_codes = {}
+        # Thông tin về lần huấn luyện (dấu vân tay dữ liệu, điểm đánh giá), được lưu cùng mô hình
+        self.training_metadata = {}
+        # Rừng cây dạng mảng phẳng để dự đoán nhanh (None nếu estimator không phải rừng cây)
+        self.inference = None
+        # (estimator, bảng mã, hàm dự đoán) đang phục vụ, luôn được thay bằng một lần gán
+        self._live = None
+        self.is_trained = False
+
+    def _build_inference(self, model, arrays=None):
+        """Dựng FlatForest cho model (từ mảng đã lưu nếu có) và chỉ dùng khi khớp từng bit với model.predict"""
+        if os.environ.get('FLAT_INFERENCE', '1') == '0':
+            return None
         try:
-            print("\n[DEBUG] Đang đọc dữ liệu từ các file Excel...")
-            
-            # Đọc file theory.xlsx
-            if os.path.exists('theory.xlsx'):
-                self.excel_data['theory'] = pd.read_excel('theory.xlsx')
-                print("[DEBUG] Đã đọc theory.xlsx")
-            
-            # Đọc file practice.xlsx
-            if os.path.exists('practice.xlsx'):
-                self.excel_data['practice'] = pd.read_excel('practice.xlsx')
-                print("[DEBUG] Đã đọc practice.xlsx")
-            
-            # Đọc file topic.xlsx
-            if os.path.exists('topic.xlsx'):
-                self.excel_data['topic'] = pd.read_excel('topic.xlsx')
-                print("[DEBUG] Đã đọc topic.xlsx")
-            
-            # Đọc file subject.xlsx
-            if os.path.exists('subject.xlsx'):
-                self.excel_data['subject'] = pd.read_excel('subject.xlsx')
-                print("[DEBUG] Đã đọc subject.xlsx")
-            
-            # Đọc file grade.xlsx
-            if os.path.exists('grade.xlsx'):
-                self.excel_data['grade'] = pd.read_excel('grade.xlsx')
-                print("[DEBUG] Đã đọc grade.xlsx")
-            
-            print("[DEBUG] Đã đọc xong tất cả các file Excel")
-            
+            inference = FlatForest.from_arrays(arrays) if arrays else FlatForest.from_estimator(model)
+            if inference is None:
+                return None
+            if not inference.matches(model, len(FEATURES)):
+                logger.warning("Dự đoán bằng mảng phẳng không khớp model.predict, dùng model.predict")
+                return None
+            return inference
+        except Exception:
+            logger.exception("Không dựng được rừng cây dạng mảng phẳng, dùng model.predict")
+            return None
+
+    def _publish(self, inference=None):
+        """Đưa estimator, bảng mã và hàm dự đoán hiện tại vào phục vụ.
+
+        Người đọc lấy cả bộ qua self._live nên không bao giờ thấy estimator mới
+        đi cùng bảng mã cũ khi mô hình được thay trong lúc đang có request.
+        """
+        self.inference = inference or self._build_inference(self.model)
+        predict = self.inference.predict if self.inference is not None else self.model.predict
+        lut_predict = self._lut_predict(predict)
+        self._live = (self.model, self.category_codes, lut_predict or predict)
+
+    def model_id(self):
+        """Mã nhận diện mô hình hiện tại, để bảng tra dựng từ mô hình khác không bị dùng nhầm"""
+        keys = ('estimator_kind', 'training_fingerprint', 'trained_at', 'n_samples', 'online_updates')
+        identity = {key: self.training_metadata.get(key) for key in keys}
+        identity['category_codes'] = {col: sorted(map(str, codes)) for col, codes in self.category_codes.items()}
+        payload = json.dumps(identity, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+    def _lut_predict(self, predict):
+        """Hàm dự đoán bằng bảng tra (đầu vào ngoài lưới dùng predict) nếu có bảng tra dựng từ đúng mô hình hiện tại"""
+        if not self.lut_path:
+            return None
+        model_id = self.model_id()
+        try:
+            if self.lut is None or self.lut.model_id != model_id:
+                # Bảng tra có thể vừa được dựng lại cho mô hình mới
+                self.lut = SuccessRateLUT.load(self.lut_path)
         except Exception as e:
-            print(f"\n[ERROR] Lỗi khi đọc file Excel: {str(e)}")
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
-            self.excel_data = {}
-        
+            logger.warning("Không tải được bảng tra %s (%s)", self.lut_path, e)
+            self.lut = None
+            return None
+        if self.lut.model_id != model_id:
+            logger.warning("Bảng tra %s được dựng từ mô hình khác, dùng mô hình để dự đoán", self.lut_path)
+            return None
+        logger.info("Dự đoán tỷ lệ thành công bằng bảng tra %s (sai số lớn nhất %.4f)",
+                    self.lut_path, self.lut.metadata.get('max_abs_error', float('nan')))
+        lut = self.lut
+        return lambda X: lut.predict(X, fallback=predict)
+
+    def build_lut(self, path, axes=None):
+        """Dựng bảng tra tỷ lệ thành công từ mô hình hiện tại (xem SuccessRateLUT.build)"""
+        if not self.ensure_model():
+            raise RuntimeError("Mô hình chưa sẵn sàng")
+        model, category_codes, _ = self._live
+        predict = self.inference.predict if self.inference is not None else model.predict
+        category_sizes = {col: len(codes) for col, codes in category_codes.items()}
+        return SuccessRateLUT.build(predict, FEATURES, category_sizes, self.model_id(), path, axes)
+
     def _validate_input(self, subject, grade):
         """Kiểm tra tính hợp lệ của đầu vào"""
         if subject not in self.ALLOWED_SUBJECTS:
@@ -71,32 +248,29 @@ class LearningPathAI:
         if grade not in self.ALLOWED_GRADES:
             raise ValueError(f"Cấp lớp không hợp lệ. Chỉ chấp nhận: {', '.join(self.ALLOWED_GRADES)}")
         
-    def train(self, training_data_path='training_data.csv'):
-        """Huấn luyện mô hình với dữ liệu đã có"""
+    def train(self, training_data_path='training_data.csv', model_path='learning_path_model.joblib', save=True,
+              sample_frac=None, max_rows=None):
+        """Huấn luyện mô hình với dữ liệu đã có (save=False để chỉ huấn luyện, không ghi file).
+
+        training_data_path có thể là CSV, Parquet hoặc Feather; sample_frac/max_rows lấy mẫu
+        khi dữ liệu quá lớn (xem training_data.load_training_data).
+        """
         try:
-            print("\nBắt đầu huấn luyện mô hình...")
-            
-            # Đọc dữ liệu huấn luyện
-            df = pd.read_csv(training_data_path)
-            print(f"Đã đọc {len(df)} mẫu dữ liệu huấn luyện")
+            logger.info("Bắt đầu huấn luyện mô hình...")
             
-            # Kiểm tra dữ liệu
-            required_columns = ['subject', 'grade', 'current_score', 'target_score',
-                              'duration_weeks', 'daily_study_hours', 'learning_style', 'success_rate']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                raise ValueError(f"Thiếu các cột: {', '.join(missing_columns)}")
+            # Đọc dữ liệu huấn luyện (chỉ các cột cần thiết, đã kiểm tra đủ cột)
+            df = load_training_data(training_data_path, sample_frac=sample_frac, max_rows=max_rows)
+            logger.info("Đã đọc %d mẫu dữ liệu huấn luyện", len(df))
             
-            # Fit các encoder với dữ liệu huấn luyện
-            print("\nĐang fit các encoder...")
+            # Fit các encoder với dữ liệu huấn luyện (các cột phân loại có kiểu category
+            # nên chỉ cần fit trên danh sách giá trị)
+            logger.debug("Đang fit các encoder...")
             for col, encoder in self.label_encoders.items():
-                print(f"Fitting encoder cho {col}...")
-                print(f"Unique values: {df[col].unique()}")
-                encoder.fit(df[col])
-                print(f"Encoder classes: {encoder.classes_}")
+                encoder.fit(np.asarray(df[col].cat.categories))
+                logger.debug("Encoder classes cho %s: %s", col, encoder.classes_)
             
             # Tiền xử lý dữ liệu
-            print("\nĐang tiền xử lý dữ liệu...")
+            logger.debug("Đang tiền xử lý dữ liệu...")
             X = self._preprocess_features(df)
             y = df['success_rate']
             
@@ -105,85 +279,278 @@ class LearningPathAI:
                 X, y, test_size=0.2, random_state=42
             )
             
-            print("\nĐang huấn luyện mô hình Random Forest...")
+            logger.info("Đang huấn luyện mô hình %s...", self.estimator_kind)
             # Huấn luyện mô hình
+            fit_started = time.perf_counter()
             self.model.fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - fit_started
+            if 'n_jobs' in self.model.get_params():
+                # Dự đoán chủ yếu từng hồ sơ một: chạy song song chỉ tốn thêm chi phí tạo luồng
+                self.model.set_params(n_jobs=1)
             
             # Đánh giá mô hình
             train_score = self.model.score(X_train, y_train)
             test_score = self.model.score(X_test, y_test)
             
-            print(f"\nKết quả huấn luyện:")
-            print(f"Độ chính xác trên tập huấn luyện: {train_score:.2f}")
-            print(f"Độ chính xác trên tập kiểm tra: {test_score:.2f}")
-            
+            logger.info("Kết quả huấn luyện: R2 tập huấn luyện %.2f, tập kiểm tra %.2f",
+                        train_score, test_score)
+            
+            self.training_metadata = {
+                'training_data_path': training_data_path,
+                'training_fingerprint': _file_fingerprint(training_data_path),
+                'estimator_kind': self.estimator_kind,
+                'n_samples': int(len(df)),
+                'sampling': {'sample_frac': sample_frac, 'max_rows': max_rows},
+                'fit_seconds': round(fit_seconds, 3),
+                'metrics': {
+                    'train_r2': float(train_score),
+                    'test_r2': float(test_score)
+                },
+                'trained_at': datetime.now().isoformat(timespec='seconds')
+            }
+            self._build_category_codes()
+            self._publish()
             self.is_trained = True
+            # Mô hình mới có thể cho tỷ lệ thành công khác: bỏ các lộ trình đã lưu
+            self.plan_cache.clear()
             
             # Lưu mô hình và encoder
-            self.save_model()
-            print("Đã lưu mô hình thành công")
+            if save:
+                self.save_model(model_path)
             
             return True
             
-        except Exception as e:
-            print(f"\nLỗi khi huấn luyện mô hình: {str(e)}")
-            import traceback
-            print("Stack trace:")
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Lỗi khi huấn luyện mô hình")
             self.is_trained = False
             return False
     
     def _preprocess_features(self, df):
-        """Tiền xử lý các đặc trưng đầu vào"""
-        # Mã hóa các biến phân loại
-        for col, encoder in self.label_encoders.items():
-            df[col] = encoder.fit_transform(df[col])
-        
-        # Chọn các đặc trưng cần thiết
-        features = [
-            'subject', 'grade', 'current_score', 'target_score',
-            'duration_weeks', 'daily_study_hours', 'learning_style'
-        ]
-        
-        return df[features]
+        """Tạo ma trận đặc trưng từ dữ liệu huấn luyện bằng các encoder đã fit (không sửa df)"""
+        features = {}
+        for col in FEATURES:
+            if col in self.label_encoders:
+                # Mã hóa danh sách giá trị của category một lần rồi tra theo mã của từng dòng
+                values = df[col].cat
+                lookup = self.label_encoders[col].transform(np.asarray(values.categories))
+                features[col] = lookup[values.codes.to_numpy()]
+            else:
+                features[col] = df[col].to_numpy()
+        return pd.DataFrame(features, columns=FEATURES, index=df.index)
     
+    def _build_category_codes(self):
+        """Dựng bảng tra giá trị phân loại -> mã số từ các encoder đã fit"""
+        self.category_codes = {
+            col: {
+                (cls.item() if hasattr(cls, 'item') else cls): code
+                for code, cls in enumerate(encoder.classes_)
+            }
+            for col, encoder in self.label_encoders.items()
+        }
+
+    def _fit_encoders_from_training_data(self, training_data_path='training_data.csv'):
+        """Fit lại encoder từ dữ liệu huấn luyện (chỉ dùng cho file mô hình cũ không lưu kèm encoder)"""
+        training_data = load_training_data(training_data_path)
+        for col, encoder in self.label_encoders.items():
+            encoder.fit(np.asarray(training_data[col].cat.categories))
+
+    def ensure_model(self, model_path='learning_path_model.joblib', training_data_path='training_data.csv'):
+        """Đảm bảo mô hình sẵn sàng: tải từ file, nếu không được thì huấn luyện.
+
+        An toàn khi gọi từ nhiều luồng; luồng đến sau chờ luồng đang tải thay vì huấn luyện lại.
+        """
+        if self.is_trained:
+            return True
+        with self._model_lock:
+            if self.is_trained:
+                return True
+            if os.path.exists(model_path):
+                self.load_model(model_path)
+            # File lưu mô hình loại khác (vd. đổi MODEL_ESTIMATOR): huấn luyện lại theo loại đang cấu hình
+            saved_kind = self.training_metadata.get('estimator_kind', 'random_forest')
+            if self.is_trained and saved_kind != self.estimator_kind:
+                logger.info("File mô hình là loại %s, đang cấu hình %s: huấn luyện lại",
+                            saved_kind, self.estimator_kind)
+                self._init_model_state()
+            if not self.is_trained:
+                if not os.path.exists(training_data_path):
+                    from generate_training_data import generate_training_data
+                    logger.info("Không có dữ liệu huấn luyện, đang tạo %s...", training_data_path)
+                    generate_training_data(output_path=training_data_path)
+                self.train(training_data_path, model_path)
+            return self.is_trained
+
+    @property
+    def supports_online_updates(self):
+        """Mô hình đang dùng có cập nhật được bằng lô nhỏ (partial_fit) không"""
+        return self._live is not None and hasattr(self._live[0], 'partial_fit')
+
+    def update_with_outcomes(self, outcomes, model_path=None):
+        """Cập nhật mô hình bằng kết quả thực tế của các lộ trình đã hoàn thành.
+
+        outcomes là danh sách dict gồm các trường của predict_success_rate và success_rate
+        (cùng thang 0-100 với dữ liệu huấn luyện). Chỉ dùng được với mô hình học tăng dần
+        (MODEL_ESTIMATOR=sgd): estimator được sao chép, cập nhật bằng partial_fit rồi thay
+        bằng một lần gán như khi huấn luyện lại. Trả về số kết quả hợp lệ đã dùng.
+        """
+        if not self.ensure_model():
+            raise RuntimeError("Mô hình chưa sẵn sàng")
+        if not self.supports_online_updates:
+            raise ValueError("Mô hình hiện tại không hỗ trợ cập nhật tăng dần")
+        if len(outcomes) == 0:
+            return 0
+
+        y = pd.to_numeric(pd.Series([outcome.get('success_rate') for outcome in outcomes]),
+                          errors='coerce').to_numpy(dtype=np.float64)
+        with self._model_lock:
+            model, category_codes, _ = self._live
+            X, valid = self._encode_batch(outcomes, category_codes)
+            with np.errstate(invalid='ignore'):
+                valid &= (y >= 0) & (y <= 100)
+            used = int(valid.sum())
+            if used == 0:
+                return 0
+            updated = copy.deepcopy(model)
+            updated.partial_fit(X[valid], y[valid])
+            self.model = updated
+            self.training_metadata = {
+                **self.training_metadata,
+                'online_updates': self.training_metadata.get('online_updates', 0) + used
+            }
+            self._publish()
+            if model_path:
+                self.save_model(model_path)
+        self.plan_cache.clear()
+        logger.info("Đã cập nhật mô hình với %d kết quả mới", used)
+        return used
+
+    def candidate(self, estimator=None):
+        """Bản sao dùng chung dữ liệu nội dung nhưng có mô hình riêng chưa huấn luyện"""
+        candidate = copy.copy(self)
+        if estimator is not None:
+            candidate.estimator_kind = check_estimator_kind(estimator)
+        candidate._init_model_state()
+        candidate.plan_cache = PlanCache(max_entries=0)
+        candidate._model_lock = threading.Lock()
+        candidate.lut_path = None
+        return candidate
+
+    def retrain(self, training_data_path='training_data.csv', model_path='learning_path_model.joblib',
+                min_r2=0.0, tolerance=0.02, compare=True, sample_frac=None, max_rows=None):
+        """Huấn luyện một mô hình mới ở bản sao, kiểm tra rồi thay mô hình đang phục vụ.
+
+        Mô hình mới chỉ được nhận khi R2 trên tập kiểm tra không thấp hơn min_r2 và (nếu
+        compare) không thấp hơn R2 kiểm tra của mô hình hiện tại quá tolerance. Khi đạt, file
+        được ghi nguyên tử rồi mô hình được thay bằng một lần gán; request đang chạy vẫn
+        dùng mô hình cũ đến khi xong. Trả về True nếu mô hình mới được dùng.
+        """
+        candidate = self.candidate()
+        if not candidate.train(training_data_path, save=False, sample_frac=sample_frac, max_rows=max_rows):
+            return False
+
+        score = candidate.training_metadata['metrics']['test_r2']
+        threshold = min_r2
+        baseline = self.training_metadata.get('metrics', {}).get('test_r2') if self.is_trained else None
+        if compare and baseline is not None:
+            threshold = max(threshold, baseline - tolerance)
+        if score < threshold:
+            logger.warning("Không dùng mô hình mới: R2 kiểm tra %.3f thấp hơn ngưỡng %.3f", score, threshold)
+            return False
+
+        candidate.save_model(model_path)
+        with self._model_lock:
+            self.model = candidate.model
+            self.label_encoders = candidate.label_encoders
+            self.category_codes = candidate.category_codes
+            self.training_metadata = candidate.training_metadata
+            self._publish(candidate.inference)
+            self.is_trained = True
+        self.plan_cache.clear()
+        logger.info("Đã thay mô hình mới (R2 kiểm tra %.3f, %d mẫu)",
+                    score, candidate.training_metadata['n_samples'])
+        return True
+
     def save_model(self, model_path='learning_path_model.joblib'):
-        """Lưu mô hình đã huấn luyện"""
+        """Lưu mô hình đã huấn luyện thành một bundle có phiên bản.
+
+        Bundle gồm estimator, các encoder, danh sách đặc trưng, phiên bản scikit-learn,
+        các mảng của rừng cây dạng phẳng (nếu có) và thông tin huấn luyện. File không nén
+        để có thể tải bằng mmap_mode.
+        """
         if self.is_trained:
-            joblib.dump(self.model, model_path)
-            print(f"\nĐã lưu mô hình vào {model_path}")
+            bundle = {
+                'format_version': MODEL_BUNDLE_VERSION,
+                'estimator': self.model,
+                'label_encoders': self.label_encoders,
+                'features': list(FEATURES),
+                'sklearn_version': sklearn.__version__,
+                'flat_forest': self.inference.to_arrays() if self.inference is not None else None,
+                **self.training_metadata
+            }
+            # Ghi ra file tạm rồi đổi tên để tiến trình khác không bao giờ tải phải file ghi dở
+            tmp_path = model_path + '.tmp'
+            joblib.dump(bundle, tmp_path)
+            os.replace(tmp_path, model_path)
+            logger.info("Đã lưu mô hình vào %s", model_path)
     
-    def load_model(self, model_path='learning_path_model.joblib'):
-        """Tải mô hình đã huấn luyện"""
+    def load_model(self, model_path='learning_path_model.joblib', mmap_mode='r'):
+        """Tải mô hình đã huấn luyện.
+
+        Với mmap_mode='r' các mảng numpy trong bundle được ánh xạ từ file thay vì sao chép,
+        nên nhiều tiến trình worker cùng tải một file dùng chung một bản trong bộ nhớ.
+        (Cây của scikit-learn tự sao chép mảng nút khi unpickle nên không được chia sẻ;
+        các mảng của rừng cây dạng phẳng dùng khi dự đoán thì được chia sẻ.)
+        """
+        flat_arrays = None
         try:
-            self.model = joblib.load(model_path)
+            saved = joblib.load(model_path, mmap_mode=mmap_mode)
+            if isinstance(saved, dict) and 'format_version' in saved:
+                if saved['format_version'] > MODEL_BUNDLE_VERSION:
+                    raise ValueError(f"Không hỗ trợ định dạng mô hình phiên bản {saved['format_version']}")
+                if saved['features'] != FEATURES:
+                    raise ValueError(f"Danh sách đặc trưng không khớp: {saved['features']}")
+                if saved['sklearn_version'] != sklearn.__version__:
+                    logger.warning("Mô hình được lưu với scikit-learn %s, đang dùng %s",
+                                   saved['sklearn_version'], sklearn.__version__)
+                self.model = saved['estimator']
+                self.label_encoders = saved['label_encoders']
+                flat_arrays = saved.get('flat_forest')
+                self.training_metadata = {
+                    key: value for key, value in saved.items()
+                    if key not in ('format_version', 'estimator', 'label_encoders', 'features',
+                                   'sklearn_version', 'flat_forest')
+                }
+            elif isinstance(saved, dict):
+                # Định dạng trước khi có phiên bản: {'model', 'label_encoders'}
+                self.model = saved['model']
+                self.label_encoders = saved['label_encoders']
+            else:
+                # File mô hình cũ chỉ chứa estimator: fit encoder một lần khi tải
+                self.model = saved
+                self._fit_encoders_from_training_data()
+            self._build_category_codes()
+            self._publish(self._build_inference(self.model, flat_arrays))
             self.is_trained = True
-            print(f"\nĐã tải mô hình từ {model_path}")
-        except:
-            print("\nKhông tìm thấy mô hình đã lưu. Vui lòng huấn luyện mô hình trước.")
+            self.plan_cache.clear()
+            logger.info("Đã tải mô hình từ %s", model_path)
+        except Exception as e:
+            logger.warning("Không tải được mô hình đã lưu (%s). Vui lòng huấn luyện mô hình trước.", e)
     
     def predict_success_rate(self, subject, current_score, target_score,
                            duration_weeks, daily_study_hours, learning_style, grade):
         """Dự đoán tỷ lệ thành công dựa trên các tham số đầu vào"""
         try:
-            print("\n[DEBUG] ====== Bắt đầu dự đoán tỷ lệ thành công ======")
-            print("[DEBUG] Input parameters:", {
-                'subject': subject,
-                'current_score': current_score,
-                'target_score': target_score,
-                'duration_weeks': duration_weeks,
-                'daily_study_hours': daily_study_hours,
-                'learning_style': learning_style,
-                'grade': grade
-            })
+            logger.debug(
+                "Dự đoán tỷ lệ thành công: subject=%s, grade=%s, current_score=%s, target_score=%s, "
+                "duration_weeks=%s, daily_study_hours=%s, learning_style=%s",
+                subject, grade, current_score, target_score,
+                duration_weeks, daily_study_hours, learning_style
+            )
             
-            # Kiểm tra xem mô hình đã được huấn luyện chưa
-            if not self.is_trained:
-                print("[DEBUG] Model not trained, attempting to train...")
-                if not self.train():
-                    print("[ERROR] Failed to train model")
-                    return None
-                print("[DEBUG] Model trained successfully")
+            # Kiểm tra xem mô hình đã sẵn sàng chưa
+            if not self.ensure_model():
+                logger.error("Mô hình chưa sẵn sàng")
+                return None
             
             # Kiểm tra tính hợp lệ của đầu vào
             try:
@@ -192,183 +559,346 @@ class LearningPathAI:
                 duration_weeks = float(duration_weeks)
                 daily_study_hours = float(daily_study_hours)
                 
-                print(f"[DEBUG] Converted values: current_score={current_score}, target_score={target_score}, duration_weeks={duration_weeks}, daily_study_hours={daily_study_hours}")
-                
                 if not (0 <= current_score <= 10 and 0 <= target_score <= 10):
-                    print("[ERROR] Scores must be between 0 and 10")
+                    logger.warning("Điểm số phải nằm trong khoảng 0-10")
                     return None
                     
                 if duration_weeks <= 0 or daily_study_hours <= 0:
-                    print("[ERROR] Time values must be greater than 0")
+                    logger.warning("Thời gian học phải lớn hơn 0")
                     return None
                     
             except ValueError as e:
-                print(f"[ERROR] Error converting input values: {e}")
+                logger.warning("Giá trị đầu vào không hợp lệ: %s", e)
                 return None
             
-            # Chuẩn bị dữ liệu đầu vào
-            print("[DEBUG] Preparing input data...")
-            input_data = pd.DataFrame({
-                'subject': [subject],
-                'grade': [grade],
-                'current_score': [current_score],
-                'target_score': [target_score],
-                'duration_weeks': [duration_weeks],
-                'daily_study_hours': [daily_study_hours],
-                'learning_style': [learning_style]
-            })
-            print("[DEBUG] Input data prepared:", input_data)
-            
-            # Mã hóa các biến phân loại
-            print("[DEBUG] Encoding categorical features...")
-            encoded_data = self._encode_categorical_features(input_data)
-            if encoded_data is None:
-                print("[ERROR] Failed to encode categorical features")
+            # Lấy một lần bộ (estimator, bảng mã, hàm dự đoán) để không bị đổi giữa chừng khi thay mô hình
+            _, category_codes, predict = self._live
+
+            # Mã hóa thành một dòng đặc trưng
+            X = self._encode_row({
+                'subject': subject,
+                'grade': grade,
+                'current_score': current_score,
+                'target_score': target_score,
+                'duration_weeks': duration_weeks,
+                'daily_study_hours': daily_study_hours,
+                'learning_style': learning_style
+            }, category_codes)
+            if X is None:
+                logger.error("Không mã hóa được các biến phân loại")
                 return None
-            print("[DEBUG] Encoded data:", encoded_data)
             
             # Dự đoán tỷ lệ thành công
-            try:
-                print("[DEBUG] Making prediction...")
-                # Đảm bảo dữ liệu đầu vào là 2D array
-                if len(encoded_data) == 0:
-                    print("[ERROR] Encoded data is empty")
-                    return None
-                    
-                # Chuyển đổi DataFrame thành numpy array và reshape
-                X = encoded_data.values.reshape(1, -1)
-                print(f"[DEBUG] Reshaped data shape: {X.shape}")
-                
-                success_rate = self.model.predict(X)[0]
-                # Đảm bảo tỷ lệ thành công nằm trong khoảng 0-1
-                success_rate = max(0.0, min(1.0, float(success_rate)))
-                print(f"[DEBUG] Success rate predicted: {success_rate}")
-                print("[DEBUG] ====== Kết thúc dự đoán tỷ lệ thành công ======\n")
-                return success_rate
-            except Exception as e:
-                print(f"[ERROR] Error making prediction: {e}")
-                import traceback
-                print("[ERROR] Stack trace:")
-                traceback.print_exc()
-                return None
-            
-        except Exception as e:
-            print("\n[ERROR] Exception in predict_success_rate:")
-            print(f"[ERROR] Error type: {type(e).__name__}")
-            print(f"[ERROR] Error message: {str(e)}")
-            import traceback
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
-            print("[DEBUG] ====== Kết thúc dự đoán tỷ lệ thành công với lỗi ======\n")
+            success_rate = predict(X)[0]
+            # Đảm bảo tỷ lệ thành công nằm trong khoảng 0-1
+            success_rate = max(0.0, min(1.0, float(success_rate)))
+            logger.debug("Tỷ lệ thành công dự đoán: %s", success_rate)
+            return success_rate
+            
+        except Exception:
+            logger.exception("Lỗi khi dự đoán tỷ lệ thành công")
             return None
     
+    def _encode_batch(self, profiles, category_codes=None):
+        """Kiểm tra và mã hóa nhiều hồ sơ cùng lúc.
+
+        profiles là danh sách dict (cùng khóa với predict_success_rate), DataFrame
+        hoặc mảng 2 chiều có các cột theo thứ tự FEATURES.
+        Trả về (X, valid): ma trận đặc trưng đã mã hóa và mặt nạ các hồ sơ hợp lệ.
+        """
+        if category_codes is None:
+            category_codes = self.category_codes
+        if isinstance(profiles, pd.DataFrame):
+            columns = {col: profiles[col].to_numpy(dtype=object) if col in profiles.columns
+                       else np.full(len(profiles), None, dtype=object)
+                       for col in FEATURES}
+        elif len(profiles) and isinstance(profiles[0], dict):
+            columns = {col: np.array([profile.get(col) for profile in profiles], dtype=object)
+                       for col in FEATURES}
+        else:
+            values = np.asarray(profiles, dtype=object).reshape(-1, len(FEATURES))
+            columns = {col: values[:, i] for i, col in enumerate(FEATURES)}
+
+        n = len(columns['subject'])
+        X = np.empty((n, len(FEATURES)), dtype=np.float64)
+        for i, col in enumerate(FEATURES):
+            values = columns[col]
+            if col == 'grade':
+                # Lớp có thể gửi dạng chuỗi '10' hoặc số 10
+                numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+                whole = np.isfinite(numbers) & (numbers == np.round(numbers))
+                values = np.where(whole, np.nan_to_num(numbers).astype(np.int64), -1)
+            if col in category_codes:
+                codes = category_codes[col]
+                X[:, i] = [codes.get(value, np.nan) for value in values.tolist()]
+            else:
+                X[:, i] = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+
+        current_score = X[:, FEATURES.index('current_score')]
+        target_score = X[:, FEATURES.index('target_score')]
+        duration_weeks = X[:, FEATURES.index('duration_weeks')]
+        daily_study_hours = X[:, FEATURES.index('daily_study_hours')]
+        with np.errstate(invalid='ignore'):
+            valid = (
+                ~np.isnan(X).any(axis=1)
+                & (current_score >= 0) & (current_score <= 10)
+                & (target_score >= 0) & (target_score <= 10)
+                & (duration_weeks > 0) & (daily_study_hours > 0)
+            )
+        return X, valid
+
+    def predict_success_rate_batch(self, profiles):
+        """Dự đoán tỷ lệ thành công cho nhiều hồ sơ bằng một lần gọi model.predict.
+
+        Trả về mảng numpy cùng độ dài với profiles; hồ sơ không hợp lệ (thiếu trường,
+        giá trị ngoài khoảng hoặc không có trong bảng mã) nhận giá trị NaN.
+        """
+        if not self.ensure_model():
+            raise RuntimeError("Mô hình chưa sẵn sàng")
+
+        if len(profiles) == 0:
+            return np.empty(0, dtype=np.float64)
+
+        _, category_codes, predict = self._live
+        X, valid = self._encode_batch(profiles, category_codes)
+        rates = np.full(len(X), np.nan, dtype=np.float64)
+        if valid.any():
+            # Đảm bảo tỷ lệ thành công nằm trong khoảng 0-1
+            rates[valid] = np.clip(predict(X[valid]), 0.0, 1.0)
+        return rates
+
+    def _plan_cache_key(self, subject, current_score, target_score,
+                        duration_weeks, daily_study_hours, learning_style, grade):
+        """Chuẩn hóa tham số thành khóa bộ nhớ đệm (điểm số làm tròn 0.1)"""
+        return (
+            str(subject).strip(),
+            str(grade).strip(),
+            round(float(current_score), 1),
+            round(float(target_score), 1),
+            int(duration_weeks),
+            float(daily_study_hours),
+            str(learning_style).strip()
+        )
+
     def generate_learning_path(self, subject, current_score, target_score, 
                              duration_weeks, daily_study_hours, learning_style, grade):
-        """Tạo lộ trình học tập dựa trên đầu vào và dự đoán tỷ lệ thành công"""
+        """Tạo lộ trình học tập dựa trên đầu vào và dự đoán tỷ lệ thành công.
+
+        Khung lộ trình (tuần -> ngày -> chủ đề/bài tập/tài liệu) được lưu trong plan_cache
+        theo tham số đã chuẩn hóa; ngày tháng chỉ được gắn vào khi trả kết quả.
+        """
+        plan = self.stream_learning_path(
+            subject, current_score, target_score,
+            duration_weeks, daily_study_hours, learning_style, grade
+        )
+        if plan is None:
+            return None
+        header, weeks = plan
         try:
-            print("\n[DEBUG] ====== Bắt đầu tạo lộ trình học tập ======")
-            print("[DEBUG] Input parameters:", {
-                'subject': subject,
-                'current_score': current_score,
-                'target_score': target_score,
-                'duration_weeks': duration_weeks,
-                'daily_study_hours': daily_study_hours,
-                'learning_style': learning_style,
-                'grade': grade
-            })
+            return dict(header, weekly_plans=list(weeks))
+        except Exception:
+            logger.exception("Lỗi khi tạo lộ trình học tập")
+            return None
+
+    def stream_learning_path(self, subject, current_score, target_score,
+                             duration_weeks, daily_study_hours, learning_style, grade, start_date=None):
+        """Như generate_learning_path nhưng trả về (thông tin chung, iterator các tuần).
+
+        Dự đoán, chọn cấp độ và danh sách chủ đề được làm trước nên lỗi đầu vào vẫn trả về
+        None; từng tuần chỉ được dựng khi iterator được đọc tới. Khung đầy đủ được lưu vào
+        plan_cache khi đã đọc hết các tuần.
+        """
+        try:
+            logger.debug(
+                "Tạo lộ trình học tập: subject=%s, grade=%s, current_score=%s, target_score=%s, "
+                "duration_weeks=%s, daily_study_hours=%s, learning_style=%s",
+                subject, grade, current_score, target_score,
+                duration_weeks, daily_study_hours, learning_style
+            )
             
-            if not self.is_trained:
-                print("[DEBUG] Model not trained, attempting to train...")
-                if not self.train():
-                    print("[ERROR] Failed to train model")
-                    return None
-                print("[DEBUG] Model trained successfully")
+            if not self.ensure_model():
+                logger.error("Mô hình chưa sẵn sàng")
+                return None
             
             try:
                 self._validate_input(subject, grade)
-                print("[DEBUG] Input validation successful")
+                key = self._plan_cache_key(
+                    subject, current_score, target_score,
+                    duration_weeks, daily_study_hours, learning_style, grade
+                )
             except ValueError as e:
-                print(f"[ERROR] Input validation failed: {e}")
-                return None
-            
-            print("[DEBUG] Predicting success rate...")
-            success_rate = self.predict_success_rate(
-                subject, current_score, target_score,
-                duration_weeks, daily_study_hours, learning_style, grade
-            )
-            
-            if success_rate is None:
-                print("[ERROR] Failed to predict success rate")
-                return None
-            print(f"[DEBUG] Success rate predicted: {success_rate}")
-            
-            print("[DEBUG] Determining learning level...")
-            level = self._determine_level(current_score, target_score, success_rate)
-            if level is None:
-                print("[ERROR] Failed to determine learning level")
-                return None
-            print(f"[DEBUG] Learning level determined: {level}")
-            
-            print("[DEBUG] Generating learning path...")
-            weekly_plans = []
-            start_date = datetime.now()
-
-            # Lấy thông tin chi tiết về các chủ đề
-            topic_breakdown = self.get_topic_breakdown(subject, grade, level)
-            if not topic_breakdown:
-                print("[ERROR] Failed to get topic breakdown")
+                logger.warning("Đầu vào không hợp lệ: %s", e)
                 return None
 
-            # Tính toán tổng số bài học cần phân bổ
-            total_lessons = sum(len(topic['lessons']) for topic in topic_breakdown['topics'])
-            total_days = duration_weeks * 7
-            lessons_per_day = max(1, total_lessons // total_days)
+            start_date = start_date or datetime.now()
+            skeleton = self.plan_cache.get(key)
+            if skeleton is None:
+                plan = self._start_learning_path_skeleton(*key)
+                if plan is None:
+                    return None
+                header, weeks = plan
+                weeks = self._cache_weeks(key, header, weeks)
+            else:
+                logger.debug("Lấy khung lộ trình từ bộ nhớ đệm")
+                header = {k: v for k, v in skeleton.items() if k != 'weekly_plans'}
+                weeks = iter(skeleton['weekly_plans'])
 
-            # Khởi tạo biến theo dõi tiến độ
-            current_topic_index = 0
-            current_lesson_index = 0
-            remaining_lessons = total_lessons
-
-            for week in range(1, duration_weeks + 1):
-                week_start = start_date + timedelta(days=(week-1)*7)
-                week_end = week_start + timedelta(days=6)
-                week_plan = {
-                    'week_number': week,
-                    'start_date': week_start.strftime('%Y-%m-%d'),
-                    'end_date': week_end.strftime('%Y-%m-%d'),
-                    'level': level,
-                    'predicted_success_rate': float(success_rate),
-                    'daily_plans': []
-                }
+            return header, (self._stamp_week(week_plan, start_date) for week_plan in weeks)
 
-                for day in range(7):
-                    day_date = week_start + timedelta(days=day)
-                    
-                    # Tính số giờ học cho ngày
-                    if learning_style == 'practical':
-                        theory_hours = daily_study_hours * 0.3
-                        practice_hours = daily_study_hours * 0.7
-                    elif learning_style == 'theory':
-                        theory_hours = daily_study_hours * 0.7
-                        practice_hours = daily_study_hours * 0.3
-                    else:  # combined
-                        theory_hours = daily_study_hours * 0.5
-                        practice_hours = daily_study_hours * 0.5
-
-                    # Lấy bài học hiện tại
-                    if current_topic_index < len(topic_breakdown['topics']):
-                        current_topic = topic_breakdown['topics'][current_topic_index]
-                        if current_lesson_index < len(current_topic['lessons']):
-                            current_lesson = current_topic['lessons'][current_lesson_index]
+        except Exception:
+            logger.exception("Lỗi khi tạo lộ trình học tập")
+            return None
+
+    def _cache_weeks(self, key, header, weeks):
+        """Trả lại từng tuần của khung và lưu khung vào plan_cache khi đã dựng đủ"""
+        content_index = self.content_index
+        weekly_plans = []
+        for week_plan in weeks:
+            weekly_plans.append(week_plan)
+            yield week_plan
+        # Nội dung được nạp lại trong lúc dựng thì khung có thể lẫn nội dung cũ: không lưu
+        if weekly_plans and self.content_index is content_index:
+            self.plan_cache.put(key, dict(header, weekly_plans=weekly_plans))
+
+    def _stamp_week(self, week_plan, start_date):
+        """Gắn ngày bắt đầu/kết thúc tuần và ngày học vào bản sao của một tuần trong khung.
+
+        Khung trong bộ nhớ đệm không bị sửa; danh sách bài tập và tài liệu được dùng chung
+        (chỉ đọc), riêng topic_details được sao chép vì có cờ completed.
+        """
+        week_start = start_date + timedelta(days=(week_plan['week_number'] - 1) * 7)
+        week_end = week_start + timedelta(days=6)
+        daily_plans = []
+        for day, daily_plan in enumerate(week_plan['daily_plans']):
+            day_date = week_start + timedelta(days=day)
+            daily_plans.append({
+                'date': day_date.strftime('%Y-%m-%d'),
+                **daily_plan,
+                'topic_details': [dict(detail) for detail in daily_plan['topic_details']]
+            })
+        return {
+            'week_number': week_plan['week_number'],
+            'start_date': week_start.strftime('%Y-%m-%d'),
+            'end_date': week_end.strftime('%Y-%m-%d'),
+            **{k: v for k, v in week_plan.items() if k not in ('week_number', 'daily_plans')},
+            'daily_plans': daily_plans
+        }
+
+    def _start_learning_path_skeleton(self, subject, grade, current_score, target_score,
+                                      duration_weeks, daily_study_hours, learning_style):
+        """Dự đoán, chọn cấp độ và lấy chủ đề; trả về (thông tin chung, generator các tuần của khung)"""
+        success_rate = self.predict_success_rate(
+            subject, current_score, target_score,
+            duration_weeks, daily_study_hours, learning_style, grade
+        )
+        
+        if success_rate is None:
+            logger.error("Không dự đoán được tỷ lệ thành công")
+            return None
+        
+        level = self._determine_level(current_score, target_score, success_rate)
+        if level is None:
+            logger.error("Không xác định được cấp độ học")
+            return None
+        logger.debug("Tỷ lệ thành công %s, cấp độ %s", success_rate, level)
+
+        # Lấy thông tin chi tiết về các chủ đề
+        topic_breakdown = self.get_topic_breakdown(subject, grade, level)
+        if not topic_breakdown:
+            logger.error("Không lấy được danh sách chủ đề")
+            return None
+
+        header = {
+            'subject': subject,
+            'grade': grade,
+            'level': level,
+            'predicted_success_rate': float(success_rate),
+            'total_weeks': duration_weeks,
+            'daily_study_hours': daily_study_hours,
+            'learning_style': learning_style
+        }
+        weeks = self._iter_skeleton_weeks(
+            subject, grade, duration_weeks, daily_study_hours, learning_style,
+            level, success_rate, topic_breakdown
+        )
+        return header, weeks
+
+    def _iter_skeleton_weeks(self, subject, grade, duration_weeks, daily_study_hours, learning_style,
+                             level, success_rate, topic_breakdown):
+        """Dựng lần lượt từng tuần (chưa có ngày tháng) của khung lộ trình"""
+        # Tính toán tổng số bài học cần phân bổ
+        total_lessons = sum(len(topic['lessons']) for topic in topic_breakdown['topics'])
+        total_days = duration_weeks * 7
+        lessons_per_day = max(1, total_lessons // total_days)
+
+        # Khởi tạo biến theo dõi tiến độ
+        current_topic_index = 0
+        current_lesson_index = 0
+        remaining_lessons = total_lessons
+
+        for week in range(1, duration_weeks + 1):
+            week_plan = {
+                'week_number': week,
+                'level': level,
+                'predicted_success_rate': float(success_rate),
+                'daily_plans': []
+            }
+
+            for day in range(7):
+                # Tính số giờ học cho ngày
+                if learning_style == 'practical':
+                    theory_hours = daily_study_hours * 0.3
+                    practice_hours = daily_study_hours * 0.7
+                elif learning_style == 'theory':
+                    theory_hours = daily_study_hours * 0.7
+                    practice_hours = daily_study_hours * 0.3
+                else:  # combined
+                    theory_hours = daily_study_hours * 0.5
+                    practice_hours = daily_study_hours * 0.5
+
+                # Lấy bài học hiện tại
+                if current_topic_index < len(topic_breakdown['topics']):
+                    current_topic = topic_breakdown['topics'][current_topic_index]
+                    if current_lesson_index < len(current_topic['lessons']):
+                        current_lesson = current_topic['lessons'][current_lesson_index]
+                        
+                        # Tạo kế hoạch cho ngày
+                        daily_plan = {
+                            'theory_topics': [f"{current_topic['name']} - {current_lesson}"],
+                            'practice_exercises': self._get_practice_exercises(subject, week, duration_weeks, level, grade),
+                            'theory_hours': float(theory_hours),
+                            'practice_hours': float(practice_hours),
+                            'learning_resources': self._get_learning_resources(subject, grade, level),
+                            'topic_details': [{
+                                'topic': current_topic['name'],
+                                'lesson': current_lesson,
+                                'estimated_hours': theory_hours,
+                                'completed': False
+                            }]
+                        }
+                        
+                        # Cập nhật chỉ số bài học
+                        current_lesson_index += 1
+                        if current_lesson_index >= len(current_topic['lessons']):
+                            current_lesson_index = 0
+                            current_topic_index += 1
+                        
+                        week_plan['daily_plans'].append(daily_plan)
+                        remaining_lessons -= 1
+                    else:
+                        # Nếu đã học hết bài của chủ đề hiện tại, chuyển sang chủ đề tiếp theo
+                        current_lesson_index = 0
+                        current_topic_index += 1
+                        if current_topic_index < len(topic_breakdown['topics']):
+                            current_topic = topic_breakdown['topics'][current_topic_index]
+                            current_lesson = current_topic['lessons'][0]
                             
-                            # Tạo kế hoạch cho ngày
                             daily_plan = {
-                                'date': day_date.strftime('%Y-%m-%d'),
                                 'theory_topics': [f"{current_topic['name']} - {current_lesson}"],
                                 'practice_exercises': self._get_practice_exercises(subject, week, duration_weeks, level, grade),
                                 'theory_hours': float(theory_hours),
                                 'practice_hours': float(practice_hours),
-                                'learning_resources': self._get_learning_resources(subject, level, grade),
+                                'learning_resources': self._get_learning_resources(subject, grade, level),
                                 'topic_details': [{
                                     'topic': current_topic['name'],
                                     'lesson': current_lesson,
@@ -377,103 +907,43 @@ class LearningPathAI:
                                 }]
                             }
                             
-                            # Cập nhật chỉ số bài học
-                            current_lesson_index += 1
-                            if current_lesson_index >= len(current_topic['lessons']):
-                                current_lesson_index = 0
-                                current_topic_index += 1
-                            
+                            current_lesson_index = 1
                             week_plan['daily_plans'].append(daily_plan)
                             remaining_lessons -= 1
                         else:
-                            # Nếu đã học hết bài của chủ đề hiện tại, chuyển sang chủ đề tiếp theo
-                            current_lesson_index = 0
-                            current_topic_index += 1
-                            if current_topic_index < len(topic_breakdown['topics']):
-                                current_topic = topic_breakdown['topics'][current_topic_index]
-                                current_lesson = current_topic['lessons'][0]
-                                
-                                daily_plan = {
-                                    'date': day_date.strftime('%Y-%m-%d'),
-                                    'theory_topics': [f"{current_topic['name']} - {current_lesson}"],
-                                    'practice_exercises': self._get_practice_exercises(subject, week, duration_weeks, level, grade),
-                                    'theory_hours': float(theory_hours),
-                                    'practice_hours': float(practice_hours),
-                                    'learning_resources': self._get_learning_resources(subject, level, grade),
-                                    'topic_details': [{
-                                        'topic': current_topic['name'],
-                                        'lesson': current_lesson,
-                                        'estimated_hours': theory_hours,
-                                        'completed': False
-                                    }]
-                                }
-                                
-                                current_lesson_index = 1
-                                week_plan['daily_plans'].append(daily_plan)
-                                remaining_lessons -= 1
-                            else:
-                                # Nếu đã học hết tất cả chủ đề, tạo kế hoạch ôn tập
-                                daily_plan = {
-                                    'date': day_date.strftime('%Y-%m-%d'),
-                                    'theory_topics': ['Ôn tập và củng cố kiến thức'],
-                                    'practice_exercises': self._get_practice_exercises(subject, week, duration_weeks, level, grade),
-                                    'theory_hours': float(theory_hours),
-                                    'practice_hours': float(practice_hours),
-                                    'learning_resources': self._get_learning_resources(subject, level, grade),
-                                    'topic_details': [{
-                                        'topic': 'Ôn tập',
-                                        'lesson': 'Củng cố kiến thức',
-                                        'estimated_hours': theory_hours,
-                                        'completed': False
-                                    }]
-                                }
-                                week_plan['daily_plans'].append(daily_plan)
-                    else:
-                        # Nếu đã học hết tất cả chủ đề, tạo kế hoạch ôn tập
-                        daily_plan = {
-                            'date': day_date.strftime('%Y-%m-%d'),
-                            'theory_topics': ['Ôn tập và củng cố kiến thức'],
-                            'practice_exercises': self._get_practice_exercises(subject, week, duration_weeks, level, grade),
-                            'theory_hours': float(theory_hours),
-                            'practice_hours': float(practice_hours),
-                            'learning_resources': self._get_learning_resources(subject, level, grade),
-                            'topic_details': [{
-                                'topic': 'Ôn tập',
-                                'lesson': 'Củng cố kiến thức',
-                                'estimated_hours': theory_hours,
-                                'completed': False
-                            }]
-                        }
-                        week_plan['daily_plans'].append(daily_plan)
-
-                weekly_plans.append(week_plan)
-
-            if not weekly_plans:
-                print("[ERROR] Failed to generate learning path")
-                return None
-            print("[DEBUG] Successfully generated learning path")
-            print("[DEBUG] ====== Kết thúc tạo lộ trình học tập ======\n")
-            
-            # Trả về kết quả theo cấu trúc mong đợi
-            return {
-                'weekly_plans': weekly_plans,
-                'subject': subject,
-                'grade': grade,
-                'level': level,
-                'predicted_success_rate': float(success_rate),
-                'total_weeks': duration_weeks,
-                'daily_study_hours': daily_study_hours,
-                'learning_style': learning_style
-            }
+                            # Nếu đã học hết tất cả chủ đề, tạo kế hoạch ôn tập
+                            daily_plan = {
+                                'theory_topics': ['Ôn tập và củng cố kiến thức'],
+                                'practice_exercises': self._get_practice_exercises(subject, week, duration_weeks, level, grade),
+                                'theory_hours': float(theory_hours),
+                                'practice_hours': float(practice_hours),
+                                'learning_resources': self._get_learning_resources(subject, grade, level),
+                                'topic_details': [{
+                                    'topic': 'Ôn tập',
+                                    'lesson': 'Củng cố kiến thức',
+                                    'estimated_hours': theory_hours,
+                                    'completed': False
+                                }]
+                            }
+                            week_plan['daily_plans'].append(daily_plan)
+                else:
+                    # Nếu đã học hết tất cả chủ đề, tạo kế hoạch ôn tập
+                    daily_plan = {
+                        'theory_topics': ['Ôn tập và củng cố kiến thức'],
+                        'practice_exercises': self._get_practice_exercises(subject, week, duration_weeks, level, grade),
+                        'theory_hours': float(theory_hours),
+                        'practice_hours': float(practice_hours),
+                        'learning_resources': self._get_learning_resources(subject, grade, level),
+                        'topic_details': [{
+                            'topic': 'Ôn tập',
+                            'lesson': 'Củng cố kiến thức',
+                            'estimated_hours': theory_hours,
+                            'completed': False
+                        }]
+                    }
+                    week_plan['daily_plans'].append(daily_plan)
 
-        except Exception as e:
-            print("\n[ERROR] Exception in generate_learning_path:")
-            print(f"[ERROR] Error type: {type(e).__name__}")
-            print(f"[ERROR] Error message: {str(e)}")
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
-            print("[DEBUG] ====== Kết thúc tạo lộ trình học tập với lỗi ======\n")
-            return None
+            yield week_plan
     
     def _determine_level(self, current_score, target_score, success_rate):
         """Xác định cấp độ học dựa trên điểm số hiện tại, mục tiêu và tỷ lệ thành công"""
@@ -485,11 +955,11 @@ class LearningPathAI:
             
             # Kiểm tra tính hợp lệ của các giá trị
             if not (0 <= current_score <= 10 and 0 <= target_score <= 10):
-                print("Điểm số phải nằm trong khoảng 0-10")
+                logger.warning("Điểm số phải nằm trong khoảng 0-10")
                 return "basic"
             
             if not (0 <= success_rate <= 1):
-                print("Tỷ lệ thành công không hợp lệ")
+                logger.warning("Tỷ lệ thành công không hợp lệ")
                 return "basic"
             
             # Tính toán khoảng cách điểm
@@ -515,13 +985,14 @@ class LearningPathAI:
                     return "expert"
                     
         except Exception as e:
-            print(f"Lỗi khi xác định cấp độ: {e}")
+            logger.warning("Lỗi khi xác định cấp độ: %s", e)
             return "basic"  # Trả về cấp độ cơ bản trong trường hợp lỗi
     
     def _create_daily_plan(self, subject, learning_style, daily_hours, week_number, total_weeks, level, grade):
         """Tạo kế hoạch học tập cho một ngày"""
         try:
-            print(f"\n[DEBUG] Creating daily plan for subject={subject}, learning_style={learning_style}, daily_hours={daily_hours}, week={week_number}, level={level}, grade={grade}")
+            logger.debug("Tạo kế hoạch ngày: subject=%s, learning_style=%s, daily_hours=%s, week=%s, level=%s, grade=%s",
+                         subject, learning_style, daily_hours, week_number, level, grade)
             
             # Tính toán thời gian học cho mỗi ngày
             if learning_style == 'practical':
@@ -534,47 +1005,12 @@ class LearningPathAI:
                 theory_hours = daily_hours * 0.5
                 practice_hours = daily_hours * 0.5
             
-            print(f"[DEBUG] Calculated hours: theory={theory_hours}, practice={practice_hours}")
             
             # Lấy tất cả chủ đề lý thuyết
-            print("[DEBUG] Getting theory topics...")
             all_topics = self._get_theory_topics(subject, 1, total_weeks, level, grade)
             if not all_topics:
-                print(f"[ERROR] No theory topics found for subject={subject}, level={level}, grade={grade}")
+                logger.warning("Không có chủ đề lý thuyết cho subject=%s, level=%s, grade=%s", subject, level, grade)
                 return None
-            print(f"[DEBUG] Found {len(all_topics)} theory topics")
-            
-            # Tính toán thời gian cần thiết cho mỗi chủ đề
-            topic_time_estimates = {
-                'math': {
-                    '10': {
-                        'Hàm số và đồ thị': 2.0,
-                        'Hàm số bậc ba': 3.0,
-                        'Phương trình bậc ba': 2.5,
-                        'Bất phương trình bậc hai': 2.0,
-                        'Hệ phương trình bậc ba': 2.5,
-                        'Phương trình chứa căn': 2.0,
-                        'Phương trình chứa dấu giá trị tuyệt đối': 2.0
-                    },
-                    '11': {
-                        'Hàm số lượng giác': 3.0,
-                        'Phương trình lượng giác cơ bản': 2.5,
-                        'Tổ hợp và xác suất': 3.0,
-                        'Dãy số và cấp số': 2.5,
-                        'Giới hạn của dãy số': 2.0,
-                        'Giới hạn của hàm số': 2.0
-                    },
-                    '12': {
-                        'Khảo sát và vẽ đồ thị hàm số': 3.0,
-                        'Tích phân và ứng dụng': 3.5,
-                        'Số phức': 2.5,
-                        'Hình học không gian': 3.0,
-                        'Phương pháp tọa độ trong không gian': 2.5,
-                        'Mặt cầu và mặt tròn xoay': 2.0
-                    }
-                },
-                # ... (giữ nguyên các phần khác của topic_time_estimates)
-            }
             
             # Tính toán tổng số ngày đã học
             total_days = (week_number - 1) * 7 + 1
@@ -586,7 +1022,7 @@ class LearningPathAI:
             
             # Tìm chủ đề hiện tại dựa trên tổng số giờ đã học
             for topic in all_topics:
-                topic_time = topic_time_estimates.get(subject, {}).get(grade, {}).get(topic['name'], 2.0)
+                topic_time = self.curriculum.topic_hours(subject, grade, topic['name'])
                 if total_hours_used + topic_time > total_days * theory_hours:
                     remaining_hours = topic_time - (total_days * theory_hours - total_hours_used)
                     break
@@ -597,25 +1033,22 @@ class LearningPathAI:
             if current_topic_index >= len(all_topics):
                 current_topic_index = 0
                 total_hours_used = 0
-                remaining_hours = topic_time_estimates.get(subject, {}).get(grade, {}).get(all_topics[0]['name'], 2.0)
+                remaining_hours = self.curriculum.topic_hours(subject, grade, all_topics[0]['name'])
             
             current_topic = all_topics[current_topic_index]
             
             # Lấy bài tập thực hành tương ứng với chủ đề hiện tại
-            print("[DEBUG] Getting practice exercises...")
             practice_exercises = self._get_practice_exercises(subject, week_number, total_weeks, level, grade)
             if not practice_exercises:
-                print(f"[ERROR] No practice exercises found for subject={subject}, week={week_number}, level={level}, grade={grade}")
+                logger.warning("Không có bài tập cho subject=%s, week=%s, level=%s, grade=%s",
+                               subject, week_number, level, grade)
                 return None
-            print(f"[DEBUG] Found {len(practice_exercises)} practice exercises")
             
             # Lấy tài liệu học tập
-            print("[DEBUG] Getting learning resources...")
             learning_resources = self._get_learning_resources(subject, grade, level)
             if not learning_resources:
-                print(f"[ERROR] No learning resources found for subject={subject}, level={level}, grade={grade}")
+                logger.warning("Không có tài liệu học tập cho subject=%s, level=%s, grade=%s", subject, level, grade)
                 return None
-            print(f"[DEBUG] Found {len(learning_resources)} learning resources")
             
             # Tạo kế hoạch chi tiết cho ngày
             daily_plan = {
@@ -662,16 +1095,10 @@ class LearningPathAI:
                 else:
                     break
             
-            print("[DEBUG] Successfully created daily plan")
             return daily_plan
             
-        except Exception as e:
-            print(f"\n[ERROR] Exception in _create_daily_plan:")
-            print(f"[ERROR] Error type: {type(e).__name__}")
-            print(f"[ERROR] Error message: {str(e)}")
-            import traceback
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Lỗi khi tạo kế hoạch ngày")
             return None
     
     def evaluate_student_profile(self, current_score, target_score, learning_style, daily_study_hours, duration_weeks):
@@ -831,191 +1258,19 @@ class LearningPathAI:
         return schedule
     
     def _get_theory_topics(self, subject, week_number, total_weeks, level, grade):
-        """Lấy danh sách chủ đề lý thuyết từ Excel"""
+        """Lấy danh sách chủ đề lý thuyết của một tuần từ chỉ mục nội dung"""
         try:
-            print("\n[DEBUG] ====== Bắt đầu lấy chủ đề lý thuyết ======")
-            print(f"[DEBUG] Input parameters: subject={subject}, week={week_number}, level={level}, grade={grade}")
-            
-            if 'theory' not in self.excel_data:
-                print("[ERROR] Không tìm thấy dữ liệu theory trong excel_data")
-                return []
-                
-            theory_df = self.excel_data['theory']
-            print(f"[DEBUG] Columns in theory.xlsx: {theory_df.columns.tolist()}")
-            
-            # Lấy ID_subject từ bảng subject
-            if 'subject' in self.excel_data:
-                subject_df = self.excel_data['subject']
-                print(f"[DEBUG] Columns in subject.xlsx: {subject_df.columns.tolist()}")
-                
-                # Chuyển đổi tên môn học thành định dạng phù hợp
-                subject_mapping = {
-                    'math': 'Toán học',
-                    'physics': 'Vật lý',
-                    'chemistry': 'Hóa học'
-                }
-                
-                subject_name = subject_mapping.get(subject.lower())
-                if not subject_name:
-                    print(f"[ERROR] Không tìm thấy tên môn học cho {subject}")
-                    return []
-                    
-                # Tìm ID_subject tương ứng
-                subject_row = subject_df[subject_df['name_subject'] == subject_name]
-                if subject_row.empty:
-                    print(f"[ERROR] Không tìm thấy môn học {subject} trong bảng subject")
-                    return []
-                    
-                subject_id = subject_row['ID_subject'].iloc[0]
-                print(f"[DEBUG] ID_subject cho {subject}: {subject_id}")
-                
-                # Lấy ID_grade từ bảng grade
-                if 'grade' in self.excel_data:
-                    grade_df = self.excel_data['grade']
-                    grade_row = grade_df[grade_df['name_grade'] == f'Lớp {grade}']
-                    if grade_row.empty:
-                        print(f"[ERROR] Không tìm thấy lớp {grade} trong bảng grade")
-                        return []
-                        
-                    grade_id = grade_row['ID_grade'].iloc[0]
-                    print(f"[DEBUG] ID_grade cho lớp {grade}: {grade_id}")
-                    
-                    # Lọc theo ID_subject và ID_grade
-                    filtered_theory = theory_df[
-                        (theory_df['ID_subject'] == subject_id) &
-                        (theory_df['ID_grade'] == grade_id)
-                    ]
-                    print(f"[DEBUG] Số lượng chủ đề tìm thấy: {len(filtered_theory)}")
-                else:
-                    print("[ERROR] Không tìm thấy bảng grade")
-                    return []
-            else:
-                print("[ERROR] Không tìm thấy bảng subject")
-                return []
-            
-            # Lọc theo cấp độ
-            filtered_theory = filtered_theory[filtered_theory['level'] == level]
-            print(f"[DEBUG] Số lượng chủ đề sau khi lọc theo level {level}: {len(filtered_theory)}")
-            
-            # Sắp xếp theo thứ tự ưu tiên nếu có cột priority
-            if 'priority' in filtered_theory.columns:
-                filtered_theory = filtered_theory.sort_values('priority')
-            
-            # Tính số chủ đề cần lấy dựa trên tuần học
-            topics_per_week = max(1, len(filtered_theory) // total_weeks)
-            start_idx = (week_number - 1) * topics_per_week
-            end_idx = start_idx + topics_per_week
-            
-            selected_topics = filtered_theory.iloc[start_idx:end_idx]
-            print(f"[DEBUG] Số lượng chủ đề được chọn: {len(selected_topics)}")
-            
-            # Chuyển đổi thành định dạng mong muốn
-            topics = []
-            for _, row in selected_topics.iterrows():
-                topic = {
-                    'name': row['theory_name'],
-                    'description': row.get('content', ''),
-                    'estimated_hours': float(row.get('estimated_time', 2.0))
-                }
-                topics.append(topic)
-            
-            print(f"[DEBUG] Số lượng chủ đề trả về: {len(topics)}")
-            print("[DEBUG] ====== Kết thúc lấy chủ đề lý thuyết ======\n")
-            return topics
-            
-        except Exception as e:
-            print(f"[ERROR] Lỗi khi lấy chủ đề lý thuyết: {str(e)}")
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
-            print("[DEBUG] ====== Kết thúc lấy chủ đề lý thuyết với lỗi ======\n")
+            return self.content_index.theory_topics(subject, grade, level, week_number, total_weeks)
+        except Exception:
+            logger.exception("Lỗi khi lấy chủ đề lý thuyết")
             return []
-    
+
     def _get_practice_exercises(self, subject, week_number, total_weeks, level, grade):
-        """Lấy danh sách bài tập từ Excel hoặc tạo mới nếu chưa có"""
+        """Lấy danh sách bài tập của một tuần từ chỉ mục nội dung"""
         try:
-            print("\n[DEBUG] ====== Bắt đầu lấy bài tập ======")
-            print(f"[DEBUG] Input parameters: subject={subject}, week={week_number}, level={level}, grade={grade}")
-            
-            if 'practice' not in self.excel_data:
-                print("[DEBUG] Không tìm thấy dữ liệu practice trong excel_data")
-                return []
-                
-            practice_df = self.excel_data['practice']
-            print(f"[DEBUG] Columns in practice.xlsx: {practice_df.columns.tolist()}")
-            
-            # Lấy ID_subject từ bảng subject
-            if 'subject' in self.excel_data:
-                subject_df = self.excel_data['subject']
-                print(f"[DEBUG] Columns in subject.xlsx: {subject_df.columns.tolist()}")
-                print(f"[DEBUG] Subject data:\n{subject_df}")
-                
-                # Chuyển đổi tên môn học thành định dạng phù hợp
-                subject_mapping = {
-                    'math': 'Toán học',
-                    'physics': 'Vật lý',
-                    'chemistry': 'Hóa học'
-                }
-                
-                subject_name = subject_mapping.get(subject.lower())
-                if not subject_name:
-                    print(f"[ERROR] Không tìm thấy tên môn học cho {subject}")
-                    return []
-                    
-                print(f"[DEBUG] Tìm kiếm môn học: {subject_name}")
-                # Tìm ID_subject tương ứng
-                subject_row = subject_df[subject_df['name_subject'] == subject_name]
-                print(f"[DEBUG] Kết quả tìm kiếm:\n{subject_row}")
-                
-                if subject_row.empty:
-                    print(f"[ERROR] Không tìm thấy môn học {subject} trong bảng subject")
-                    return []
-                    
-                subject_id = subject_row['ID_subject'].iloc[0]
-                print(f"[DEBUG] ID_subject cho {subject}: {subject_id}")
-                
-                # Lọc theo ID_subject
-                filtered_practice = practice_df[practice_df['ID_subject'] == subject_id]
-                print(f"[DEBUG] Số lượng bài tập tìm thấy: {len(filtered_practice)}")
-                print(f"[DEBUG] Bài tập tìm thấy:\n{filtered_practice}")
-            else:
-                print("[ERROR] Không tìm thấy bảng subject")
-                return []
-            
-            # Lọc theo cấp độ
-            filtered_practice = filtered_practice[filtered_practice['level'] == level]
-            print(f"[DEBUG] Số lượng bài tập sau khi lọc theo level {level}: {len(filtered_practice)}")
-            
-            # Sắp xếp theo thứ tự ưu tiên nếu có cột priority
-            if 'priority' in filtered_practice.columns:
-                filtered_practice = filtered_practice.sort_values('priority')
-            
-            # Tính số bài tập cần lấy dựa trên tuần học
-            exercises_per_week = max(1, len(filtered_practice) // total_weeks)
-            start_idx = (week_number - 1) * exercises_per_week
-            end_idx = start_idx + exercises_per_week
-            
-            selected_exercises = filtered_practice.iloc[start_idx:end_idx]
-            print(f"[DEBUG] Số lượng bài tập được chọn: {len(selected_exercises)}")
-            
-            # Chuyển đổi thành định dạng mong muốn
-            exercises = []
-            for _, row in selected_exercises.iterrows():
-                exercise = {
-                    'name': row['practice_name'],
-                    'description': row.get('description', ''),
-                    'difficulty': row.get('difficulty', 'medium')
-                }
-                exercises.append(exercise)
-            
-            print(f"[DEBUG] Số lượng bài tập trả về: {len(exercises)}")
-            print("[DEBUG] ====== Kết thúc lấy bài tập ======\n")
-            return exercises
-            
-        except Exception as e:
-            print(f"[ERROR] Lỗi khi lấy bài tập: {str(e)}")
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
-            print("[DEBUG] ====== Kết thúc lấy bài tập với lỗi ======\n")
+            return self.content_index.practice_exercises(subject, level, week_number, total_weeks)
+        except Exception:
+            logger.exception("Lỗi khi lấy bài tập")
             return []
 
     def create_flexible_schedule(self, subject, current_score, target_score, 
@@ -1140,571 +1395,114 @@ class LearningPathAI:
         else:
             return 30  # 30 phút nghỉ
 
-    def _encode_categorical_features(self, df):
-        """Mã hóa các biến phân loại"""
-        try:
-            print("\n[DEBUG] ====== Bắt đầu mã hóa dữ liệu phân loại ======")
-            print("[DEBUG] Input DataFrame:", df)
-            
-            # Kiểm tra DataFrame rỗng
-            if df.empty:
-                print("[ERROR] Input DataFrame is empty")
-                return None
-                
-            print("[DEBUG] DataFrame info:")
-            print(df.info())
-            print("\n[DEBUG] DataFrame description:")
-            print(df.describe())
-            
-            # Tạo bản sao của DataFrame để tránh thay đổi dữ liệu gốc
-            encoded_df = df.copy()
-            
-            # Chuyển đổi grade thành integer
-            if 'grade' in encoded_df.columns:
-                print("[DEBUG] Converting grade to integer")
+    def _encode_row(self, row, category_codes):
+        """Mã hóa một hồ sơ thành mảng đặc trưng (1, len(FEATURES)) mà không qua pandas"""
+        if not category_codes:
+            logger.error("Các encoder chưa được fit")
+            return None
+        encoded = []
+        for col in FEATURES:
+            value = row[col]
+            if col == 'grade':
+                # Lớp có thể gửi dạng chuỗi '10' hoặc số 10
                 try:
-                    encoded_df['grade'] = encoded_df['grade'].astype(int)
-                    print(f"[DEBUG] Converted grade values: {encoded_df['grade'].values}")
-                except Exception as e:
-                    print(f"[ERROR] Error converting grade to integer: {e}")
+                    value = int(value)
+                except (TypeError, ValueError) as e:
+                    logger.warning("Không chuyển được grade thành số nguyên: %s", e)
                     return None
-            
-            # Kiểm tra các biến phân loại
-            categorical_columns = ['subject', 'grade', 'learning_style']
-            for col in categorical_columns:
-                if col not in encoded_df.columns:
-                    print(f"[ERROR] Missing column: {col}")
-                    return None
-                print(f"[DEBUG] Found column: {col}")
-                print(f"[DEBUG] Unique values in {col}: {encoded_df[col].unique()}")
-            
-            # Đọc dữ liệu training để fit encoder
-            try:
-                training_data = pd.read_csv('training_data.csv')
-                if training_data.empty:
-                    print("[ERROR] Training data is empty")
+            if col in category_codes:
+                codes = category_codes[col]
+                if value not in codes:
+                    logger.warning("Giá trị '%s' không có trong encoder của %s (có: %s)",
+                                   value, col, list(codes))
                     return None
-                    
-                # Chuyển đổi grade trong training data thành integer
-                if 'grade' in training_data.columns:
-                    training_data['grade'] = training_data['grade'].astype(int)
-                print("[DEBUG] Successfully loaded training data")
-                print(f"[DEBUG] Training data shape: {training_data.shape}")
-            except Exception as e:
-                print(f"[ERROR] Error loading training data: {e}")
-                return None
-            
-            # Mã hóa các biến phân loại
-            for col, encoder in self.label_encoders.items():
-                if col in encoded_df.columns:
-                    print(f"\n[DEBUG] Processing column: {col}")
-                    
-                    # Fit encoder với dữ liệu training
-                    try:
-                        print(f"[DEBUG] Fitting encoder for {col} with training data")
-                        encoder.fit(training_data[col])
-                        print(f"[DEBUG] Encoder fitted with classes: {encoder.classes_}")
-                    except Exception as e:
-                        print(f"[ERROR] Error fitting encoder for {col}: {e}")
-                        return None
-                    
-                    # Kiểm tra xem giá trị có nằm trong classes không
-                    unique_values = encoded_df[col].unique()
-                    for value in unique_values:
-                        if value not in encoder.classes_:
-                            print(f"[ERROR] Value '{value}' not found in encoder classes for {col}")
-                            print(f"[ERROR] Available classes: {encoder.classes_}")
-                            return None
-                    
-                    # Chuyển đổi dữ liệu
-                    try:
-                        print(f"[DEBUG] Transforming data for column: {col}")
-                        print(f"[DEBUG] Original values: {encoded_df[col].values}")
-                        encoded_df[col] = encoder.transform(encoded_df[col])
-                        print(f"[DEBUG] Encoded values: {encoded_df[col].values}")
-                    except Exception as e:
-                        print(f"[ERROR] Error transforming {col}: {e}")
-                        return None
-            
-            print("\n[DEBUG] Final encoded DataFrame:")
-            print(encoded_df)
-            print("\n[DEBUG] Final DataFrame info:")
-            print(encoded_df.info())
-            print("\n[DEBUG] ====== Kết thúc mã hóa dữ liệu phân loại ======\n")
-            
-            # Kiểm tra DataFrame sau khi mã hóa
-            if encoded_df.empty:
-                print("[ERROR] Encoded DataFrame is empty")
-                return None
-                
-            return encoded_df
-            
-        except Exception as e:
-            print("\n[ERROR] Exception in _encode_categorical_features:")
-            print(f"[ERROR] Error type: {type(e).__name__}")
-            print(f"[ERROR] Error message: {str(e)}")
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
-            print("[DEBUG] ====== Kết thúc mã hóa dữ liệu phân loại với lỗi ======\n")
-            return None
-
+                value = codes[value]
+            encoded.append(value)
+        return np.array([encoded], dtype=np.float64)
+    
     def _get_learning_resources(self, subject, grade, level):
-        """Lấy tài liệu học tập từ Excel"""
+        """Lấy tài liệu học tập từ chỉ mục nội dung"""
         try:
-            print("\n[DEBUG] ====== Bắt đầu lấy tài liệu học tập ======")
-            print(f"[DEBUG] Input parameters: subject={subject}, grade={grade}, level={level}")
-            
-            if 'topic' not in self.excel_data:
-                print("[ERROR] Không tìm thấy dữ liệu topic trong excel_data")
-                return []
-                
-            topic_df = self.excel_data['topic']
-            print(f"[DEBUG] Columns in topic.xlsx: {topic_df.columns.tolist()}")
-            
-            # Lấy ID_subject từ bảng subject
-            if 'subject' in self.excel_data:
-                subject_df = self.excel_data['subject']
-                print(f"[DEBUG] Columns in subject.xlsx: {subject_df.columns.tolist()}")
-                
-                # Chuyển đổi tên môn học thành định dạng phù hợp
-                subject_mapping = {
-                    'math': 'Toán học',
-                    'physics': 'Vật lý',
-                    'chemistry': 'Hóa học'
-                }
-                
-                subject_name = subject_mapping.get(subject.lower())
-                if not subject_name:
-                    print(f"[ERROR] Không tìm thấy tên môn học cho {subject}")
-                    return []
-                    
-                # Tìm ID_subject tương ứng
-                subject_row = subject_df[subject_df['name_subject'] == subject_name]
-                if subject_row.empty:
-                    print(f"[ERROR] Không tìm thấy môn học {subject} trong bảng subject")
-                    return []
-                    
-                subject_id = subject_row['ID_subject'].iloc[0]
-                print(f"[DEBUG] ID_subject cho {subject}: {subject_id}")
-                
-                # Lọc theo ID_subject
-                filtered_resources = topic_df[topic_df['ID_subject'] == subject_id]
-                print(f"[DEBUG] Số lượng tài liệu tìm thấy: {len(filtered_resources)}")
-            else:
-                print("[ERROR] Không tìm thấy bảng subject")
-                return []
-            
-            # Lọc theo cấp độ
-            filtered_resources = filtered_resources[filtered_resources['level'] == level]
-            
-            # Sắp xếp theo thứ tự ưu tiên nếu có cột priority
-            if 'priority' in topic_df.columns:
-                filtered_resources = filtered_resources.sort_values('priority')
-            
-            # Chuyển đổi thành định dạng mong muốn
-            resources = []
-            for _, row in filtered_resources.iterrows():
-                resource = {
-                    'name': row['topic_name'],
-                    'type': 'document',
-                    'url': '',
-                    'description': f'Tài liệu học tập {subject} cho học sinh lớp {grade}'
-                }
-                resources.append(resource)
-            
-            print(f"[DEBUG] Số lượng tài liệu trả về: {len(resources)}")
-            print("[DEBUG] ====== Kết thúc lấy tài liệu học tập ======\n")
-            return resources
-            
-        except Exception as e:
-            print(f"[ERROR] Lỗi khi lấy tài liệu học tập: {str(e)}")
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
-            print("[DEBUG] ====== Kết thúc lấy tài liệu học tập với lỗi ======\n")
-            # Trả về tài liệu mặc định trong trường hợp lỗi
-            return [{
-                'name': f'Tài liệu {subject} lớp {grade}',
-                'type': 'document',
-                'url': '',
-                'description': f'Tài liệu học tập {subject} cho học sinh lớp {grade}'
-            }]
+            resources = self.content_index.learning_resources(subject, grade, level)
+            if resources is not None:
+                return list(resources)
+            logger.debug("Bảng topic không có cột level, dùng tài liệu mặc định")
+        except Exception:
+            logger.exception("Lỗi khi lấy tài liệu học tập")
+        # Trả về tài liệu mặc định khi không lọc được tài liệu
+        return [{
+            'name': f'Tài liệu {subject} lớp {grade}',
+            'type': 'document',
+            'url': '',
+            'description': f'Tài liệu học tập {subject} cho học sinh lớp {grade}'
+        }]
 
     def estimate_total_time(self, subject, grade, level):
         """Ước tính tổng thời gian cần thiết cho toàn bộ lộ trình học tập"""
-        # Lấy danh sách chủ đề lý thuyết
-        all_topics = self._get_theory_topics(subject, 1, 12, level, grade)
-        
-        # Ước lượng thời gian cho từng chủ đề
-        topic_time_estimates = {
-            'math': {
-                '10': {
-                    'Hàm số và đồ thị': 2.0,
-                    'Hàm số bậc ba': 3.0,
-                    'Phương trình bậc ba': 2.5,
-                    'Bất phương trình bậc hai': 2.0,
-                    'Hệ phương trình bậc ba': 2.5,
-                    'Phương trình chứa căn': 2.0,
-                    'Phương trình chứa dấu giá trị tuyệt đối': 2.0
-                },
-                '11': {
-                    'Hàm số lượng giác': 3.0,
-                    'Phương trình lượng giác cơ bản': 2.5,
-                    'Tổ hợp và xác suất': 3.0,
-                    'Dãy số và cấp số': 2.5,
-                    'Giới hạn của dãy số': 2.0,
-                    'Giới hạn của hàm số': 2.0
-                },
-                '12': {
-                    'Khảo sát và vẽ đồ thị hàm số': 3.0,
-                    'Tích phân và ứng dụng': 3.5,
-                    'Số phức': 2.5,
-                    'Hình học không gian': 3.0,
-                    'Phương pháp tọa độ trong không gian': 2.5,
-                    'Mặt cầu và mặt tròn xoay': 2.0
-                }
-            },
-            'physics': {
-                '10': {
-                    'Chuyển động cơ học': 2.5,
-                    'Định luật Newton': 3.0,
-                    'Các lực cơ học': 2.5,
-                    'Công và công suất': 2.0,
-                    'Năng lượng và định luật bảo toàn': 2.5,
-                    'Chất khí': 2.0
-                },
-                '11': {
-                    'Điện tích và điện trường': 3.0,
-                    'Dòng điện không đổi': 2.5,
-                    'Dòng điện trong các môi trường': 2.0,
-                    'Từ trường': 2.5,
-                    'Cảm ứng điện từ': 2.0,
-                    'Khúc xạ ánh sáng': 2.0
-                },
-                '12': {
-                    'Dao động điện từ': 2.5,
-                    'Sóng điện từ': 2.0,
-                    'Sóng ánh sáng': 2.5,
-                    'Lượng tử ánh sáng': 3.0,
-                    'Hạt nhân nguyên tử': 2.5,
-                    'Từ vi mô đến vĩ mô': 2.0
-                }
-            },
-            'chemistry': {
-                '10': {
-                    'Cấu tạo nguyên tử': 2.5,
-                    'Bảng tuần hoàn': 2.0,
-                    'Liên kết hóa học': 2.5,
-                    'Phản ứng oxi hóa khử': 2.0,
-                    'Dung dịch': 2.0,
-                    'Tốc độ phản ứng': 2.0
-                },
-                '11': {
-                    'Sự điện li': 2.5,
-                    'Nitơ và hợp chất': 2.0,
-                    'Cacbon và hợp chất': 2.0,
-                    'Silic và hợp chất': 1.5,
-                    'Đại cương về hóa học hữu cơ': 2.0,
-                    'Hiđrocacbon no': 2.5
-                },
-                '12': {
-                    'Ancol và phenol': 2.0,
-                    'Anđehit và xeton': 2.0,
-                    'Axit cacboxylic': 2.0,
-                    'Este và lipit': 2.0,
-                    'Cacbohiđrat': 2.0,
-                    'Amin và amino axit': 2.0
-                }
+        key = (subject, grade, level)
+        content_index = self.content_index
+        estimates_index, estimates = self._time_estimates
+        if estimates_index is not content_index:
+            # Nội dung đã được nạp lại: bỏ các ước tính tính từ chỉ mục cũ
+            estimates = {}
+            self._time_estimates = (content_index, estimates)
+        estimate = estimates.get(key)
+        if estimate is None:
+            # Lấy danh sách chủ đề lý thuyết
+            all_topics = self._get_theory_topics(subject, 1, 12, level, grade)
+            
+            # Tính tổng thời gian lý thuyết theo số giờ ước tính của từng chủ đề
+            total_theory_time = sum(self.curriculum.topic_hours(subject, grade, topic['name']) for topic in all_topics)
+            
+            # Ước tính thời gian thực hành (thường bằng 1.5 lần thời gian lý thuyết)
+            total_practice_time = total_theory_time * 1.5
+            
+            # Tổng thời gian cần thiết
+            total_time = total_theory_time + total_practice_time
+            
+            # Tính số ngày cần thiết dựa trên số giờ học mỗi ngày
+            hours_per_day = 2  # Mặc định 2 giờ/ngày
+            days_needed = total_time / hours_per_day
+            
+            estimate = {
+                'total_theory_time': round(total_theory_time, 1),
+                'total_practice_time': round(total_practice_time, 1),
+                'total_time': round(total_time, 1),
+                'days_needed': round(days_needed, 1),
+                'weeks_needed': round(days_needed / 7, 1)
             }
-        }
-        
-        # Tính tổng thời gian lý thuyết
-        total_theory_time = sum(topic_time_estimates.get(subject, {}).get(grade, {}).get(topic['name'], 2.0) for topic in all_topics)
-        
-        # Ước tính thời gian thực hành (thường bằng 1.5 lần thời gian lý thuyết)
-        total_practice_time = total_theory_time * 1.5
-        
-        # Tổng thời gian cần thiết
-        total_time = total_theory_time + total_practice_time
-        
-        # Tính số ngày cần thiết dựa trên số giờ học mỗi ngày
-        hours_per_day = 2  # Mặc định 2 giờ/ngày
-        days_needed = total_time / hours_per_day
-        
-        return {
-            'total_theory_time': round(total_theory_time, 1),
-            'total_practice_time': round(total_practice_time, 1),
-            'total_time': round(total_time, 1),
-            'days_needed': round(days_needed, 1),
-            'weeks_needed': round(days_needed / 7, 1)
-        }
+            estimates[key] = estimate
+        return dict(estimate)
 
     def get_topic_breakdown(self, subject, grade, level):
         """Hiển thị chi tiết cách phân chia các bài học trong từng chủ đề"""
-        topic_lessons = {
-            'math': {
-                '10': {
-                    'Hàm số và đồ thị': [
-                        'Khái niệm hàm số',
-                        'Tập xác định và tập giá trị',
-                        'Đồ thị hàm số',
-                        'Tính đơn điệu của hàm số',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Hàm số bậc ba': [
-                        'Định nghĩa và tính chất',
-                        'Đồ thị hàm số bậc ba',
-                        'Cực trị của hàm số bậc ba',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Phương trình bậc ba': [
-                        'Dạng tổng quát',
-                        'Cách giải phương trình bậc ba',
-                        'Định lý Vi-ét cho phương trình bậc ba',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Bất phương trình bậc hai': [
-                        'Dạng tổng quát',
-                        'Cách giải bất phương trình bậc hai',
-                        'Bảng xét dấu tam thức bậc hai',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Hệ phương trình bậc ba': [
-                        'Dạng tổng quát',
-                        'Phương pháp thế',
-                        'Phương pháp cộng đại số',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Phương trình chứa căn': [
-                        'Điều kiện xác định',
-                        'Phương pháp giải',
-                        'Các dạng bài tập cơ bản',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Phương trình chứa dấu giá trị tuyệt đối': [
-                        'Định nghĩa giá trị tuyệt đối',
-                        'Phương pháp giải',
-                        'Các dạng bài tập cơ bản',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ]
-                },
-                '11': {
-                    'Hàm số lượng giác': [
-                        'Các hàm số lượng giác cơ bản',
-                        'Tập xác định và tập giá trị',
-                        'Tính tuần hoàn',
-                        'Đồ thị các hàm số lượng giác',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Phương trình lượng giác cơ bản': [
-                        'Phương trình sinx = a',
-                        'Phương trình cosx = a',
-                        'Phương trình tanx = a',
-                        'Phương trình cotx = a',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Tổ hợp và xác suất': [
-                        'Quy tắc đếm',
-                        'Hoán vị, chỉnh hợp, tổ hợp',
-                        'Nhị thức Newton',
-                        'Xác suất của biến cố',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Dãy số và cấp số': [
-                        'Dãy số',
-                        'Cấp số cộng',
-                        'Cấp số nhân',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Giới hạn của dãy số': [
-                        'Định nghĩa giới hạn',
-                        'Các định lý về giới hạn',
-                        'Giới hạn vô cực',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Giới hạn của hàm số': [
-                        'Định nghĩa giới hạn',
-                        'Các định lý về giới hạn',
-                        'Giới hạn vô cực',
-                        'Ứng dụng trong bài toán thực tế',
-                        'Bài tập tổng hợp'
-                    ]
-                },
-                '12': {
-                    'Khảo sát và vẽ đồ thị hàm số': [
-                        'Sơ đồ khảo sát hàm số',
-                        'Khảo sát hàm số bậc ba',
-                        'Khảo sát hàm số trùng phương',
-                        'Khảo sát hàm số phân thức',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Tích phân và ứng dụng': [
-                        'Nguyên hàm',
-                        'Tích phân xác định',
-                        'Phương pháp tính tích phân',
-                        'Ứng dụng tích phân',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Số phức': [
-                        'Định nghĩa số phức',
-                        'Các phép toán với số phức',
-                        'Dạng lượng giác của số phức',
-                        'Ứng dụng số phức',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Hình học không gian': [
-                        'Quan hệ song song',
-                        'Quan hệ vuông góc',
-                        'Góc và khoảng cách',
-                        'Thể tích khối đa diện',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Phương pháp tọa độ trong không gian': [
-                        'Hệ tọa độ',
-                        'Phương trình mặt phẳng',
-                        'Phương trình đường thẳng',
-                        'Vị trí tương đối',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Mặt cầu và mặt tròn xoay': [
-                        'Mặt cầu',
-                        'Mặt trụ',
-                        'Mặt nón',
-                        'Ứng dụng trong thực tế',
-                        'Bài tập tổng hợp'
-                    ]
-                }
-            },
-            'physics': {
-                '10': {
-                    'Chuyển động cơ học': [
-                        'Chuyển động thẳng đều',
-                        'Chuyển động thẳng biến đổi đều',
-                        'Rơi tự do',
-                        'Chuyển động tròn đều',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Định luật Newton': [
-                        'Định luật I Newton',
-                        'Định luật II Newton',
-                        'Định luật III Newton',
-                        'Ứng dụng các định luật Newton',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Các lực cơ học': [
-                        'Lực hấp dẫn',
-                        'Lực đàn hồi',
-                        'Lực ma sát',
-                        'Lực hướng tâm',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Công và công suất': [
-                        'Công cơ học',
-                        'Công suất',
-                        'Hiệu suất',
-                        'Ứng dụng trong thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Năng lượng và định luật bảo toàn': [
-                        'Động năng',
-                        'Thế năng',
-                        'Cơ năng',
-                        'Định luật bảo toàn cơ năng',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Chất khí': [
-                        'Cấu tạo chất khí',
-                        'Định luật Bôi-lơ - Ma-ri-ốt',
-                        'Định luật Sác-lơ',
-                        'Phương trình trạng thái',
-                        'Bài tập tổng hợp'
-                    ]
-                }
-            },
-            'chemistry': {
-                '10': {
-                    'Cấu tạo nguyên tử': [
-                        'Thành phần nguyên tử',
-                        'Đồng vị',
-                        'Cấu hình electron',
-                        'Bảng tuần hoàn',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Bảng tuần hoàn': [
-                        'Cấu tạo bảng tuần hoàn',
-                        'Định luật tuần hoàn',
-                        'Tính chất các nguyên tố',
-                        'Ứng dụng bảng tuần hoàn',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Liên kết hóa học': [
-                        'Liên kết ion',
-                        'Liên kết cộng hóa trị',
-                        'Liên kết cho nhận',
-                        'Liên kết hiđro',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Phản ứng oxi hóa khử': [
-                        'Khái niệm oxi hóa khử',
-                        'Cân bằng phương trình',
-                        'Dãy điện hóa',
-                        'Ứng dụng trong thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Dung dịch': [
-                        'Nồng độ dung dịch',
-                        'Độ tan',
-                        'Áp suất thẩm thấu',
-                        'Ứng dụng trong thực tế',
-                        'Bài tập tổng hợp'
-                    ],
-                    'Tốc độ phản ứng': [
-                        'Định nghĩa tốc độ phản ứng',
-                        'Các yếu tố ảnh hưởng',
-                        'Cân bằng hóa học',
-                        'Ứng dụng trong thực tế',
-                        'Bài tập tổng hợp'
-                    ]
-                }
-            }
-        }
-        
         # Lấy danh sách chủ đề và bài học
-        topics = topic_lessons.get(subject.lower(), {}).get(grade, {})
+        topics = self.curriculum.lesson_topics(subject, grade)
         if not topics:
             return None
-            
-        # Tạo kết quả chi tiết
-        result = {
+        
+        # Thời gian lý thuyết chia đều cho các chủ đề (chỉ tính một lần)
+        estimated_hours = self.estimate_total_time(subject, grade, level)['total_theory_time'] / len(topics)
+        
+        return {
             'subject': subject,
             'grade': grade,
             'level': level,
-            'topics': []
+            'topics': [
+                {
+                    'name': topic,
+                    'lessons': list(lessons),
+                    'total_lessons': len(lessons),
+                    'estimated_hours': estimated_hours
+                }
+                for topic, lessons in topics
+            ]
         }
-        
-        # Thêm thông tin chi tiết cho từng chủ đề
-        for topic, lessons in topics.items():
-            topic_info = {
-                'name': topic,
-                'lessons': lessons,
-                'total_lessons': len(lessons),
-                'estimated_hours': self.estimate_total_time(subject, grade, level)['total_theory_time'] / len(topics)
-            }
-            result['topics'].append(topic_info)
-            
-        return result
 
     def generate_exercises(self, topic_name, subject, grade, level):
         """Tạo bài tập tự động cho một chủ đề lý thuyết"""
         try:
-            print(f"\n[DEBUG] Tạo bài tập cho chủ đề: {topic_name}")
+            logger.debug("Tạo bài tập cho chủ đề: %s", topic_name)
             
             # Tạo các bài tập dựa trên chủ đề
             exercises = []
@@ -1726,10 +1524,8 @@ class LearningPathAI:
             
             return exercises
             
-        except Exception as e:
-            print(f"[ERROR] Lỗi khi tạo bài tập: {str(e)}")
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Lỗi khi tạo bài tập")
             return []
 
     def _generate_exercise_description(self, topic_name, subject, grade, level):
@@ -1775,41 +1571,41 @@ class LearningPathAI:
             return f"{exercise_type} ({difficulty_desc.get(level, 'cơ bản')})"
             
         except Exception as e:
-            print(f"[ERROR] Lỗi khi tạo mô tả bài tập: {str(e)}")
+            logger.warning("Lỗi khi tạo mô tả bài tập: %s", e)
             return "Bài tập về " + topic_name
 
-    def _save_exercises_to_excel(self, exercises):
-        """Lưu bài tập vào file Excel"""
+    def _save_exercises(self, exercises):
+        """Lưu bài tập (kết quả generate_exercises) vào bảng practice qua backend lưu trữ"""
         try:
-            # Đọc file Excel hiện tại nếu có
-            try:
-                practice_df = pd.read_excel('practice.xlsx')
-            except:
-                practice_df = pd.DataFrame(columns=[
-                    'exercise_name', 'description', 'difficulty',
-                    'subject', 'grade', 'topic', 'priority'
-                ])
-            
-            # Thêm bài tập mới
-            new_exercises_df = pd.DataFrame(exercises)
-            practice_df = pd.concat([practice_df, new_exercises_df], ignore_index=True)
-            
-            # Lưu lại vào file Excel
-            practice_df.to_excel('practice.xlsx', index=False)
-            print("[DEBUG] Đã lưu bài tập vào file Excel")
-            
-        except Exception as e:
-            print(f"[ERROR] Lỗi khi lưu bài tập vào Excel: {str(e)}")
-            print("[ERROR] Stack trace:")
-            traceback.print_exc()
+            if self.backend is None:
+                raise RuntimeError("Chưa có backend lưu trữ")
+            next_number = self.backend.count('practice') + 1
+            rows = []
+            for offset, exercise in enumerate(exercises):
+                grade_id = self.content_index.grade_id(exercise['grade'])
+                rows.append({
+                    'ID_practice': f"P{next_number + offset:03d}",
+                    'practice_name': exercise['exercise_name'],
+                    'ID_subject': self.content_index.subject_id(exercise['subject'], grade_id),
+                    'ID_grade': grade_id,
+                    'level': exercise['difficulty']
+                })
+            self.backend.insert_many('practice', rows)
+            # Bài tập mới phải có trong chỉ mục và các lộ trình dựng sau đó
+            self.load_content()
+            self.plan_cache.clear()
+            logger.debug("Đã lưu %d bài tập", len(rows))
+            
+        except Exception:
+            logger.exception("Lỗi khi lưu bài tập")
 
-def main():
-    # Khởi tạo AI
-    ai = LearningPathAI()
+def demo():
+    # Khởi tạo AI, nội dung học tập đọc qua backend lưu trữ
+    ai = LearningPathAI(backend=create_backend())
     
-    # Huấn luyện mô hình
-    print("Bắt đầu huấn luyện mô hình...")
-    ai.train()
+    # Tải mô hình đã lưu, chưa có thì huấn luyện
+    print("Chuẩn bị mô hình...")
+    ai.ensure_model()
     
     # Ví dụ sử dụng với một học sinh mới
     print("\nTạo lộ trình học tập cho học sinh mới:")
@@ -1828,9 +1624,9 @@ def main():
         for week in learning_path['weekly_plans']:
             print(f"\nTuần {week['week_number']} ({week['start_date']} - {week['end_date']}):")
             print(f"Cấp độ: {week['level']}")
-            print(f"Lớp: {week['grade']}")
+            print(f"Lớp: {learning_path['grade']}")
             print(f"Tỷ lệ thành công dự đoán: {week['predicted_success_rate']}%")
-            for day, plan in enumerate(week['daily_schedule'], 1):
+            for day, plan in enumerate(week['daily_plans'], 1):
                 print(f"\nNgày {day}:")
                 print(f"Lý thuyết ({plan['theory_hours']} giờ):")
                 for topic in plan['theory_topics']:
@@ -1842,5 +1638,89 @@ def main():
                 for resource in plan['learning_resources']:
                     print(f"- {resource}")
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mô hình lộ trình học tập')
+    subparsers = parser.add_subparsers(dest='command')
+
+    train_parser = subparsers.add_parser('train', help='Huấn luyện mô hình và ghi nguyên tử ra file')
+    train_parser.add_argument('--data', default='training_data.csv', help='File dữ liệu huấn luyện')
+    train_parser.add_argument('--model', default='learning_path_model.joblib', help='File mô hình')
+    train_parser.add_argument('--min-r2', type=float, default=0.0,
+                              help='R2 kiểm tra tối thiểu để nhận mô hình mới')
+    train_parser.add_argument('--force', action='store_true',
+                              help='Không so với R2 của mô hình đang có trong file')
+    train_parser.add_argument('--sample-frac', type=float, default=None,
+                              help='Chỉ dùng ngẫu nhiên một phần dữ liệu (0-1)')
+    train_parser.add_argument('--max-rows', type=int, default=None, help='Số mẫu tối đa dùng để huấn luyện')
+    train_parser.add_argument('--estimator', choices=ESTIMATOR_KINDS, default=None,
+                              help='Loại mô hình (mặc định MODEL_ESTIMATOR hoặc random_forest)')
+
+    lut_parser = subparsers.add_parser('build-lut', help='Dựng bảng tra tỷ lệ thành công từ mô hình đã lưu')
+    lut_parser.add_argument('--model', default='learning_path_model.joblib', help='File mô hình')
+    lut_parser.add_argument('--output', default='success_rate_lut.npy', help='File bảng tra (.npy, kèm .json)')
+    for name, (start, stop, step) in DEFAULT_AXES.items():
+        lut_parser.add_argument(f"--{name.replace('_', '-')}", type=float, nargs=3, default=None,
+                                metavar=('START', 'STOP', 'STEP'),
+                                help=f'Lưới của {name} (mặc định {start:g} {stop:g} {step:g})')
+
+    bench_parser = subparsers.add_parser('benchmark', help='So sánh thời gian huấn luyện, độ trễ, kích thước và R2 các loại mô hình')
+    bench_parser.add_argument('--data', default='training_data.csv', help='File dữ liệu huấn luyện')
+    bench_parser.add_argument('--estimators', nargs='+', choices=ESTIMATOR_KINDS, default=list(ESTIMATOR_KINDS))
+    bench_parser.add_argument('--batch-size', type=int, default=1000, help='Số hồ sơ mỗi lô khi đo dự đoán theo lô')
+    bench_parser.add_argument('--repeats', type=int, default=20, help='Số lần đo độ trễ (lấy trung vị)')
+    bench_parser.add_argument('--sample-frac', type=float, default=None)
+    bench_parser.add_argument('--max-rows', type=int, default=None)
+    bench_parser.add_argument('--min-r2', type=float, default=None,
+                              help='Gợi ý mô hình dự đoán nhanh nhất có R2 kiểm tra từ mức này')
+
+    subparsers.add_parser('demo', help='Tạo thử lộ trình cho một học sinh mẫu')
+
+    args = parser.parse_args(argv)
+    if args.command == 'train':
+        ai = LearningPathAI(estimator=args.estimator)
+        if os.path.exists(args.model):
+            # Mô hình hiện có là mốc để so điểm
+            ai.load_model(args.model)
+        if not ai.retrain(args.data, args.model, min_r2=args.min_r2, compare=not args.force,
+                          sample_frac=args.sample_frac, max_rows=args.max_rows):
+            print("Không dùng mô hình mới")
+            return 1
+        metrics = ai.training_metadata['metrics']
+        print(f"Đã lưu mô hình vào {args.model} "
+              f"(R2 huấn luyện {metrics['train_r2']:.3f}, R2 kiểm tra {metrics['test_r2']:.3f})")
+        return 0
+
+    if args.command == 'build-lut':
+        ai = LearningPathAI()
+        ai.lut_path = None
+        if not ai.ensure_model(args.model):
+            print("Mô hình chưa sẵn sàng")
+            return 1
+        axes = {name: tuple(getattr(args, name)) for name in DEFAULT_AXES if getattr(args, name) is not None}
+        lut = ai.build_lut(args.output, axes)
+        print(f"Đã dựng bảng tra {args.output}: {'x'.join(map(str, lut.metadata['shape']))} điểm, "
+              f"{lut.metadata['build_seconds']} s, sai số lớn nhất {lut.metadata['max_abs_error']:.4f}, "
+              f"sai số trung bình {lut.metadata['mean_abs_error']:.4f}")
+        return 0
+
+    if args.command == 'benchmark':
+        from model_benchmark import benchmark, format_report
+        results = benchmark(LearningPathAI(), args.data, args.estimators, args.batch_size, args.repeats,
+                            args.sample_frac, args.max_rows)
+        print(format_report(results))
+        if args.min_r2 is not None:
+            eligible = [r for r in results if r['test_r2'] >= args.min_r2]
+            if eligible:
+                best = min(eligible, key=lambda r: r['single_ms'])
+                print(f"\nNhanh nhất với R2 kiểm tra >= {args.min_r2}: {best['estimator']}")
+            else:
+                print(f"\nKhông có mô hình nào đạt R2 kiểm tra >= {args.min_r2}")
+        return 0
+
+    demo()
+    return 0
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from logging_config import setup_logging
+    setup_logging()
+    sys.exit(main())
\ No newline at end of file
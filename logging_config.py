@@ -0,0 +1,50 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+# Các thuộc tính có sẵn của LogRecord, không đưa vào phần "extra" của log JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Ghi mỗi bản ghi log thành một dòng JSON (thời gian, cấp độ, logger, nội dung)"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        # Các trường truyền qua extra={...}
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level=None, fmt=None):
+    """Cấu hình logging cho toàn ứng dụng.
+
+    Cấp độ lấy từ LOG_LEVEL (mặc định INFO), định dạng từ LOG_FORMAT
+    ('text' mặc định hoặc 'json'). Gọi lại nhiều lần chỉ cập nhật cấu hình.
+    """
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.environ.get('LOG_FORMAT', 'text')).lower()
+
+    handler = logging.StreamHandler()
+    if fmt == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        if getattr(old, '_app_handler', False):
+            root.removeHandler(old)
+    handler._app_handler = True
+    root.addHandler(handler)
+    root.setLevel(level)
@@ -0,0 +1,85 @@
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from learning_path_ai import ESTIMATOR_KINDS, FEATURES
+from training_data import load_training_data
+
+logger = logging.getLogger(__name__)
+
+# Cột của bảng kết quả: (khóa, tiêu đề, định dạng)
+REPORT_COLUMNS = [
+    ('estimator', 'Mô hình', '{}'),
+    ('test_r2', 'R2 kiểm tra', '{:.3f}'),
+    ('fit_seconds', 'Huấn luyện (s)', '{:.2f}'),
+    ('single_ms', '1 hồ sơ (ms)', '{:.2f}'),
+    ('batch_ms', 'Lô (ms)', '{:.1f}'),
+    ('batch_us_per_row', 'Lô (µs/hồ sơ)', '{:.1f}'),
+    ('size_kb', 'File (KB)', '{:.0f}'),
+]
+
+
+def _median_ms(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def benchmark(ai, training_data_path='training_data.csv', estimators=ESTIMATOR_KINDS,
+              batch_size=1000, repeats=20, sample_frac=None, max_rows=None):
+    """Huấn luyện từng loại mô hình trên cùng dữ liệu và đo hiệu năng.
+
+    Mỗi dòng kết quả gồm R2 trên tập kiểm tra của train(), thời gian fit, độ trễ dự đoán
+    một hồ sơ (predict_success_rate) và một lô batch_size hồ sơ (predict_success_rate_batch),
+    và kích thước file mô hình. Mô hình đang dùng của ai không bị thay đổi.
+    """
+    profiles = load_training_data(training_data_path, max_rows=batch_size)[FEATURES]
+    single = profiles.iloc[0].to_dict()
+
+    results = []
+    for kind in estimators:
+        candidate = ai.candidate(kind)
+        if not candidate.train(training_data_path, save=False, sample_frac=sample_frac, max_rows=max_rows):
+            logger.warning("Không huấn luyện được mô hình %s", kind)
+            continue
+        metadata = candidate.training_metadata
+
+        # Lần gọi đầu khởi tạo bộ nhớ đệm của thư viện, không tính vào kết quả
+        candidate.predict_success_rate(**single)
+        single_ms = _median_ms(lambda: candidate.predict_success_rate(**single), repeats)
+        batch_ms = _median_ms(lambda: candidate.predict_success_rate_batch(profiles), max(3, repeats // 4))
+
+        fd, path = tempfile.mkstemp(suffix='.joblib')
+        os.close(fd)
+        try:
+            candidate.save_model(path)
+            size_kb = os.path.getsize(path) / 1024
+        finally:
+            os.remove(path)
+
+        results.append({
+            'estimator': kind,
+            'test_r2': metadata['metrics']['test_r2'],
+            'train_r2': metadata['metrics']['train_r2'],
+            'n_samples': metadata['n_samples'],
+            'fit_seconds': metadata['fit_seconds'],
+            'single_ms': single_ms,
+            'batch_ms': batch_ms,
+            'batch_us_per_row': batch_ms * 1000 / len(profiles),
+            'size_kb': size_kb
+        })
+    return results
+
+
+def format_report(results):
+    """Bảng kết quả dạng văn bản, sắp theo R2 kiểm tra giảm dần"""
+    rows = [[title for _, title, _ in REPORT_COLUMNS]]
+    for result in sorted(results, key=lambda r: r['test_r2'], reverse=True):
+        rows.append([fmt.format(result[key]) for key, _, fmt in REPORT_COLUMNS])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(REPORT_COLUMNS))]
+    return '\n'.join('  '.join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
@@ -0,0 +1,104 @@
+import logging
+import threading
+
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+
+class OnlineRegressor(BaseEstimator, RegressorMixin):
+    """Hồi quy tuyến tính học tăng dần (SGD) cho tỷ lệ thành công.
+
+    Các cột phân loại (đã mã hóa thành số 0..k-1) được one-hot, các cột số được chuẩn hóa.
+    fit() huấn luyện lại từ đầu; partial_fit() cập nhật bằng một lô nhỏ mẫu mới và giữ
+    nguyên thang chuẩn hóa của lần fit đầu để các hệ số đã học không bị lệch.
+    """
+
+    def __init__(self, categorical_features=(), alpha=1e-4, eta0=0.01, max_iter=50, random_state=42):
+        self.categorical_features = categorical_features
+        self.alpha = alpha
+        self.eta0 = eta0
+        self.max_iter = max_iter
+        self.random_state = random_state
+
+    def _split(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        categorical = list(self.categorical_features)
+        numeric = [i for i in range(X.shape[1]) if i not in categorical]
+        return X[:, categorical].astype(np.int64), X[:, numeric]
+
+    def _expand(self, X):
+        codes, numeric = self._split(X)
+        blocks = [self.scaler_.transform(numeric)]
+        for j, size in enumerate(self.n_categories_):
+            # Mã ngoài khoảng đã biết cho hàng toàn 0
+            onehot = np.zeros((len(codes), size))
+            known = (codes[:, j] >= 0) & (codes[:, j] < size)
+            onehot[np.flatnonzero(known), codes[known, j]] = 1.0
+            blocks.append(onehot)
+        return np.hstack(blocks)
+
+    def _new_sgd(self):
+        return SGDRegressor(alpha=self.alpha, eta0=self.eta0, max_iter=self.max_iter,
+                            tol=1e-4, random_state=self.random_state)
+
+    def fit(self, X, y):
+        codes, numeric = self._split(X)
+        self.n_categories_ = [int(codes[:, j].max()) + 1 for j in range(codes.shape[1])]
+        self.scaler_ = StandardScaler().fit(numeric)
+        self.sgd_ = self._new_sgd().fit(self._expand(X), np.asarray(y, dtype=np.float64))
+        return self
+
+    def partial_fit(self, X, y):
+        if not hasattr(self, 'sgd_'):
+            return self.fit(X, y)
+        self.sgd_.partial_fit(self._expand(X), np.asarray(y, dtype=np.float64))
+        return self
+
+    def predict(self, X):
+        return self.sgd_.predict(self._expand(X))
+
+
+class OutcomeBuffer:
+    """Gom kết quả học tập thực tế thành lô nhỏ rồi mới cập nhật mô hình.
+
+    apply(rows) được gọi (ngoài khóa của bộ đệm) mỗi khi đủ batch_size kết quả hoặc khi flush().
+    """
+
+    def __init__(self, apply, batch_size=32):
+        self.apply = apply
+        self.batch_size = batch_size
+        self._rows = []
+        self._lock = threading.Lock()
+        self.applied = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, rows):
+        """Thêm kết quả; trả về số mẫu đã dùng để cập nhật mô hình trong lần gọi này"""
+        with self._lock:
+            self._rows.extend(rows)
+            if len(self._rows) < self.batch_size:
+                return 0
+            batch, self._rows = self._rows, []
+        return self._apply(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._rows = self._rows, []
+        return self._apply(batch) if batch else 0
+
+    def _apply(self, batch):
+        try:
+            used = self.apply(batch)
+        except Exception:
+            # Giữ lại lô để lần sau cập nhật tiếp
+            with self._lock:
+                self._rows[:0] = batch
+            raise
+        self.applied += used
+        return used
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PlanCache:
+    """Bộ nhớ đệm LRU có thời hạn cho khung lộ trình học tập (chưa gắn ngày).
+
+    Giữ tối đa max_entries mục; mục quá ttl giây được coi như không có.
+    Đếm số lần trúng/trượt để theo dõi hiệu quả.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (thời điểm lưu, giá trị), thứ tự từ cũ đến mới dùng gần nhất
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Lấy giá trị đã lưu, None nếu không có hoặc đã hết hạn"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Xóa toàn bộ mục (khi danh mục hoặc mô hình thay đổi)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
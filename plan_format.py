@@ -0,0 +1,96 @@
+# Tên và phiên bản định dạng trả về cho client
+COMPACT_FORMAT = 'compact'
+COMPACT_FORMAT_VERSION = 1
+
+
+def _content_key(item):
+    """Khóa theo nội dung để gộp các mục bằng nhau nhưng là đối tượng khác nhau.
+
+    Dict và list được đổi đệ quy sang tuple (khóa của dict sắp theo repr), nên hai mục bằng
+    nhau luôn cho cùng một khóa dù giá trị bên trong có băm được hay không.
+    """
+    if isinstance(item, dict):
+        return (dict, tuple(sorted(((key, _content_key(value)) for key, value in item.items()),
+                                   key=lambda kv: repr(kv[0]))))
+    if isinstance(item, (list, tuple)):
+        return (list, tuple(_content_key(value) for value in item))
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        return repr(item)
+
+
+class _Registry:
+    """Gán ID cho các mục, mỗi mục (theo nội dung) một ID"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.items = {}
+        # Các khung lộ trình dùng chung đối tượng mục giữa các ngày nên tra theo id() trước
+        self._by_object = {}
+        self._by_content = {}
+        self._new = {}
+
+    def ids(self, items):
+        result = []
+        for item in items:
+            entry = self._by_object.get(id(item))
+            if entry is None or entry[0] is not item:
+                key = _content_key(item)
+                item_id = self._by_content.get(key)
+                if item_id is None:
+                    item_id = f'{self.prefix}{len(self.items)}'
+                    self._by_content[key] = item_id
+                    self.items[item_id] = item
+                    self._new[item_id] = item
+                # Giữ tham chiếu tới item để id() không bị dùng lại cho đối tượng khác
+                entry = (item, item_id)
+                self._by_object[id(item)] = entry
+            result.append(entry[1])
+        return result
+
+    def take_new(self):
+        """Các mục mới được gán ID từ lần gọi trước"""
+        new, self._new = self._new, {}
+        return new
+
+
+class PlanCompactor:
+    """Chuyển từng tuần của lộ trình sang dạng gọn, dùng chung từ điển cho cả lộ trình.
+
+    Trong lộ trình đầy đủ mỗi ngày chứa bản sao danh sách tài liệu và bài tập. Ở dạng gọn,
+    tài liệu và bài tập chỉ xuất hiện một lần trong các từ điển resources/exercises (khóa là
+    ID như 'r0', 'e0'); learning_resources và practice_exercises của mỗi ngày là danh sách ID.
+    """
+
+    def __init__(self):
+        self.resources = _Registry('r')
+        self.exercises = _Registry('e')
+
+    def compact_week(self, week_plan):
+        daily_plans = []
+        for daily_plan in week_plan['daily_plans']:
+            daily_plans.append(dict(
+                daily_plan,
+                learning_resources=self.resources.ids(daily_plan.get('learning_resources') or []),
+                practice_exercises=self.exercises.ids(daily_plan.get('practice_exercises') or [])
+            ))
+        return dict(week_plan, daily_plans=daily_plans)
+
+    def take_new(self):
+        """(tài liệu mới, bài tập mới) xuất hiện từ lần gọi trước, dùng khi gửi lộ trình theo từng tuần"""
+        return self.resources.take_new(), self.exercises.take_new()
+
+
+def compact_learning_path(learning_path):
+    """Lộ trình đầy đủ (kết quả generate_learning_path) -> dạng gọn"""
+    compactor = PlanCompactor()
+    weekly_plans = [compactor.compact_week(week_plan) for week_plan in learning_path['weekly_plans']]
+    return dict(
+        learning_path,
+        weekly_plans=weekly_plans,
+        resources=compactor.resources.items,
+        exercises=compactor.exercises.items
+    )
+
@@ -0,0 +1,375 @@
+import atexit
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class PlanStore:
+    """Lộ trình học tập đã tạo, lưu trong các bảng learning_path và daily_plans của backend.
+
+    Mỗi lộ trình là một dòng learning_path và một dòng daily_plans cho mỗi ngày, ghi bằng
+    insert_many nên chỉ tốn một lần ghi cho cả lộ trình. Bảng learning_path được nạp một
+    lần và đánh chỉ mục theo path_id và user_id; các ngày của một lộ trình được đọc từ
+    backend (cột path_id có chỉ mục) khi cần và chỉ max_cached_paths lộ trình dùng gần
+    nhất được giữ lại trong bộ nhớ.
+    """
+
+    PATH_ID_PREFIX = 'LP'
+    # Các cột danh sách/dict của daily_plans được lưu dạng chuỗi JSON
+    JSON_COLUMNS = ('theory_topics', 'practice_exercises', 'learning_resources', 'topic_details')
+
+    def __init__(self, backend, max_cached_paths=256):
+        self.backend = backend
+        self.max_cached_paths = max_cached_paths
+        self._lock = threading.RLock()
+        self._by_id = None
+        self._by_user = None
+        self._last_number = 0
+        # path_id -> các dòng daily_plans của lộ trình và chỉ mục theo mã ngày / ngày học (LRU)
+        self._days = OrderedDict()
+        # plan_id ngày -> completed đã nhận nhưng chưa ghi xuống backend; áp lại khi nạp lại các ngày
+        self._unwritten = {}
+
+    def _ensure_loaded(self):
+        if self._by_id is None:
+            with self._lock:
+                if self._by_id is None:
+                    by_id = {}
+                    by_user = {}
+                    last_number = 0
+                    for row in self.backend.read_all('learning_path'):
+                        by_id[row['path_id']] = row
+                        by_user.setdefault(row['user_id'], []).append(row)
+                        last_number = max(last_number, self._path_number(row['path_id']))
+                    # Mã đã cấp nhưng chưa lưu (lộ trình đang dựng) không được cấp lại
+                    self._last_number = max(self._last_number, last_number)
+                    self._by_user = by_user
+                    self._by_id = by_id
+        return self._by_id
+
+    def _path_number(self, path_id):
+        try:
+            return int(str(path_id)[len(self.PATH_ID_PREFIX):])
+        except (TypeError, ValueError):
+            return 0
+
+    def new_path_id(self):
+        """Cấp mã cho một lộ trình sắp lưu (để gửi cho client trước khi lộ trình dựng xong)"""
+        self._ensure_loaded()
+        with self._lock:
+            self._last_number += 1
+            return f'{self.PATH_ID_PREFIX}{self._last_number:06d}'
+
+    @staticmethod
+    def day_id(path_id, week_number, day):
+        """Mã ngày học: <path_id>-<tuần>-<thứ tự ngày trong tuần, từ 1>"""
+        return f'{path_id}-{week_number:03d}-{day}'
+
+    def with_ids(self, path_id, week_plan):
+        """Bản sao của một tuần, mỗi ngày có plan_id để client gửi tiến độ và lấy bài đánh giá"""
+        daily_plans = [
+            dict(daily_plan, plan_id=self.day_id(path_id, week_plan['week_number'], day + 1))
+            for day, daily_plan in enumerate(week_plan['daily_plans'])
+        ]
+        return dict(week_plan, daily_plans=daily_plans)
+
+    def save(self, user_id, learning_path, current_score, target_score, path_id=None):
+        """Lưu lộ trình (kết quả generate_learning_path) của một người dùng, trả về dòng learning_path.
+
+        path_id là mã đã cấp bằng new_path_id; mặc định cấp mã mới.
+        """
+        weekly_plans = learning_path['weekly_plans']
+        path_id = path_id or self.new_path_id()
+        with self._lock:
+            # Chỉ mục có thể đã bị bỏ (invalidate) từ lúc cấp mã: nạp lại trước khi ghi
+            # để lộ trình mới không bị tính hai lần khi nạp
+            self._ensure_loaded()
+            path = {
+                'path_id': path_id,
+                'user_id': user_id,
+                'subject': learning_path['subject'],
+                'current_score': current_score,
+                'target_score': target_score,
+                'duration_weeks': learning_path['total_weeks'],
+                'daily_study_hours': learning_path['daily_study_hours'],
+                'learning_style': learning_path['learning_style'],
+                'success_rate': learning_path['predicted_success_rate'],
+                'start_date': weekly_plans[0]['start_date'] if weekly_plans else None,
+                'end_date': weekly_plans[-1]['end_date'] if weekly_plans else None,
+                'status': 'active',
+                'grade': learning_path['grade'],
+                'level': learning_path['level'],
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            days = []
+            for week_plan in weekly_plans:
+                for day, daily_plan in enumerate(week_plan['daily_plans']):
+                    row = {
+                        'plan_id': self.day_id(path_id, week_plan['week_number'], day + 1),
+                        'path_id': path_id,
+                        'date': daily_plan['date'],
+                        'theory_hours': daily_plan['theory_hours'],
+                        'practice_hours': daily_plan['practice_hours'],
+                        'completed': False,
+                        'week_number': week_plan['week_number']
+                    }
+                    for column in self.JSON_COLUMNS:
+                        row[column] = json.dumps(daily_plan.get(column, []), ensure_ascii=False)
+                    days.append(row)
+
+            # Ghi các ngày trước để dòng learning_path chỉ xuất hiện khi lộ trình đã đủ
+            self.backend.insert_many('daily_plans', days)
+            self.backend.insert('learning_path', path)
+            self._by_id[path_id] = path
+            self._by_user.setdefault(user_id, []).append(path)
+            self._remember_days(path_id, self._index_days(days))
+            return dict(path)
+
+    def get_path(self, path_id):
+        """Dòng learning_path (bản sao), None nếu không có"""
+        path = self._ensure_loaded().get(path_id)
+        return dict(path) if path else None
+
+    def paths_for_user(self, user_id):
+        """Các lộ trình của một người dùng theo thứ tự đã lưu"""
+        self._ensure_loaded()
+        return [dict(path) for path in self._by_user.get(user_id, ())]
+
+    def _day_rows(self, path_id):
+        return self._day_lookup(path_id)['rows']
+
+    def _day_lookup(self, path_id):
+        """{'rows': các dòng theo thứ tự, plan_id: dòng, ('date', ngày): dòng} của một lộ trình"""
+        with self._lock:
+            lookup = self._days.get(path_id)
+            if lookup is not None:
+                self._days.move_to_end(path_id)
+                return lookup
+            rows = self.backend.find('daily_plans', 'path_id', path_id)
+            for row in rows:
+                if row['plan_id'] in self._unwritten:
+                    row['completed'] = self._unwritten[row['plan_id']]
+            lookup = self._index_days(rows)
+            self._remember_days(path_id, lookup)
+            return lookup
+
+    def _remember_days(self, path_id, lookup):
+        with self._lock:
+            self._days[path_id] = lookup
+            self._days.move_to_end(path_id)
+            while len(self._days) > self.max_cached_paths:
+                self._days.popitem(last=False)
+
+    @staticmethod
+    def _index_days(rows):
+        lookup = {'rows': rows}
+        for row in rows:
+            lookup[row['plan_id']] = row
+            lookup[('date', str(row['date'])[:10])] = row
+        return lookup
+
+    def find_day(self, plan_id, date=None):
+        """Dòng daily_plans theo mã ngày, hoặc theo mã lộ trình và ngày học; None nếu không có"""
+        # Mã ngày có dạng <path_id>-<tuần>-<thứ tự ngày>
+        path_id = str(plan_id).split('-')[0]
+        if path_id not in self._ensure_loaded():
+            return None
+        lookup = self._day_lookup(path_id)
+        if plan_id == path_id:
+            return lookup.get(('date', str(date)[:10])) if date else None
+        return lookup.get(plan_id)
+
+    def mark_completed(self, completed):
+        """Cập nhật cờ completed trong bộ nhớ ({plan_id ngày: bool}); ghi xuống backend bằng write_completed"""
+        with self._lock:
+            for plan_id, value in completed.items():
+                row = self.find_day(plan_id)
+                if row is not None:
+                    row['completed'] = value
+                    self._unwritten[plan_id] = value
+
+    def write_completed(self, completed):
+        """Ghi cờ completed của nhiều ngày xuống backend trong một lần"""
+        updated = self.backend.update_many(
+            'daily_plans', 'plan_id', [(plan_id, {'completed': value}) for plan_id, value in completed.items()]
+        )
+        with self._lock:
+            for plan_id, value in completed.items():
+                # Giá trị mới hơn (nhận trong lúc ghi) vẫn phải được áp khi nạp lại
+                if self._unwritten.get(plan_id) == value:
+                    del self._unwritten[plan_id]
+        return updated
+
+    def _decode_day(self, row):
+        day = dict(row)
+        for column in self.JSON_COLUMNS:
+            value = day.get(column)
+            day[column] = json.loads(value) if isinstance(value, str) and value else []
+        day['completed'] = bool(day['completed'])
+        return day
+
+    def get_day(self, plan_id, date=None):
+        """Một ngày học (như find_day, cột JSON đã được giải mã), None nếu không có"""
+        row = self.find_day(plan_id, date)
+        return self._decode_day(row) if row is not None else None
+
+    def daily_plans(self, path_id):
+        """Các ngày của lộ trình, cột JSON đã được giải mã"""
+        return [self._decode_day(row) for row in self._day_rows(path_id)]
+
+    def load_learning_path(self, path_id):
+        """Dựng lại lộ trình cùng cấu trúc với generate_learning_path, None nếu không có"""
+        path = self.get_path(path_id)
+        if path is None:
+            return None
+        weeks = {}
+        for day in self.daily_plans(path_id):
+            week_number = int(day['week_number'])
+            for detail in day['topic_details']:
+                detail['completed'] = day['completed']
+            weeks.setdefault(week_number, []).append({
+                'plan_id': day['plan_id'],
+                'date': day['date'],
+                'theory_topics': day['theory_topics'],
+                'practice_exercises': day['practice_exercises'],
+                'theory_hours': float(day['theory_hours']),
+                'practice_hours': float(day['practice_hours']),
+                'learning_resources': day['learning_resources'],
+                'topic_details': day['topic_details'],
+                'completed': day['completed']
+            })
+        weekly_plans = []
+        for week_number in sorted(weeks):
+            daily_plans = weeks[week_number]
+            weekly_plans.append({
+                'week_number': week_number,
+                'start_date': daily_plans[0]['date'],
+                'end_date': _add_days(daily_plans[0]['date'], 6),
+                'level': path['level'],
+                'predicted_success_rate': float(path['success_rate']),
+                'daily_plans': daily_plans
+            })
+        return {
+            'path_id': path['path_id'],
+            'subject': path['subject'],
+            'grade': path['grade'],
+            'level': path['level'],
+            'predicted_success_rate': float(path['success_rate']),
+            'total_weeks': int(path['duration_weeks']),
+            'daily_study_hours': float(path['daily_study_hours']),
+            'learning_style': path['learning_style'],
+            'weekly_plans': weekly_plans
+        }
+
+    def invalidate(self):
+        """Bỏ chỉ mục để lần dùng sau nạp lại từ backend"""
+        with self._lock:
+            self._by_id = None
+            self._by_user = None
+            self._days.clear()
+
+
+def _add_days(date_text, days):
+    return (datetime.strptime(str(date_text)[:10], '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+class ProgressTracker:
+    """Gom sự kiện hoàn thành ngày học trong bộ nhớ rồi ghi xuống backend theo lô.
+
+    Mỗi sự kiện (mã lộ trình, ngày, completed) được gộp theo ngày học, sự kiện sau ghi đè
+    sự kiện trước, và có hiệu lực ngay với các lần đọc qua PlanStore. Một luồng nền ghi các
+    thay đổi đang chờ mỗi interval giây bằng một lần update_many; khi số ngày đang chờ vượt
+    max_pending thì ghi ngay. Thay đổi chưa ghi được giữ lại cho lần sau.
+    """
+
+    def __init__(self, plans, interval=5, max_pending=5000):
+        self.plans = plans
+        self.interval = interval
+        self.max_pending = max_pending
+        # plan_id ngày -> completed
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self.written = 0
+        self.flushes = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, events):
+        """Nhận danh sách sự kiện {plan_id, date, completed}; trả về (số sự kiện nhận, [lỗi theo vị trí])"""
+        accepted = {}
+        errors = []
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                errors.append({'index': index, 'error': 'Sự kiện phải là đối tượng JSON'})
+                continue
+            completed = event.get('completed', True)
+            # Chỉ nhận true/false thật: chuỗi như "false" hay "0" không được coi là đã hoàn thành
+            if not isinstance(completed, bool):
+                errors.append({'index': index, 'error': 'completed phải là true hoặc false'})
+                continue
+            plan_id = event.get('plan_id') or event.get('path_id')
+            row = self.plans.find_day(plan_id, event.get('date')) if plan_id else None
+            if row is None:
+                errors.append({'index': index, 'error': 'Không tìm thấy ngày học'})
+                continue
+            accepted[row['plan_id']] = completed
+        if accepted:
+            self.plans.mark_completed(accepted)
+            with self._lock:
+                self._pending.update(accepted)
+                full = len(self._pending) >= self.max_pending
+            if full:
+                self.flush()
+        return len(events) - len(errors), errors
+
+    def flush(self):
+        """Ghi các thay đổi đang chờ, trả về số ngày đã ghi"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                self.plans.write_completed(batch)
+            except Exception:
+                with self._lock:
+                    # Sự kiện mới hơn (đến trong lúc ghi) được ưu tiên
+                    self._pending = {**batch, **self._pending}
+                raise
+            self.written += len(batch)
+            self.flushes += 1
+            return len(batch)
+
+    def start(self):
+        """Chạy luồng nền ghi định kỳ (và một lần khi tiến trình kết thúc)"""
+        if self._thread is not None:
+            return self._thread
+
+        def run():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Lỗi khi ghi tiến độ học tập")
+
+        self._thread = threading.Thread(target=run, name='progress-flush', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+        return self._thread
+
+    def stats(self):
+        return {
+            'pending': len(self._pending),
+            'written': self.written,
+            'flushes': self.flushes,
+            'interval': self.interval
+        }
@@ -0,0 +1,123 @@
+import itertools
+import json
+import logging
+import random
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Lựa chọn ngoài khoảng này không đưa được vào mảng int64 và được chấm là sai
+_INT64_MIN, _INT64_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
+
+
+class QuestionBank:
+    """Ngân hàng câu hỏi trắc nghiệm đọc một lần từ file JSON.
+
+    Câu hỏi được đánh chỉ mục theo (môn, lớp, chủ đề, cấp độ), kể cả các tổ hợp bỏ trống
+    lớp/chủ đề/cấp độ, nên việc chọn câu hỏi chỉ là tra dict. Đáp án đúng nằm trong một
+    mảng NumPy để chấm nhiều bài nộp cùng lúc; câu hỏi gửi cho client không kèm đáp án.
+    """
+
+    def __init__(self, path='question_bank.json'):
+        self.path = path
+        self._questions = []
+        # id câu hỏi -> vị trí trong _questions và _answers
+        self._positions = {}
+        # (môn, lớp|None, chủ đề|None, cấp độ|None) -> danh sách vị trí
+        self._index = {}
+        try:
+            with open(path, encoding='utf-8') as f:
+                questions = json.load(f).get('questions', [])
+        except (OSError, ValueError):
+            logger.exception("Không đọc được ngân hàng câu hỏi %s", path)
+            questions = []
+
+        for question in questions:
+            position = len(self._questions)
+            self._questions.append(question)
+            self._positions[question['id']] = position
+            fields = (str(question.get('grade')), question.get('topic'), question.get('level'))
+            for mask in itertools.product((True, False), repeat=len(fields)):
+                key = (question['subject'].lower(),) + tuple(v if keep else None for v, keep in zip(fields, mask))
+                self._index.setdefault(key, []).append(position)
+        self._answers = np.array([int(q['answer']) for q in self._questions], dtype=np.int16)
+
+    def __len__(self):
+        return len(self._questions)
+
+    def _lookup(self, subject, grade=None, topic=None, level=None):
+        return self._index.get((subject.lower(), str(grade) if grade is not None else None, topic, level), [])
+
+    @staticmethod
+    def _public(question):
+        return {k: v for k, v in question.items() if k != 'answer'}
+
+    def sample(self, subject, grade=None, topics=(), level=None, count=5, seed=None):
+        """Chọn tối đa count câu hỏi (không kèm đáp án), ưu tiên đúng chủ đề và cấp độ.
+
+        Khi không đủ câu hỏi của các chủ đề, lấy thêm câu cùng lớp và cấp độ, rồi cùng lớp,
+        rồi cùng môn. Cùng seed cho cùng bộ câu hỏi (dùng để bài đánh giá của một ngày không đổi).
+        """
+        tiers = []
+        for topic in topics:
+            tiers.append(self._lookup(subject, grade, topic, level))
+            tiers.append(self._lookup(subject, grade, topic))
+        tiers.append(self._lookup(subject, grade, None, level))
+        tiers.append(self._lookup(subject, grade))
+        tiers.append(self._lookup(subject))
+
+        if count < 1:
+            return []
+        rng = random.Random(seed)
+        chosen = []
+        seen = set()
+        for tier in tiers:
+            pool = [position for position in tier if position not in seen]
+            picked = rng.sample(pool, min(count - len(chosen), len(pool)))
+            chosen.extend(picked)
+            seen.update(picked)
+            if len(chosen) >= count:
+                break
+        return [self._public(self._questions[position]) for position in chosen]
+
+    def score(self, submissions):
+        """Chấm nhiều bài nộp, mỗi bài là {id câu hỏi: chỉ số đáp án đã chọn}.
+
+        Trả về danh sách {score, total, percentage, results: {id: đúng/sai}, unknown: [id không có]}
+        theo thứ tự bài nộp. Việc so đáp án và cộng điểm được làm một lần trên mảng của mọi bài nộp.
+        """
+        owners, positions, chosen, question_ids = [], [], [], []
+        unknown = [[] for _ in submissions]
+        for index, answers in enumerate(submissions):
+            for question_id, choice in answers.items():
+                position = self._positions.get(question_id)
+                if position is None:
+                    unknown[index].append(question_id)
+                    continue
+                try:
+                    choice = int(choice)
+                except (TypeError, ValueError, OverflowError):
+                    # OverflowError: số thực vô hạn như 1e400 hay Infinity trong JSON
+                    choice = -1
+                if not _INT64_MIN <= choice <= _INT64_MAX:
+                    choice = -1
+                owners.append(index)
+                positions.append(position)
+                chosen.append(choice)
+                question_ids.append(question_id)
+
+        owners = np.array(owners, dtype=np.int64)
+        correct = self._answers[np.array(positions, dtype=np.int64)] == np.array(chosen, dtype=np.int64)
+        scores = np.bincount(owners, weights=correct, minlength=len(submissions))
+        totals = np.bincount(owners, minlength=len(submissions))
+
+        results = [
+            {'score': int(score), 'total': int(total),
+             'percentage': round(100.0 * score / total, 1) if total else 0.0,
+             'results': {}, 'unknown': unknown[index]}
+            for index, (score, total) in enumerate(zip(scores, totals))
+        ]
+        for owner, question_id, is_correct in zip(owners.tolist(), question_ids, correct.tolist()):
+            results[owner]['results'][question_id] = is_correct
+        return results
@@ -0,0 +1,97 @@
+import logging
+import os
+import threading
+from datetime import datetime
+
+from learning_path_ai import _file_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class RetrainWorker:
+    """Luồng nền huấn luyện lại mô hình của LearningPathAI.
+
+    Mỗi interval giây (0 = không tự kiểm tra) luồng xem file dữ liệu huấn luyện có khác
+    dữ liệu của mô hình đang dùng không; trigger() yêu cầu huấn luyện lại ngay.
+    Mỗi lúc chỉ có một lần huấn luyện, việc kiểm tra và thay mô hình do LearningPathAI.retrain làm.
+    """
+
+    def __init__(self, ai, training_data_path='training_data.csv', model_path='learning_path_model.joblib',
+                 interval=0, min_r2=0.0):
+        self.ai = ai
+        self.training_data_path = training_data_path
+        self.model_path = model_path
+        self.interval = interval
+        self.min_r2 = min_r2
+        self.last_result = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._forced = False
+        self._last_stat = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='model-retrain', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def trigger(self):
+        """Yêu cầu huấn luyện lại ở luồng nền, kể cả khi dữ liệu không đổi"""
+        self._forced = True
+        self._wake.set()
+        self.start()
+
+    @property
+    def running(self):
+        return self._lock.locked()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval if self.interval > 0 else None)
+            self._wake.clear()
+            force, self._forced = self._forced, False
+            try:
+                self.run_once(force=force)
+            except Exception:
+                logger.exception("Lỗi khi huấn luyện lại mô hình")
+
+    def data_changed(self):
+        """File dữ liệu có khác dữ liệu đã dùng để huấn luyện mô hình hiện tại không"""
+        try:
+            stat = os.stat(self.training_data_path)
+        except FileNotFoundError:
+            return False
+        # Chỉ băm lại file khi thời gian sửa hoặc kích thước thay đổi
+        current = (stat.st_mtime_ns, stat.st_size)
+        if current == self._last_stat:
+            return False
+        self._last_stat = current
+        return _file_fingerprint(self.training_data_path) != self.ai.training_metadata.get('training_fingerprint')
+
+    def run_once(self, force=False):
+        """Huấn luyện lại nếu cần; trả về True khi mô hình mới được dùng"""
+        with self._lock:
+            if not os.path.exists(self.training_data_path):
+                logger.warning("Không có dữ liệu huấn luyện %s", self.training_data_path)
+                return False
+            # Chưa có mô hình thì chưa có gì để so; việc tải lần đầu do ensure_model làm
+            if not force and (not self.ai.is_trained or not self.data_changed()):
+                return False
+            logger.info("Bắt đầu huấn luyện lại mô hình từ %s", self.training_data_path)
+            accepted = self.ai.retrain(self.training_data_path, self.model_path, min_r2=self.min_r2)
+            self.last_result = {
+                'accepted': accepted,
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'live_metrics': self.ai.training_metadata.get('metrics')
+            }
+            return accepted
+
+    def status(self):
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'training_data_path': self.training_data_path,
+            'model': self.ai.training_metadata,
+            'last_result': self.last_result
+        }
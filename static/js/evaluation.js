@@ -1,5 +1,8 @@
+// Câu hỏi của bài đánh giá đang mở (lấy từ server, không kèm đáp án)
+let currentQuestions = [];
+
 // Hàm tạo bài đánh giá
-function createEvaluation(dayNumber, subjectParam = null, subjectNameParam = null) {
+async function createEvaluation(dayNumber, subjectParam = null, subjectNameParam = null, planId = null) {
     const modal = document.getElementById('evaluationModal');
     const evaluationDay = document.getElementById('evaluationDay');
     const evaluationSubject = document.getElementById('evaluationSubject');
@@ -17,13 +20,24 @@ function createEvaluation(dayNumber, subjectParam = null, subjectNameParam = nul
     // Hiển thị thông tin
     evaluationDay.textContent = `Ngày ${dayNumber}`;
     evaluationSubject.textContent = subjectName || subject;
+    quizContainer.innerHTML = '<p>Đang tải câu hỏi...</p>';
+    modal.style.display = 'flex';
     
-    // Tạo câu hỏi dựa trên môn học và ngày học
-    const questions = generateQuestions(subject, dayNumber);
+    // Chỉ lấy câu hỏi của ngày học hiện tại từ server
+    try {
+        currentQuestions = await fetchQuestions(subject, planId);
+    } catch (error) {
+        console.error('[ERROR] Không tải được câu hỏi:', error);
+        currentQuestions = [];
+    }
+    if (currentQuestions.length === 0) {
+        quizContainer.innerHTML = '<p>Chưa có câu hỏi cho bài học này.</p>';
+        return;
+    }
     
     // Hiển thị câu hỏi
-    quizContainer.innerHTML = questions.map((q, index) => `
-        <div class="quiz-question">
+    quizContainer.innerHTML = currentQuestions.map((q, index) => `
+        <div class="quiz-question" data-question-id="${q.id}">
             <h4>Câu ${index + 1}: ${q.question}</h4>
             <div class="quiz-options">
                 ${q.options.map((option, optIndex) => `
@@ -36,9 +50,6 @@ function createEvaluation(dayNumber, subjectParam = null, subjectNameParam = nul
         </div>
     `).join('');
     
-    // Hiển thị modal
-    modal.style.display = 'flex';
-    
     // Xử lý sự kiện chọn đáp án
     document.querySelectorAll('.quiz-option').forEach(option => {
         option.addEventListener('click', function() {
@@ -51,71 +62,39 @@ function createEvaluation(dayNumber, subjectParam = null, subjectNameParam = nul
     });
 }
 
-// Hàm tạo câu hỏi dựa trên môn học và ngày học
-function generateQuestions(subject, dayNumber) {
-    // Đây là dữ liệu mẫu, trong thực tế sẽ được lấy từ server
-    const questions = {
-        math: [
-            {
-                question: "Giải phương trình bậc hai: x² + 5x + 6 = 0",
-                options: [
-                    "x = -2 hoặc x = -3",
-                    "x = 2 hoặc x = 3",
-                    "x = -1 hoặc x = -4",
-                    "x = 1 hoặc x = 4"
-                ],
-                correctAnswer: 0
-            },
-            {
-                question: "Tính đạo hàm của hàm số f(x) = x² + 3x + 2",
-                options: [
-                    "f'(x) = 2x + 3",
-                    "f'(x) = 2x + 2",
-                    "f'(x) = x + 3",
-                    "f'(x) = x + 2"
-                ],
-                correctAnswer: 0
-            }
-        ],
-        physics: [
-            {
-                question: "Công thức tính vận tốc trung bình là:",
-                options: [
-                    "v = s/t",
-                    "v = t/s",
-                    "v = s×t",
-                    "v = s²/t"
-                ],
-                correctAnswer: 0
-            },
-            {
-                question: "Đơn vị của lực là:",
-                options: [
-                    "Newton (N)",
-                    "Joule (J)",
-                    "Watt (W)",
-                    "Pascal (Pa)"
-                ],
-                correctAnswer: 0
-            }
-        ]
-    };
-    
-    return questions[subject] || [];
+// Lấy câu hỏi từ server: theo ngày học đã lưu (planId) hoặc theo môn/lớp đang chọn
+async function fetchQuestions(subject, planId) {
+    const params = new URLSearchParams();
+    if (planId) {
+        params.set('plan_id', planId);
+    } else {
+        params.set('subject', subject);
+        const grade = document.getElementById('grade')?.value;
+        if (grade) params.set('grade', grade);
+    }
+    const response = await fetch(`/api/quiz?${params.toString()}`);
+    const data = await response.json();
+    if (!response.ok || !data.success) {
+        throw new Error(data.message || 'Lỗi khi tải câu hỏi');
+    }
+    return data.questions;
 }
 
 // Xử lý sự kiện nộp bài
-document.getElementById('submitEvaluation').addEventListener('click', function() {
-    const answers = [];
+document.getElementById('submitEvaluation').addEventListener('click', async function() {
+    // Nút đang ở trạng thái "Đóng" sau khi đã chấm bài
+    if (this.onclick) return;
+    const answers = {};
     let allAnswered = true;
     
     // Lấy tất cả câu hỏi
     const questions = document.querySelectorAll('.quiz-question');
+    if (questions.length === 0) return;
     
-    questions.forEach((question, index) => {
+    questions.forEach(question => {
         const selectedOption = question.querySelector('input[type="radio"]:checked');
         if (selectedOption) {
-            answers.push(parseInt(selectedOption.value));
+            answers[question.dataset.questionId] = parseInt(selectedOption.value);
         } else {
             allAnswered = false;
         }
@@ -126,19 +105,25 @@ document.getElementById('submitEvaluation').addEventListener('click', function()
         return;
     }
     
-    // Tính điểm
-    const score = calculateScore(answers);
-    
-    // Hiển thị kết quả
-    showEvaluationResult(score, questions.length);
+    // Chấm điểm ở server (đáp án không được gửi xuống trình duyệt)
+    try {
+        const response = await fetch('/api/quiz/score', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ submissions: [{ answers }] })
+        });
+        const data = await response.json();
+        if (!response.ok || !data.success) {
+            throw new Error(data.message || 'Lỗi khi chấm bài');
+        }
+        const result = data.results[0];
+        showEvaluationResult(result.score, result.total);
+    } catch (error) {
+        console.error('[ERROR] Không chấm được bài:', error);
+        alert(error.message || 'Có lỗi xảy ra khi chấm bài. Vui lòng thử lại.');
+    }
 });
 
-// Hàm tính điểm
-function calculateScore(answers) {
-    // Trong thực tế, sẽ so sánh với đáp án đúng từ server
-    return answers.filter((answer, index) => answer === 0).length;
-}
-
 // Hàm hiển thị kết quả
 function showEvaluationResult(score, totalQuestions) {
     const modal = document.getElementById('evaluationModal');
@@ -50,6 +50,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 daily_study_hours: parseInt(document.getElementById('daily-study-hours')?.value) || 0,
                 learning_style: document.querySelector('input[name="learning-style"]:checked')?.value || ''
             };
+            // Người dùng đã đăng nhập: lộ trình được lưu ở server, mỗi ngày có plan_id
+            const userEmail = localStorage.getItem('userEmail');
+            if (userEmail) formData.email = userEmail;
             window.lastOverview = formData;
 
             // Log dữ liệu form trước khi validate
@@ -141,6 +144,14 @@ document.addEventListener('DOMContentLoaded', function() {
     function setCompletedDays(planId, completedDays) {
         localStorage.setItem(`completedDays_${planId}`, JSON.stringify(completedDays));
     }
+    // Helper: Gửi tiến độ ngày học của lộ trình đã lưu ở server (server ghi xuống theo lô)
+    function reportDayProgress(planId, completed) {
+        fetch('/api/progress', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ events: [{ plan_id: planId, completed: completed }] })
+        }).catch(error => console.error('[ERROR] Không gửi được tiến độ học tập:', error));
+    }
     // Helper: Tạo id duy nhất
     function generateId() {
         return Date.now().toString() + Math.random().toString(36).substr(2, 9);
@@ -207,7 +218,8 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
 
-        const plan = data.learning_path;
+        // learning_path là đối tượng có weekly_plans (và path_id khi đã lưu ở server)
+        const plan = Array.isArray(data.learning_path) ? data.learning_path : (data.learning_path.weekly_plans || []);
         plan.forEach((week, weekIndex) => {
             html += `
                 <div class="week-plan">
@@ -263,7 +275,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const saveButton = document.createElement('button');
         saveButton.className = 'btn btn-primary';
         saveButton.innerHTML = '<i class="fas fa-save"></i> Lưu Kế Hoạch';
-        saveButton.onclick = () => saveCurrentPlan(data.learning_path, window.lastOverview);
+        saveButton.onclick = () => saveCurrentPlan(plan, { ...window.lastOverview, path_id: data.learning_path.path_id || null });
         planContent.insertBefore(saveButton, planContent.firstChild);
     }
 
@@ -381,10 +393,10 @@ document.addEventListener('DOMContentLoaded', function() {
                                 <div class="day-plan">
                                     <div class="day-header" style="display:flex;justify-content:space-between;align-items:center;">
                                         <div style="display:flex;align-items:center;gap:1rem;">
-                                            <input type="checkbox" class="day-complete" data-day="${dayKey}" ${isCompleted ? 'checked' : ''} style="width:20px;height:20px;cursor:pointer;">
+                                            <input type="checkbox" class="day-complete" data-day="${dayKey}" data-plan-id="${day.plan_id || ''}" ${isCompleted ? 'checked' : ''} style="width:20px;height:20px;cursor:pointer;">
                                             <h5>Ngày ${dayIndex + 1}</h5>
                                         </div>
-                                        <button class='btn-evaluate btn-evaluate-day' data-day='${dayIndex+1}'><i class="fas fa-clipboard-check"></i> Đánh Giá</button>
+                                        <button class='btn-evaluate btn-evaluate-day' data-day='${dayIndex+1}' data-plan-id='${day.plan_id || ''}'><i class="fas fa-clipboard-check"></i> Đánh Giá</button>
                                     </div>
                                     <div style='margin-bottom:0.5rem;'><strong>Đánh giá ngày:</strong> <span style='color:#4CAF50;'>${dailyEvaluations[dayKey] ? dailyEvaluations[dayKey] : 'Chưa có'}</span></div>
                                     <div class="theory-section"><h6>Lý Thuyết</h6><ul>${(day.theory_topics||[]).map(item=>`<li>${item}</li>`).join('')}</ul></div>
@@ -425,7 +437,7 @@ document.addEventListener('DOMContentLoaded', function() {
                         const select = document.getElementById('subject');
                         subjectName = select.options[select.selectedIndex]?.text || '';
                     }
-                    window.createEvaluation(Number(btn.dataset.day), subject, subjectName);
+                    window.createEvaluation(Number(btn.dataset.day), subject, subjectName, btn.dataset.planId || null);
                 };
             });
             // Xử lý checkbox hoàn thành ngày học
@@ -435,6 +447,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     const completedDays = getCompletedDays(planObj.id);
                     completedDays[dayKey] = this.checked;
                     setCompletedDays(planObj.id, completedDays);
+                    if (this.dataset.planId) reportDayProgress(this.dataset.planId, this.checked);
                     updateProgressSidebar();
                     updateSuggestedTasksSidebar();
                     // Ghi log hoạt động đã học ngày
@@ -0,0 +1,649 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from openpyxl import Workbook, load_workbook
+from journal import MutationJournal
+
+logger = logging.getLogger(__name__)
+
+# Cấu trúc các bảng: file Excel gốc, tên sheet, các cột (theo thứ tự trong file),
+# khóa chính và các cột cần đánh chỉ mục. Cột mới chỉ được thêm vào cuối danh sách;
+# initialize() bổ sung chúng vào file/bảng đã có.
+TABLES = {
+    'users': {
+        'file': 'users.xlsx',
+        'sheet_name': 'Users',
+        'columns': ['student_id', 'full_name', 'email', 'password', 'dob', 'join_date', 'image_url'],
+        'key': 'student_id',
+        'indexes': ['email']
+    },
+    'learning_path': {
+        'file': 'learning_path.xlsx',
+        'sheet_name': 'LearningPaths',
+        'columns': ['path_id', 'user_id', 'subject', 'current_score', 'target_score',
+                    'duration_weeks', 'daily_study_hours', 'learning_style',
+                    'success_rate', 'start_date', 'end_date', 'status',
+                    'grade', 'level', 'created_at'],
+        'key': 'path_id',
+        'indexes': ['user_id']
+    },
+    'daily_plans': {
+        'file': 'daily_plans.xlsx',
+        'sheet_name': 'DailyPlans',
+        'columns': ['plan_id', 'path_id', 'date', 'theory_topics', 'practice_exercises',
+                    'theory_hours', 'practice_hours', 'learning_resources', 'completed',
+                    'week_number', 'topic_details'],
+        'key': 'plan_id',
+        'indexes': ['path_id']
+    },
+    'grade': {
+        'file': 'grade.xlsx',
+        'sheet_name': 'Grades',
+        'columns': ['ID_grade', 'Name_grade'],
+        'key': 'ID_grade',
+        'indexes': []
+    },
+    'subject': {
+        'file': 'subject.xlsx',
+        'sheet_name': 'Subjects',
+        'columns': ['ID_subject', 'name_subject', 'ID_grade'],
+        'key': 'ID_subject',
+        'indexes': ['ID_grade']
+    },
+    'topic': {
+        'file': 'topic.xlsx',
+        'sheet_name': 'Topics',
+        'columns': ['ID_topic', 'topic_name', 'ID_subject', 'ID_grade'],
+        'key': 'ID_topic',
+        'indexes': ['ID_subject', 'ID_grade']
+    },
+    'theory': {
+        'file': 'theory.xlsx',
+        'sheet_name': 'Theory',
+        'columns': ['ID_theory', 'theory_name', 'ID_topic', 'ID_subject', 'ID_grade',
+                    'level', 'URL', 'completion_time'],
+        'key': 'ID_theory',
+        'indexes': ['ID_topic', 'ID_subject', 'ID_grade']
+    },
+    'practice': {
+        'file': 'practice.xlsx',
+        'sheet_name': 'Practice',
+        'columns': ['ID_practice', 'practice_name', 'ID_topic', 'ID_subject', 'ID_grade',
+                    'level', 'ID_theory'],
+        'key': 'ID_practice',
+        'indexes': ['ID_theory', 'ID_topic', 'ID_subject', 'ID_grade']
+    }
+}
+
+
+def _row_to_dict(table, values):
+    """Chuyển một dòng (list/tuple theo thứ tự cột) hoặc dict thành dict đủ cột"""
+    columns = TABLES[table]['columns']
+    if isinstance(values, dict):
+        return {col: values.get(col) for col in columns}
+    values = tuple(values[:len(columns)]) + (None,) * (len(columns) - len(values))
+    return dict(zip(columns, values))
+
+
+class StorageBackend:
+    """Giao diện chung cho nơi lưu trữ dữ liệu của ứng dụng.
+
+    Mỗi dòng được trao đổi dưới dạng dict với các cột như trong TABLES.
+    """
+
+    def initialize(self):
+        """Tạo cấu trúc lưu trữ nếu chưa có"""
+        raise NotImplementedError
+
+    def read_all(self, table):
+        """Đọc toàn bộ dòng của một bảng theo thứ tự thêm vào"""
+        raise NotImplementedError
+
+    def find(self, table, column, value):
+        """Lấy các dòng có column == value"""
+        raise NotImplementedError
+
+    def get(self, table, key):
+        """Lấy một dòng theo khóa chính"""
+        rows = self.find(table, TABLES[table]['key'], key)
+        return rows[0] if rows else None
+
+    def count(self, table):
+        """Số dòng của một bảng"""
+        raise NotImplementedError
+
+    def insert(self, table, row):
+        """Thêm một dòng"""
+        self.insert_many(table, [row])
+
+    def insert_many(self, table, rows):
+        """Thêm nhiều dòng trong một lần ghi"""
+        raise NotImplementedError
+
+    def update(self, table, column, value, changes):
+        """Cập nhật các dòng có column == value, trả về số dòng đã cập nhật"""
+        raise NotImplementedError
+
+    def update_many(self, table, column, updates):
+        """Nhiều cập nhật [(value, changes)] theo cùng một cột trong một lần ghi, trả về số dòng đã cập nhật"""
+        return sum(self.update(table, column, value, changes) for value, changes in updates)
+
+    def replace_all(self, table, rows):
+        """Thay toàn bộ nội dung của một bảng"""
+        raise NotImplementedError
+
+
+class ExcelBackend(StorageBackend):
+    """Lưu trữ trên các file .xlsx (mỗi bảng một file) như trước đây"""
+
+    def __init__(self, directory='.'):
+        self.directory = directory
+        self._locks = {table: threading.Lock() for table in TABLES}
+
+    def _path(self, table):
+        return os.path.join(self.directory, TABLES[table]['file'])
+
+    def _save(self, wb, table):
+        # Ghi ra file tạm rồi đổi tên để người đọc không bao giờ thấy file ghi dở
+        path = self._path(table)
+        tmp_path = path + '.tmp'
+        wb.save(tmp_path)
+        os.replace(tmp_path, path)
+
+    def _new_workbook(self, table):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = TABLES[table]['sheet_name']
+        ws.append(TABLES[table]['columns'])
+        return wb
+
+    def _read_header(self, table):
+        # Chế độ read_only chỉ đọc dòng đầu của sheet thay vì phân tích toàn bộ workbook
+        wb = load_workbook(self._path(table), read_only=True)
+        try:
+            return list(next(wb.active.iter_rows(max_row=1, values_only=True), ()))
+        finally:
+            wb.close()
+
+    def initialize(self):
+        """Tạo file còn thiếu và kiểm tra dòng tiêu đề của các file đã có"""
+        for table in TABLES:
+            path = self._path(table)
+            if not os.path.exists(path):
+                self._new_workbook(table).save(path)
+                logger.info("Đã tạo file Excel mới: %s", path)
+                continue
+            try:
+                header = self._read_header(table)
+            except Exception as e:
+                # File hỏng: giữ lại bản cũ (.corrupt) để có thể khôi phục rồi tạo file mới
+                logger.warning("File Excel không hợp lệ, đang tạo lại %s: %s", path, e)
+                os.replace(path, path + '.corrupt')
+                self._new_workbook(table).save(path)
+                continue
+            columns = TABLES[table]['columns']
+            header = header[:len(columns)]
+            while header and header[-1] is None:
+                header.pop()
+            if len(header) < len(columns):
+                # File tạo trước khi thêm cột mới: bổ sung tiêu đề các cột còn thiếu ở cuối
+                self._extend_header(table, len(header))
+                logger.info("Đã thêm cột %s vào %s", columns[len(header):], path)
+            if header != columns[:len(header)]:
+                logger.warning("Tiêu đề của %s không khớp cấu trúc mong đợi: %s", path, header)
+
+    def _extend_header(self, table, existing):
+        columns = TABLES[table]['columns']
+        with self._locks[table]:
+            wb = load_workbook(self._path(table))
+            ws = wb.active
+            for index in range(existing, len(columns)):
+                ws.cell(row=1, column=index + 1, value=columns[index])
+            self._save(wb, table)
+
+    def read_all(self, table):
+        wb = load_workbook(self._path(table), read_only=True)
+        try:
+            return [_row_to_dict(table, values)
+                    for values in wb.active.iter_rows(min_row=2, values_only=True)
+                    if values and values[0]]
+        finally:
+            wb.close()
+
+    def find(self, table, column, value):
+        return [row for row in self.read_all(table) if row[column] == value]
+
+    def count(self, table):
+        return len(self.read_all(table))
+
+    def insert_many(self, table, rows):
+        columns = TABLES[table]['columns']
+        with self._locks[table]:
+            wb = load_workbook(self._path(table))
+            ws = wb.active
+            for row in rows:
+                row = _row_to_dict(table, row)
+                ws.append([row[col] for col in columns])
+            self._save(wb, table)
+
+    def update(self, table, column, value, changes):
+        return self.update_many(table, column, [(value, changes)])
+
+    def update_many(self, table, column, updates):
+        columns = TABLES[table]['columns']
+        col_index = columns.index(column)
+        by_value = _updates_by_value(updates)
+        updated = 0
+        with self._locks[table]:
+            wb = load_workbook(self._path(table))
+            ws = wb.active
+            for cells in ws.iter_rows(min_row=2):
+                changes = by_value.get(cells[col_index].value)
+                if changes is not None:
+                    for name, new_value in changes.items():
+                        cells[columns.index(name)].value = new_value
+                    updated += 1
+            if updated:
+                self._save(wb, table)
+        return updated
+
+    def replace_all(self, table, rows):
+        columns = TABLES[table]['columns']
+        with self._locks[table]:
+            wb = self._new_workbook(table)
+            ws = wb.active
+            for row in rows:
+                row = _row_to_dict(table, row)
+                ws.append([row[col] for col in columns])
+            self._save(wb, table)
+
+
+class JournaledExcelBackend(ExcelBackend):
+    """Backend Excel ghi thay đổi vào nhật ký append-only thay vì ghi lại cả file.
+
+    Mỗi thay đổi chỉ tốn một dòng fsync trong nhật ký; dữ liệu đọc được phục vụ từ
+    bản sao trong bộ nhớ (file .xlsx + các thay đổi trong nhật ký). Một luồng nền định kỳ
+    gộp nhật ký vào các file .xlsx, và khi khởi động nhật ký được đọc lại để không mất dữ liệu.
+    Việc áp dụng lại là lũy đẳng: dòng đã có khóa chính thì không thêm lại, cập nhật chỉ gán giá trị.
+    """
+
+    def __init__(self, directory='.', journal_path=None):
+        super().__init__(directory)
+        self.journal = MutationJournal(journal_path or os.path.join(directory, 'data_journal.jsonl'))
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._pending = []
+        self._folding = []
+        self._views = {}
+        self._compactor = None
+
+    def initialize(self):
+        super().initialize()
+        with self._lock:
+            self._pending = self.journal.read_all()
+            self._views = {}
+        if self._pending:
+            logger.info("Đã đọc lại %s thay đổi từ nhật ký %s", len(self._pending), self.journal.path)
+
+    def _apply(self, table, rows, keys, entry):
+        if entry['op'] == 'insert':
+            key = TABLES[table]['key']
+            for row in entry['rows']:
+                row = _row_to_dict(table, row)
+                if row[key] in keys:
+                    continue
+                rows.append(row)
+                keys.add(row[key])
+        elif entry['op'] == 'update':
+            for row in rows:
+                if row[entry['column']] == entry['value']:
+                    row.update(entry['changes'])
+        elif entry['op'] == 'update_many':
+            by_value = _updates_by_value(entry['updates'])
+            for row in rows:
+                changes = by_value.get(row[entry['column']])
+                if changes is not None:
+                    row.update(changes)
+
+    def _view(self, table):
+        view = self._views.get(table)
+        if view is None:
+            with self._lock:
+                view = self._views.get(table)
+                if view is None:
+                    rows = super().read_all(table)
+                    keys = {row[TABLES[table]['key']] for row in rows}
+                    for entry in self._folding + self._pending:
+                        if entry['table'] == table:
+                            self._apply(table, rows, keys, entry)
+                    view = (rows, keys)
+                    self._views[table] = view
+        return view
+
+    def _record(self, entry):
+        with self._lock:
+            rows, keys = self._view(entry['table'])
+            self.journal.append(entry)
+            self._pending.append(entry)
+            self._apply(entry['table'], rows, keys, entry)
+
+    def read_all(self, table):
+        with self._lock:
+            return [dict(row) for row in self._view(table)[0]]
+
+    def find(self, table, column, value):
+        with self._lock:
+            return [dict(row) for row in self._view(table)[0] if row[column] == value]
+
+    def count(self, table):
+        return len(self._view(table)[0])
+
+    def insert_many(self, table, rows):
+        rows = [_row_to_dict(table, row) for row in rows]
+        self._record({'op': 'insert', 'table': table, 'rows': rows})
+
+    def update(self, table, column, value, changes):
+        with self._lock:
+            updated = sum(1 for row in self._view(table)[0] if row[column] == value)
+            if updated:
+                self._record({'op': 'update', 'table': table, 'column': column,
+                              'value': value, 'changes': dict(changes)})
+        return updated
+
+    def update_many(self, table, column, updates):
+        updates = [(value, dict(changes)) for value, changes in updates]
+        with self._lock:
+            by_value = _updates_by_value(updates)
+            updated = sum(1 for row in self._view(table)[0] if row[column] in by_value)
+            if updated:
+                # Một dòng nhật ký (một lần fsync) cho cả lô
+                self._record({'op': 'update_many', 'table': table, 'column': column,
+                              'updates': [list(update) for update in updates]})
+        return updated
+
+    def replace_all(self, table, rows):
+        self.compact()
+        with self._lock:
+            super().replace_all(table, rows)
+            self._views.pop(table, None)
+
+    def _fold(self, table, entries):
+        """Áp dụng các thay đổi của một bảng vào file .xlsx trong một lần ghi"""
+        columns = TABLES[table]['columns']
+        key_index = columns.index(TABLES[table]['key'])
+        with self._locks[table]:
+            wb = load_workbook(self._path(table))
+            ws = wb.active
+            sheet_rows = [cells for cells in ws.iter_rows(min_row=2) if cells[key_index].value]
+            keys = {cells[key_index].value for cells in sheet_rows}
+            for entry in entries:
+                if entry['op'] == 'insert':
+                    for row in entry['rows']:
+                        row = _row_to_dict(table, row)
+                        if row[columns[key_index]] in keys:
+                            continue
+                        ws.append([row[col] for col in columns])
+                        sheet_rows.append(ws[ws.max_row])
+                        keys.add(row[columns[key_index]])
+                elif entry['op'] == 'update':
+                    col_index = columns.index(entry['column'])
+                    for cells in sheet_rows:
+                        if cells[col_index].value == entry['value']:
+                            for name, new_value in entry['changes'].items():
+                                cells[columns.index(name)].value = new_value
+                elif entry['op'] == 'update_many':
+                    col_index = columns.index(entry['column'])
+                    by_value = _updates_by_value(entry['updates'])
+                    for cells in sheet_rows:
+                        changes = by_value.get(cells[col_index].value)
+                        if changes is not None:
+                            for name, new_value in changes.items():
+                                cells[columns.index(name)].value = new_value
+            self._save(wb, table)
+
+    def compact(self):
+        """Gộp các thay đổi trong nhật ký vào file .xlsx, trả về số thay đổi đã gộp"""
+        with self._compact_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                self.journal.rotate()
+                self._folding = self._pending
+                self._pending = []
+            try:
+                by_table = {}
+                for entry in self._folding:
+                    by_table.setdefault(entry['table'], []).append(entry)
+                for table, entries in by_table.items():
+                    self._fold(table, entries)
+            except Exception:
+                with self._lock:
+                    self._pending = self._folding + self._pending
+                    self._folding = []
+                raise
+            self.journal.discard_rotated()
+            with self._lock:
+                folded = len(self._folding)
+                self._folding = []
+            return folded
+
+    def start_compactor(self, interval=30):
+        """Chạy luồng nền gộp nhật ký định kỳ (và một lần khi tiến trình kết thúc)"""
+        if self._compactor is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.compact()
+                except Exception:
+                    logger.exception("Lỗi khi gộp nhật ký dữ liệu")
+
+        self._compactor = threading.Thread(target=run, name='journal-compactor', daemon=True)
+        self._compactor.start()
+        atexit.register(self.compact)
+
+
+class SQLiteBackend(StorageBackend):
+    """Lưu trữ trong một file SQLite (chế độ WAL) với chỉ mục trên các cột tra cứu"""
+
+    def __init__(self, path='app.db'):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        # Mỗi luồng dùng một kết nối riêng; WAL cho phép đọc song song với một luồng ghi
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def initialize(self):
+        conn = self._connect()
+        with conn:
+            for table, spec in TABLES.items():
+                column_defs = ', '.join(
+                    f'"{col}" PRIMARY KEY' if col == spec['key'] else f'"{col}"'
+                    for col in spec['columns']
+                )
+                conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({column_defs})')
+                # Bảng tạo trước khi thêm cột mới
+                existing = {info[1] for info in conn.execute(f'PRAGMA table_info("{table}")')}
+                for col in spec['columns']:
+                    if col not in existing:
+                        conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}"')
+                for col in spec['indexes']:
+                    conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS "idx_{table}_{col}" ON "{table}" ("{col}")'
+                    )
+
+    def read_all(self, table):
+        cursor = self._connect().execute(f'SELECT * FROM "{table}" ORDER BY rowid')
+        return [dict(row) for row in cursor]
+
+    def find(self, table, column, value):
+        cursor = self._connect().execute(
+            f'SELECT * FROM "{table}" WHERE "{column}" = ? ORDER BY rowid', (value,)
+        )
+        return [dict(row) for row in cursor]
+
+    def count(self, table):
+        return self._connect().execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+    def _insert_sql(self, table):
+        columns = TABLES[table]['columns']
+        names = ', '.join(f'"{col}"' for col in columns)
+        placeholders = ', '.join('?' for _ in columns)
+        return f'INSERT INTO "{table}" ({names}) VALUES ({placeholders})'
+
+    def _values(self, table, row):
+        row = _row_to_dict(table, row)
+        return [_to_sql_value(row[col]) for col in TABLES[table]['columns']]
+
+    def insert_many(self, table, rows):
+        conn = self._connect()
+        with conn:
+            conn.executemany(self._insert_sql(table), [self._values(table, row) for row in rows])
+
+    def update(self, table, column, value, changes):
+        assignments = ', '.join(f'"{name}" = ?' for name in changes)
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                f'UPDATE "{table}" SET {assignments} WHERE "{column}" = ?',
+                [_to_sql_value(v) for v in changes.values()] + [value]
+            )
+        return cursor.rowcount
+
+    def update_many(self, table, column, updates):
+        # Gom các cập nhật cùng tập cột để dùng executemany, tất cả trong một giao dịch
+        groups = {}
+        for value, changes in updates:
+            groups.setdefault(tuple(changes), []).append(
+                [_to_sql_value(v) for v in changes.values()] + [value]
+            )
+        conn = self._connect()
+        updated = 0
+        with conn:
+            for names, params in groups.items():
+                assignments = ', '.join(f'"{name}" = ?' for name in names)
+                cursor = conn.executemany(
+                    f'UPDATE "{table}" SET {assignments} WHERE "{column}" = ?', params
+                )
+                updated += cursor.rowcount
+        return updated
+
+    def replace_all(self, table, rows):
+        conn = self._connect()
+        with conn:
+            conn.execute(f'DELETE FROM "{table}"')
+            conn.executemany(self._insert_sql(table), [self._values(table, row) for row in rows])
+
+
+def _updates_by_value(updates):
+    """[(value, changes)] -> {value: changes}, cập nhật sau ghi đè cập nhật trước"""
+    by_value = {}
+    for value, changes in updates:
+        by_value.setdefault(value, {}).update(changes)
+    return by_value
+
+
+def _to_sql_value(value):
+    # openpyxl có thể trả về datetime cho các ô ngày tháng; lưu dạng chuỗi như app vẫn ghi
+    if isinstance(value, datetime):
+        if value.hour == value.minute == value.second == 0:
+            return value.strftime('%Y-%m-%d')
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+
+def create_backend():
+    """Tạo backend theo biến môi trường STORAGE_BACKEND ('excel' hoặc 'sqlite').
+
+    Backend Excel mặc định ghi qua nhật ký (tắt bằng STORAGE_JOURNAL=0);
+    JOURNAL_COMPACT_INTERVAL là số giây giữa hai lần gộp nhật ký vào file .xlsx.
+    """
+    kind = os.environ.get('STORAGE_BACKEND', 'excel').lower()
+    if kind == 'sqlite':
+        backend = SQLiteBackend(os.environ.get('SQLITE_PATH', 'app.db'))
+    elif kind == 'excel':
+        directory = os.environ.get('EXCEL_DIR', '.')
+        if os.environ.get('STORAGE_JOURNAL', '1') == '0':
+            backend = ExcelBackend(directory)
+        else:
+            backend = JournaledExcelBackend(directory, os.environ.get('JOURNAL_PATH'))
+    else:
+        raise ValueError(f"STORAGE_BACKEND không hợp lệ: {kind}")
+    backend.initialize()
+    if isinstance(backend, JournaledExcelBackend):
+        backend.start_compactor(float(os.environ.get('JOURNAL_COMPACT_INTERVAL', '30')))
+    return backend
+
+
+def import_from_excel(backend, directory='.', tables=None):
+    """Nhập dữ liệu một lần từ các file .xlsx vào backend (thay thế dữ liệu cũ)"""
+    # Đọc qua nhật ký để không bỏ sót các thay đổi chưa được gộp vào file
+    source = JournaledExcelBackend(directory)
+    # Kiểm tra trước khi initialize() vì nó tạo file rỗng cho các bảng còn thiếu
+    present = [table for table in tables or TABLES if os.path.exists(source._path(table))]
+    source.initialize()
+    counts = {}
+    for table in present:
+        rows = source.read_all(table)
+        backend.replace_all(table, rows)
+        counts[table] = len(rows)
+    return counts
+
+
+def export_to_excel(backend, directory='.', tables=None):
+    """Xuất dữ liệu từ backend ra các file .xlsx cho nhóm nội dung"""
+    os.makedirs(directory, exist_ok=True)
+    target = ExcelBackend(directory)
+    counts = {}
+    for table in tables or TABLES:
+        rows = backend.read_all(table)
+        target.replace_all(table, rows)
+        counts[table] = len(rows)
+    return counts
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Nhập/xuất dữ liệu giữa các file .xlsx và SQLite')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='Nhập các file .xlsx vào SQLite')
+    import_parser.add_argument('--db', default='app.db')
+    import_parser.add_argument('--dir', default='.', help='Thư mục chứa các file .xlsx')
+
+    export_parser = subparsers.add_parser('export', help='Xuất SQLite ra các file .xlsx')
+    export_parser.add_argument('--db', default='app.db')
+    export_parser.add_argument('--dir', default='export', help='Thư mục đích')
+
+    args = parser.parse_args()
+    backend = SQLiteBackend(args.db)
+    backend.initialize()
+    if args.command == 'import':
+        counts = import_from_excel(backend, args.dir)
+    else:
+        counts = export_to_excel(backend, args.dir)
+    for table, count in counts.items():
+        print(f"{table}: {count} dòng")
+
+
+if __name__ == "__main__":
+    from logging_config import setup_logging
+    setup_logging()
+    main()
@@ -0,0 +1,234 @@
+import itertools
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Lưới mặc định của các đặc trưng liên tục: (bắt đầu, kết thúc, bước), phủ khoảng giá trị
+# mà giao diện cho nhập; đầu vào ngoài lưới được dự đoán bằng mô hình (xem predict)
+DEFAULT_AXES = {
+    'current_score': (0.0, 10.0, 0.5),
+    'target_score': (0.0, 10.0, 0.5),
+    'duration_weeks': (1.0, 52.0, 1.0),
+    'daily_study_hours': (0.5, 8.0, 0.5),
+}
+
+
+def _metadata_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+class SuccessRateLUT:
+    """Bảng tra tỷ lệ thành công dựng sẵn trên lưới đầu vào đã lượng tử hóa.
+
+    Bảng là mảng float32 nhiều chiều theo thứ tự FEATURES: các đặc trưng phân loại đánh chỉ số
+    theo mã của encoder, các đặc trưng liên tục theo lưới trong axes. Giá trị giữa các điểm lưới
+    được nội suy đa tuyến tính; ngoài lưới thì dùng hàm fallback (thường là mô hình) nếu có,
+    không thì lấy giá trị ở biên. Bảng được lưu dạng .npy và
+    tải bằng mmap, thông tin lưới, mô hình nguồn và sai số nằm trong file .json cùng tên.
+    """
+
+    def __init__(self, table, metadata, path=None):
+        self.table = table
+        self.metadata = metadata
+        self.path = path
+        self.features = metadata['features']
+        self.categorical = metadata['categorical']
+        self.model_id = metadata['model_id']
+        continuous = [name for name in self.features if name not in self.categorical]
+        self._continuous = [(self.features.index(name), *metadata['axes'][name]) for name in continuous]
+        self._sizes = [
+            int(round((stop - start) / step)) + 1 for _, start, stop, step in self._continuous
+        ]
+        self._flat = table.reshape(-1)
+        self._strides = np.array([stride // table.itemsize for stride in table.strides], dtype=np.int64)
+        # Các góc của ô lưới khi nội suy (0 = điểm dưới, 1 = điểm trên) theo từng trục liên tục
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self._continuous))), dtype=np.int64)
+        # Bản dạng số Python của các thông số trên cho đường tra một dòng
+        self._row_categorical = [
+            (self.features.index(name), int(self._strides[self.features.index(name)])) for name in self.categorical
+        ]
+        self._row_continuous = [
+            (j, start, step, size, int(self._strides[j]))
+            for (j, start, _, step), size in zip(self._continuous, self._sizes)
+        ]
+        self._row_corners = self._corners.tolist()
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        with open(_metadata_path(path), encoding='utf-8') as f:
+            metadata = json.load(f)
+        return cls(np.load(path, mmap_mode=mmap_mode), metadata, path)
+
+    @staticmethod
+    def build(predict, features, category_sizes, model_id, path, axes=None, check_samples=20000, seed=0):
+        """Dựng bảng tra từ hàm dự đoán predict(X) và ghi ra path (.npy) cùng file .json.
+
+        category_sizes: tên đặc trưng phân loại -> số giá trị. Bảng được ghi thẳng ra file theo
+        từng tổ hợp giá trị phân loại nên không cần giữ cả lưới trong bộ nhớ. Sai số so với
+        predict được đo trên check_samples điểm ngẫu nhiên giữa các điểm lưới, cộng thêm các điểm
+        ở biên lưới và ngoài lưới (tra với fallback=predict, đúng như khi phục vụ).
+        """
+        axes = {**DEFAULT_AXES, **(axes or {})}
+        for name, (start, stop, step) in axes.items():
+            if step <= 0 or stop - start < step:
+                raise ValueError(f"Lưới của {name} cần ít nhất hai điểm: {(start, stop, step)}")
+        started = time.perf_counter()
+        grids = {}
+        for name in features:
+            if name in category_sizes:
+                grids[name] = np.arange(category_sizes[name], dtype=np.float64)
+            else:
+                start, stop, step = axes[name]
+                grids[name] = start + step * np.arange(int(round((stop - start) / step)) + 1)
+        shape = tuple(len(grids[name]) for name in features)
+
+        categorical = [name for name in features if name in category_sizes]
+        continuous = [name for name in features if name not in category_sizes]
+        # Tất cả điểm của các trục liên tục, dùng lại cho mỗi tổ hợp giá trị phân loại
+        mesh = np.stack(np.meshgrid(*(grids[name] for name in continuous), indexing='ij'), axis=-1)
+        mesh = mesh.reshape(-1, len(continuous))
+
+        tmp_path = path + '.tmp.npy'
+        table = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=shape)
+        try:
+            # Đưa các trục phân loại lên đầu để mỗi tổ hợp là một khối liền
+            order = [features.index(name) for name in categorical + continuous]
+            view = table.transpose(order)
+            X = np.empty((len(mesh), len(features)), dtype=np.float64)
+            for i, name in enumerate(continuous):
+                X[:, features.index(name)] = mesh[:, i]
+            for combo in itertools.product(*(range(category_sizes[name]) for name in categorical)):
+                for name, code in zip(categorical, combo):
+                    X[:, features.index(name)] = code
+                view[combo] = np.asarray(predict(X), dtype=np.float32).reshape(view.shape[len(combo):])
+            table.flush()
+            del view, table
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        metadata = {
+            'features': list(features),
+            'categorical': categorical,
+            'category_sizes': dict(category_sizes),
+            'axes': {name: list(axes[name]) for name in continuous},
+            'shape': list(shape),
+            'model_id': model_id,
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'build_seconds': round(time.perf_counter() - started, 2)
+        }
+        lut = SuccessRateLUT(np.load(path, mmap_mode='r'), metadata, path)
+
+        # Sai số so với mô hình: điểm ngẫu nhiên trong lưới, điểm ở biên lưới và điểm ngoài lưới
+        rng = np.random.default_rng(seed)
+        edge_samples = off_grid_samples = max(1, check_samples // 10)
+        sample = np.empty((check_samples + edge_samples + off_grid_samples, len(features)))
+        for j, name in enumerate(features):
+            if name in category_sizes:
+                sample[:, j] = rng.integers(0, category_sizes[name], len(sample))
+            else:
+                start, stop, _ = axes[name]
+                sample[:check_samples, j] = rng.uniform(start, stop, check_samples)
+                sample[check_samples:, j] = rng.choice([start, stop], len(sample) - check_samples)
+        # Mỗi điểm ngoài lưới có một đặc trưng liên tục vượt quá biên trên hoặc dưới
+        off_grid = sample[check_samples + edge_samples:]
+        for row, name in zip(off_grid, rng.choice(continuous, off_grid_samples)):
+            start, stop, step = axes[name]
+            overshoot = rng.uniform(step, stop - start)
+            row[features.index(name)] = stop + overshoot if rng.random() < 0.5 else start - overshoot
+        error = np.abs(lut.predict(sample, fallback=predict) - np.asarray(predict(sample), dtype=np.float64))
+        lut.metadata['max_abs_error'] = float(error.max())
+        lut.metadata['mean_abs_error'] = float(error.mean())
+        lut.metadata['check_samples'] = int(check_samples)
+        lut.metadata['edge_samples'] = int(edge_samples)
+        lut.metadata['off_grid_samples'] = int(off_grid_samples)
+
+        with open(_metadata_path(path) + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(lut.metadata, f, ensure_ascii=False, indent=2)
+        os.replace(_metadata_path(path) + '.tmp', _metadata_path(path))
+        logger.info("Đã dựng bảng tra %s (%s điểm, sai số lớn nhất %.4f)",
+                    path, 'x'.join(map(str, shape)), lut.metadata['max_abs_error'])
+        return lut
+
+    def predict(self, X, fallback=None):
+        """Tra và nội suy cho các dòng đặc trưng đã mã hóa (cùng dạng đầu vào của model.predict).
+
+        Dòng có đặc trưng liên tục nằm ngoài lưới được dự đoán bằng fallback(X) nếu có.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) == 1:
+            row = X[0].tolist()
+            if fallback is not None and not self._row_in_grid(row):
+                return np.asarray(fallback(X), dtype=np.float64)
+            return np.array([self._predict_row(row)])
+        if fallback is not None:
+            inside = self.in_grid(X)
+            if not inside.all():
+                result = np.empty(len(X))
+                result[inside] = self.predict(X[inside]) if inside.any() else []
+                result[~inside] = fallback(X[~inside])
+                return result
+        n = len(X)
+        base = np.zeros(n, dtype=np.int64)
+        for name in self.categorical:
+            j = self.features.index(name)
+            base += X[:, j].astype(np.int64) * self._strides[j]
+
+        lower = np.empty((n, len(self._continuous)), dtype=np.int64)
+        frac = np.empty((n, len(self._continuous)))
+        for i, ((j, start, _, step), size) in enumerate(zip(self._continuous, self._sizes)):
+            position = np.clip((X[:, j] - start) / step, 0, size - 1)
+            lower[:, i] = np.minimum(position.astype(np.int64), size - 2)
+            frac[:, i] = position - lower[:, i]
+        strides = self._strides[[j for j, *_ in self._continuous]]
+
+        result = np.zeros(n)
+        for corner in self._corners:
+            index = base + (lower + corner) @ strides
+            weight = np.prod(np.where(corner, frac, 1.0 - frac), axis=1)
+            result += weight * self._flat[index]
+        return result
+
+    def in_grid(self, X):
+        """Mảng bool: dòng nào có mọi đặc trưng liên tục nằm trong lưới"""
+        inside = np.ones(len(X), dtype=bool)
+        for j, start, stop, _ in self._continuous:
+            inside &= (X[:, j] >= start) & (X[:, j] <= stop)
+        return inside
+
+    def _row_in_grid(self, row):
+        return all(start <= row[j] <= stop for j, start, stop, _ in self._continuous)
+
+    def _predict_row(self, row):
+        """Như predict cho một dòng, tính bằng số Python để không tốn chi phí tạo mảng"""
+        index = 0
+        for j, stride in self._row_categorical:
+            index += int(row[j]) * stride
+        cells = []
+        for j, start, step, size, stride in self._row_continuous:
+            position = min(max((row[j] - start) / step, 0.0), size - 1)
+            lower = min(int(position), size - 2)
+            index += lower * stride
+            cells.append((stride, position - lower))
+
+        flat = self._flat
+        result = 0.0
+        for corner in self._row_corners:
+            offset = index
+            weight = 1.0
+            for upper, (stride, frac) in zip(corner, cells):
+                if upper:
+                    offset += stride
+                    weight *= frac
+                else:
+                    weight *= 1.0 - frac
+            result += weight * float(flat[offset])
+        return result
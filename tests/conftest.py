@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Các module của ứng dụng nằm ở thư mục gốc của repo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,110 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from avatar_store import AvatarStore, AvatarTooLarge
+
+PNG_HEADER = b'\x89PNG\r\n\x1a\n'
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Ảnh giả chỉ có chữ ký PNG: không tạo ảnh thu nhỏ ở luồng nền
+    monkeypatch.setattr('avatar_store._pillow_available', lambda: False)
+    return AvatarStore(str(tmp_path / 'avatars'), max_bytes=200 * 1024)
+
+
+def leftover_uploads(store):
+    return [name for name in os.listdir(store.directory) if name.startswith('.upload-')]
+
+
+def test_save_is_content_addressed(store):
+    data = PNG_HEADER + os.urandom(150 * 1024)
+    key = store.save(io.BytesIO(data))
+
+    assert key == hashlib.sha256(data).hexdigest() + '.png'
+    path = store.path(key)
+    assert path == os.path.join(store.directory, key[:2], key)
+    with open(path, 'rb') as f:
+        assert f.read() == data
+    assert store.mimetype(key) == 'image/png'
+    assert leftover_uploads(store) == []
+
+
+def test_duplicate_upload_is_stored_once(store):
+    data = PNG_HEADER + b'avatar'
+    first = store.save(io.BytesIO(data))
+    mtime = os.stat(store.path(first)).st_mtime_ns
+    second = store.save(io.BytesIO(data))
+
+    assert first == second
+    assert os.listdir(os.path.dirname(store.path(first))) == [first]
+    assert os.stat(store.path(first)).st_mtime_ns == mtime
+    assert leftover_uploads(store) == []
+
+
+def test_too_large_upload_leaves_nothing(store):
+    class CountingStream(io.BytesIO):
+        read_bytes = 0
+
+        def read(self, size=-1):
+            chunk = super().read(size)
+            self.read_bytes += len(chunk)
+            return chunk
+
+    stream = CountingStream(PNG_HEADER + b'\0' * (10 * 1024 * 1024))
+    with pytest.raises(AvatarTooLarge):
+        store.save(stream)
+    # Dừng đọc ngay khi vượt giới hạn
+    assert stream.read_bytes < 512 * 1024
+    assert leftover_uploads(store) == []
+    assert sorted(os.listdir(store.directory)) == ['thumbs']
+
+
+@pytest.mark.parametrize('data', [
+    b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>',
+    b'GIF86a not a gif',
+    b'',
+])
+def test_non_raster_upload_is_rejected(store, data):
+    with pytest.raises(ValueError) as excinfo:
+        store.save(io.BytesIO(data))
+    assert not isinstance(excinfo.value, AvatarTooLarge)
+    assert leftover_uploads(store) == []
+
+
+def test_sniffs_other_formats(store):
+    assert store.save(io.BytesIO(b'\xff\xd8\xff\xe0jpeg')).endswith('.jpg')
+    assert store.save(io.BytesIO(b'GIF89agif')).endswith('.gif')
+    assert store.save(io.BytesIO(b'RIFF\0\0\0\0WEBPVP8 ')).endswith('.webp')
+
+
+@pytest.mark.parametrize('key', [
+    '../' + 'a' * 61 + '.png',
+    'a' * 64 + '.svg',
+    'A' * 64 + '.png',
+    'a' * 63 + '.png',
+    'a' * 64 + '.png/../../app.py',
+    '',
+])
+def test_path_rejects_bad_keys(store, key):
+    assert store.path(key) is None
+
+
+def test_thumbnail_is_square(tmp_path):
+    Image = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    Image.new('RGB', (300, 200), (200, 30, 30)).save(buffer, format='PNG')
+    buffer.seek(0)
+
+    store = AvatarStore(str(tmp_path / 'avatars'), thumb_size=64)
+    key = store.save(buffer)
+    store._jobs.join()
+
+    with Image.open(store.thumbnail_path(key)) as thumb:
+        assert thumb.size == (64, 64)
+        assert thumb.format == 'PNG'
+    assert store.thumbnail_key(key) == key.replace('.png', '_64.png')
+    assert store.thumbnail_key('a' * 64 + '.gif').endswith('_64.png')
@@ -0,0 +1,46 @@
+import pytest
+
+from catalog_store import CatalogStore
+from storage import SQLiteBackend
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'app.db'))
+    backend.initialize()
+    backend.insert_many('grade', [{'ID_grade': 'G01', 'Name_grade': 'Lớp 10'}])
+    backend.insert_many('subject', [{'ID_subject': 'S01', 'name_subject': 'Toán học', 'ID_grade': 'G01'}])
+    return CatalogStore(backend)
+
+
+def test_reads_and_indexes(catalog):
+    assert catalog.get_by_id('grade', 'G01')['Name_grade'] == 'Lớp 10'
+    assert [row['ID_subject'] for row in catalog.get_children('subject', 'G01')] == ['S01']
+    assert catalog.get_children('subject', 'G02') == []
+
+
+def test_add_row_publishes_new_snapshot(catalog):
+    events = []
+    catalog.add_listener(events.append)
+    rows, by_key, by_parent = catalog._table('subject')
+    children = by_parent['G01']
+
+    catalog.add_row('subject', ['S02', 'Vật lý', 'G01'])
+    catalog.add_row('subject', ['S03', 'Toán học', 'G02'])
+
+    # Bộ dữ liệu cũ mà người đọc đang giữ không bị sửa
+    assert [row['ID_subject'] for row in rows] == ['S01']
+    assert 'S02' not in by_key and 'G02' not in by_parent
+    assert [row['ID_subject'] for row in children] == ['S01']
+
+    assert [row['ID_subject'] for row in catalog.get_all('subject')] == ['S01', 'S02', 'S03']
+    assert catalog.get_by_id('subject', 'S02')['name_subject'] == 'Vật lý'
+    assert [row['ID_subject'] for row in catalog.get_children('subject', 'G01')] == ['S01', 'S02']
+    assert [row['ID_subject'] for row in catalog.get_children('subject', 'G02')] == ['S03']
+    assert events == ['subject', 'subject']
+
+
+def test_add_row_before_load_reads_backend(catalog):
+    catalog.backend.insert('grade', {'ID_grade': 'G02', 'Name_grade': 'Lớp 11'})
+    catalog.add_row('grade', ['G02', 'Lớp 11'])
+    assert [row['ID_grade'] for row in catalog.get_all('grade')] == ['G01', 'G02']
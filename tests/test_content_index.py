@@ -0,0 +1,69 @@
+import pandas as pd
+
+from content_index import ContentIndex
+from storage import TABLES
+
+
+def frame(table, rows):
+    return pd.DataFrame(rows, columns=TABLES[table]['columns'])
+
+
+def make_excel_data():
+    return {
+        'grade': frame('grade', [['G01', 'Lớp 10'], ['G02', 'Lớp 11']]),
+        'subject': frame('subject', [['S01', 'Toán học', 'G01'], ['S02', 'Vật lý', 'G01']]),
+        'topic': frame('topic', [['T01', 'Hàm số', 'S01', 'G01']]),
+        'theory': frame('theory', [
+            ['L01', 'Hàm số bậc nhất', 'T01', 'S01', 'G01', 'basic', '', 2],
+            ['L02', 'Hàm số bậc hai', 'T01', 'S01', 'G01', 'basic', '', 3],
+            ['L03', 'Đạo hàm', 'T01', 'S01', 'G02', 'basic', '', 3],
+            ['L04', 'Động học', 'T02', 'S02', 'G01', 'basic', '', 2]
+        ]),
+        'practice': frame('practice', [['P001', 'Bài tập hàm số', 'T01', 'S01', 'G01', 'basic', 'L01']])
+    }
+
+
+def test_theory_topics_from_seeded_rows():
+    index = ContentIndex(make_excel_data())
+
+    assert index.grade_id(10) == 'G01'
+    topics = index.theory_topics('math', 10, 'basic', 1, 1)
+    assert [topic['name'] for topic in topics] == ['Hàm số bậc nhất', 'Hàm số bậc hai']
+    assert [topic['name'] for topic in index.theory_topics('Math', '11', 'basic', 1, 1)] == ['Đạo hàm']
+    assert [topic['name'] for topic in index.theory_topics('physics', 10, 'basic', 1, 1)] == ['Động học']
+
+
+def test_theory_topics_are_split_by_week():
+    index = ContentIndex(make_excel_data())
+
+    assert [topic['name'] for topic in index.theory_topics('math', 10, 'basic', 1, 2)] == ['Hàm số bậc nhất']
+    assert [topic['name'] for topic in index.theory_topics('math', 10, 'basic', 2, 2)] == ['Hàm số bậc hai']
+
+
+def test_unknown_lookups_are_empty():
+    index = ContentIndex(make_excel_data())
+
+    assert index.theory_topics('math', 12, 'basic', 1, 1) == []
+    assert index.theory_topics('math', 10, 'advanced', 1, 1) == []
+    assert index.theory_topics('chemistry', 10, 'basic', 1, 1) == []
+    assert ContentIndex({}).theory_topics('math', 10, 'basic', 1, 1) == []
+
+
+def test_subjects_resolve_per_grade_and_short_names():
+    excel_data = make_excel_data()
+    # Tên môn như trong dữ liệu mẫu: 'Toán', 'Vật Lý'; mỗi lớp có dòng môn học riêng
+    excel_data['subject'] = frame('subject', [
+        ['S001', 'Toán', 'G01'], ['S002', 'Vật Lý', 'G01'], ['S004', 'Toán', 'G02']
+    ])
+    excel_data['theory'] = frame('theory', [
+        ['L01', 'Mệnh đề', 'T01', 'S001', 'G01', 'basic', '', 33],
+        ['L02', 'Đạo hàm', 'T05', 'S004', 'G02', 'basic', '', 40],
+        ['L03', 'Động học', 'T09', 'S002', 'G01', 'basic', '', 30]
+    ])
+    index = ContentIndex(excel_data)
+
+    assert index.subject_id('math') == 'S001'
+    assert index.subject_id('math', 'G02') == 'S004'
+    assert [topic['name'] for topic in index.theory_topics('math', 10, 'basic', 1, 1)] == ['Mệnh đề']
+    assert [topic['name'] for topic in index.theory_topics('math', 11, 'basic', 1, 1)] == ['Đạo hàm']
+    assert [topic['name'] for topic in index.theory_topics('physics', 10, 'basic', 1, 1)] == ['Động học']
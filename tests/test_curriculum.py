@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+from curriculum import CurriculumStore
+
+
+@pytest.fixture
+def curriculum(tmp_path):
+    data = {
+        'default_topic_hours': 1.5,
+        'subjects': {
+            'Math': {
+                '10': [
+                    {'name': 'Hàm số và đồ thị', 'hours': 2, 'lessons': ['Khái niệm hàm số', 'Đồ thị hàm số']},
+                    {'name': 'Hàm số bậc ba', 'hours': 3.5}
+                ],
+                11: [
+                    {'name': 'Đạo hàm', 'hours': 4.0, 'lessons': ['Định nghĩa đạo hàm']}
+                ]
+            }
+        }
+    }
+    path = tmp_path / 'curriculum.json'
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return CurriculumStore(str(path))
+
+
+def test_topic_hours(curriculum):
+    assert curriculum.topic_hours('math', '10', 'Hàm số và đồ thị') == 2.0
+    assert curriculum.topic_hours('MATH', 10, 'Hàm số bậc ba') == 3.5
+    assert curriculum.topic_hours('math', '11', 'Đạo hàm') == 4.0
+
+
+def test_unknown_topics_use_default_hours(curriculum):
+    assert curriculum.topic_hours('math', '10', 'Chủ đề mới') == 1.5
+    assert curriculum.topic_hours('math', '12', 'Đạo hàm') == 1.5
+    assert curriculum.topic_hours('physics', '10', 'Hàm số bậc ba') == 1.5
+
+
+def test_lesson_topics_skip_topics_without_lessons(curriculum):
+    assert curriculum.lesson_topics('math', 10) == [('Hàm số và đồ thị', ['Khái niệm hàm số', 'Đồ thị hàm số'])]
+    assert curriculum.lesson_topics('Math', '11') == [('Đạo hàm', ['Định nghĩa đạo hàm'])]
+    assert curriculum.lesson_topics('chemistry', '10') == []
+
+
+def test_missing_file_is_empty(tmp_path):
+    curriculum = CurriculumStore(str(tmp_path / 'missing.json'))
+    assert curriculum.topic_hours('math', '10', 'Hàm số và đồ thị') == 2.0
+    assert curriculum.lesson_topics('math', '10') == []
+
+
+def test_shipped_curriculum_loads():
+    curriculum = CurriculumStore(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'curriculum.json'))
+    assert curriculum.topic_hours('math', '10', 'Hàm số bậc ba') == 3.0
+    assert curriculum.lesson_topics('math', '10')
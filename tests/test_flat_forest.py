@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+import flat_forest
+from flat_forest import FlatForest
+
+
+@pytest.fixture(scope='module')
+def forest():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 10, size=(400, 7))
+    y = X[:, 0] * 3 + np.sin(X[:, 3]) * 10 + rng.normal(0, 1, 400)
+    return RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+
+
+def test_predict_matches_sklearn_bit_for_bit(forest):
+    flat = FlatForest.from_estimator(forest)
+    X = np.random.default_rng(1).uniform(-2, 12, size=(1000, 7))
+
+    assert np.array_equal(flat.predict(X), forest.predict(X))
+    # Một dòng (dạng 1 chiều) như khi dự đoán cho một hồ sơ
+    assert flat.predict(X[0]).tolist() == forest.predict(X[:1]).tolist()
+    assert flat.matches(forest, 7)
+
+
+def test_predict_on_thresholds_goes_left_like_sklearn(forest):
+    flat = FlatForest.from_estimator(forest)
+    tree = forest.estimators_[0].tree_
+    internal = np.flatnonzero(tree.children_left >= 0)
+    X = np.full((len(internal), 7), 5.0)
+    X[np.arange(len(internal)), tree.feature[internal]] = tree.threshold[internal]
+
+    assert np.array_equal(flat.predict(X), forest.predict(X))
+
+
+def test_large_batches_are_split_into_blocks(forest, monkeypatch):
+    monkeypatch.setattr(flat_forest, 'BLOCK_ROWS', 64)
+    flat = FlatForest.from_estimator(forest)
+    X = np.random.default_rng(2).uniform(0, 10, size=(200, 7))
+
+    assert np.array_equal(flat.predict(X), forest.predict(X))
+
+
+def test_arrays_round_trip(forest):
+    flat = FlatForest.from_estimator(forest)
+    restored = FlatForest.from_arrays(flat.to_arrays())
+    X = np.random.default_rng(3).uniform(0, 10, size=(100, 7))
+
+    assert restored.n_trees == 20
+    assert np.array_equal(restored.predict(X), forest.predict(X))
+
+
+def test_unsupported_estimators_return_none():
+    X = np.arange(20, dtype=float).reshape(10, 2)
+    assert FlatForest.from_estimator(Ridge().fit(X, X[:, 0])) is None
+    assert FlatForest.from_estimator(RandomForestRegressor(n_estimators=2)) is None
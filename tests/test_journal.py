@@ -0,0 +1,97 @@
+import json
+import os
+
+from journal import MutationJournal
+from storage import ExcelBackend, JournaledExcelBackend
+
+
+def _open(tmp_path):
+    backend = JournaledExcelBackend(str(tmp_path))
+    backend.initialize()
+    return backend
+
+
+def _journal_lines(backend):
+    with open(backend.journal.path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_writes_go_to_journal_and_are_replayed_after_restart(tmp_path):
+    backend = _open(tmp_path)
+    backend.insert_many('grade', [['G001', 'Lớp 10'], ['G002', 'Lớp 11']])
+    backend.update('grade', 'ID_grade', 'G002', {'Name_grade': 'Lớp 11A'})
+
+    # File .xlsx chưa đổi cho tới khi gộp nhật ký
+    assert ExcelBackend(str(tmp_path)).read_all('grade') == []
+    assert len(_journal_lines(backend)) == 2
+
+    restarted = _open(tmp_path)
+    assert restarted.read_all('grade') == [
+        {'ID_grade': 'G001', 'Name_grade': 'Lớp 10'},
+        {'ID_grade': 'G002', 'Name_grade': 'Lớp 11A'},
+    ]
+
+
+def test_update_many_is_one_journal_entry(tmp_path):
+    backend = _open(tmp_path)
+    backend.insert_many('grade', [['G001', 'a'], ['G002', 'b'], ['G003', 'c']])
+    assert backend.update_many('grade', 'ID_grade', [('G001', {'Name_grade': 'x'}), ('G003', {'Name_grade': 'y'})]) == 2
+
+    entries = _journal_lines(backend)
+    assert [entry['op'] for entry in entries] == ['insert', 'update_many']
+    assert [row['Name_grade'] for row in _open(tmp_path).read_all('grade')] == ['x', 'b', 'y']
+
+
+def test_compact_folds_journal_into_workbook(tmp_path):
+    backend = _open(tmp_path)
+    backend.insert_many('grade', [['G001', 'Lớp 10'], ['G002', 'Lớp 11']])
+    backend.update_many('grade', 'ID_grade', [('G001', {'Name_grade': 'Lớp 10A'})])
+
+    assert backend.compact() == 2
+    assert backend.compact() == 0
+    assert not os.path.exists(backend.journal.path)
+    assert not os.path.exists(backend.journal.rotated_path)
+    assert ExcelBackend(str(tmp_path)).read_all('grade') == [
+        {'ID_grade': 'G001', 'Name_grade': 'Lớp 10A'},
+        {'ID_grade': 'G002', 'Name_grade': 'Lớp 11'},
+    ]
+    # Ghi tiếp sau khi gộp vẫn vào nhật ký mới
+    backend.insert('grade', ['G003', 'Lớp 12'])
+    assert [row['ID_grade'] for row in _open(tmp_path).read_all('grade')] == ['G001', 'G002', 'G003']
+
+
+def test_replay_after_interrupted_compaction_does_not_duplicate_rows(tmp_path):
+    backend = _open(tmp_path)
+    backend.insert_many('grade', [['G001', 'Lớp 10'], ['G002', 'Lớp 11']])
+    # Tiến trình dừng sau khi đã ghi file .xlsx nhưng trước khi xóa file .compacting
+    backend.journal.rotate()
+    backend._fold('grade', backend._pending)
+    backend.journal.close()
+
+    restarted = _open(tmp_path)
+    assert [row['ID_grade'] for row in restarted.read_all('grade')] == ['G001', 'G002']
+    restarted.compact()
+    assert [row['ID_grade'] for row in ExcelBackend(str(tmp_path)).read_all('grade')] == ['G001', 'G002']
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = MutationJournal(path)
+    journal.append({'op': 'insert', 'table': 'grade', 'rows': [{'ID_grade': 'G001'}]})
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "insert", "table": "gr')
+
+    assert MutationJournal(path).read_all() == [{'op': 'insert', 'table': 'grade', 'rows': [{'ID_grade': 'G001'}]}]
+
+
+def test_rotate_appends_to_unfinished_compaction(tmp_path):
+    journal = MutationJournal(str(tmp_path / 'journal.jsonl'))
+    journal.append({'n': 1})
+    journal.rotate()
+    journal.append({'n': 2})
+    # Lần gộp trước chưa xong: file .compacting phải giữ cả hai thay đổi theo thứ tự
+    journal.rotate()
+    assert journal.read_all() == [{'n': 1}, {'n': 2}]
+    journal.discard_rotated()
+    assert journal.read_all() == []
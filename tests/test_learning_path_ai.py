@@ -0,0 +1,152 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from learning_path_ai import LearningPathAI
+from storage import TABLES
+
+GRADES = [{'ID_grade': 'G01', 'Name_grade': 'Lớp 10'}]
+SUBJECTS = [{'ID_subject': 'S01', 'name_subject': 'Toán học', 'ID_grade': 'G01'}]
+
+
+def theory_row(theory_id, name, level='basic'):
+    return {'ID_theory': theory_id, 'theory_name': name, 'ID_topic': 'T01', 'ID_subject': 'S01',
+            'ID_grade': 'G01', 'level': level, 'URL': '', 'completion_time': 2}
+
+
+def make_tables(theory):
+    return {'grade': GRADES, 'subject': SUBJECTS, 'theory': theory, 'practice': [], 'topic': []}
+
+
+def reader(tables):
+    return lambda table: [{column: row.get(column) for column in TABLES[table]['columns']}
+                          for row in tables.get(table, [])]
+
+
+@pytest.fixture
+def ai(tmp_path, monkeypatch):
+    curriculum = {
+        'default_topic_hours': 2.0,
+        'subjects': {'math': {'10': [
+            {'name': 'Hàm số bậc nhất', 'hours': 1.5, 'lessons': ['Khái niệm', 'Đồ thị', 'Bài tập']},
+            {'name': 'Hàm số bậc hai', 'hours': 3.0, 'lessons': ['Parabol', 'Cực trị']}
+        ]}}
+    }
+    path = tmp_path / 'curriculum.json'
+    path.write_text(json.dumps(curriculum, ensure_ascii=False), encoding='utf-8')
+    monkeypatch.setenv('CURRICULUM_PATH', str(path))
+    monkeypatch.setenv('SUCCESS_RATE_LUT', '')
+    return LearningPathAI()
+
+
+def test_time_estimate_follows_reloaded_content(ai):
+    ai.load_content(reader(make_tables([theory_row('L01', 'Hàm số bậc nhất')])))
+    first = ai.estimate_total_time('math', '10', 'basic')
+    assert first['total_theory_time'] == 1.5
+    assert first['total_time'] == 3.8
+
+    # Dòng lý thuyết đầu tiên đổi sang chủ đề khác
+    ai.load_content(reader(make_tables([
+        theory_row('L02', 'Hàm số bậc hai'),
+        theory_row('L01', 'Hàm số bậc nhất')
+    ])))
+    second = ai.estimate_total_time('math', '10', 'basic')
+    assert second['total_theory_time'] == 3.0
+    assert second['total_practice_time'] == 4.5
+
+    # Cùng chỉ mục thì dùng lại kết quả, và kết quả trả về là bản sao
+    second['total_time'] = 0
+    assert ai.estimate_total_time('math', '10', 'basic')['total_time'] == 7.5
+
+    ai.load_content(reader(make_tables([theory_row('L03', 'Chủ đề mới')])))
+    # Chủ đề chưa có trong chương trình lấy số giờ mặc định
+    assert ai.estimate_total_time('math', '10', 'basic')['total_theory_time'] == 2.0
+
+
+def test_estimator_kind_is_checked(ai):
+    with pytest.raises(ValueError):
+        LearningPathAI(estimator='svm')
+    with pytest.raises(ValueError):
+        ai.candidate('svm')
+    assert ai.candidate('linear').estimator_kind == 'linear'
+    assert ai.estimator_kind == 'random_forest'
+
+
+PARAMS = ('math', 6.0, 8.0, 2, 2.0, 'combined', '10')
+
+
+@pytest.fixture
+def planner(ai, monkeypatch):
+    """LearningPathAI có nội dung mẫu và tỷ lệ thành công cố định (không cần mô hình đã huấn luyện)"""
+    ai.load_content(reader(dict(
+        make_tables([theory_row('L01', 'Hàm số bậc nhất')]),
+        practice=[{'ID_practice': 'P001', 'practice_name': 'Vẽ đồ thị', 'ID_topic': 'T01', 'ID_subject': 'S01',
+                   'ID_grade': 'G01', 'level': 'basic', 'ID_theory': 'L01'}],
+        topic=[{'ID_topic': 'T01', 'topic_name': 'Hàm số', 'ID_subject': 'S01', 'ID_grade': 'G01'}]
+    )))
+    calls = []
+
+    def predict_success_rate(*args):
+        calls.append(args)
+        return 72.5
+
+    monkeypatch.setattr(ai, 'ensure_model', lambda: True)
+    monkeypatch.setattr(ai, 'predict_success_rate', predict_success_rate)
+    ai.predictions = calls
+    return ai
+
+
+def joined(plan):
+    header, weeks = plan
+    return dict(header, weekly_plans=list(weeks))
+
+
+def test_streamed_weeks_match_generated_path(planner):
+    # Không có trong bộ nhớ đệm: các tuần được dựng khi đọc tới
+    streamed = joined(planner.stream_learning_path(*PARAMS, start_date=datetime.now()))
+    assert len(planner.predictions) == 1
+    # Có trong bộ nhớ đệm sau khi đã đọc hết các tuần
+    generated = planner.generate_learning_path(*PARAMS)
+    assert len(planner.predictions) == 1
+
+    assert streamed == generated
+    assert generated['total_weeks'] == 2 and len(generated['weekly_plans']) == 2
+    assert generated['weekly_plans'][1]['daily_plans'][0]['date'] == generated['weekly_plans'][1]['start_date']
+    assert generated['weekly_plans'][0]['daily_plans'][0]['theory_topics'] == ['Hàm số bậc nhất - Khái niệm']
+    assert generated['weekly_plans'][0]['daily_plans'][0]['practice_exercises'][0]['name'] == 'Vẽ đồ thị'
+
+
+def test_generated_path_matches_cached_stream(planner):
+    generated = planner.generate_learning_path(*PARAMS)
+    streamed = joined(planner.stream_learning_path(*PARAMS, start_date=datetime.now()))
+    assert len(planner.predictions) == 1
+    assert streamed == generated
+
+    # Bản trả về là bản sao: sửa nó không làm đổi khung trong bộ nhớ đệm
+    generated['weekly_plans'][0]['daily_plans'][0]['topic_details'][0]['completed'] = True
+    again = planner.generate_learning_path(*PARAMS)
+    assert again['weekly_plans'][0]['daily_plans'][0]['topic_details'][0]['completed'] is False
+
+
+def test_partial_stream_is_not_cached(planner):
+    header, weeks = planner.stream_learning_path(*PARAMS)
+    next(weeks)
+    assert planner.plan_cache.get(planner._plan_cache_key(*PARAMS)) is None
+
+    planner.generate_learning_path(*PARAMS)
+    assert len(planner.predictions) == 2
+    assert planner.plan_cache.get(planner._plan_cache_key(*PARAMS)) is not None
+
+
+def test_reload_during_stream_is_not_cached(planner):
+    header, weeks = planner.stream_learning_path(*PARAMS)
+    next(weeks)
+    planner.load_content(reader(make_tables([theory_row('L01', 'Hàm số bậc nhất')])))
+    list(weeks)
+    assert planner.plan_cache.get(planner._plan_cache_key(*PARAMS)) is None
+
+
+def test_invalid_input_returns_none(planner):
+    assert planner.stream_learning_path('biology', 6.0, 8.0, 2, 2.0, 'combined', '10') is None
+    assert planner.generate_learning_path('math', 6.0, 8.0, 2, 2.0, 'combined', '9') is None
@@ -0,0 +1,100 @@
+import copy
+
+from plan_format import PlanCompactor, compact_learning_path
+
+VIDEO = {'type': 'video', 'title': 'Hàm số bậc nhất', 'url': 'https://example.com/v1'}
+BOOK = {'type': 'book', 'title': 'SGK Toán 10', 'url': ''}
+EXERCISE = {'name': 'Bài 1', 'description': 'Vẽ đồ thị', 'difficulty': 'basic'}
+HARD = {'name': 'Bài 2', 'description': 'Biện luận', 'difficulty': 'advanced'}
+
+
+def make_learning_path():
+    shared = [VIDEO, BOOK]
+    weekly_plans = []
+    for week in range(1, 3):
+        daily_plans = []
+        for day in range(3):
+            daily_plans.append({
+                'date': f'2024-05-{(week - 1) * 3 + day + 1:02d}',
+                'theory_topics': ['Hàm số'],
+                # Tuần 1 dùng chung đối tượng, tuần 2 là bản sao cùng nội dung
+                'learning_resources': shared if week == 1 else copy.deepcopy(shared),
+                'practice_exercises': [dict(EXERCISE)] + ([dict(HARD)] if day == 2 else [])
+            })
+        weekly_plans.append({'week_number': week, 'daily_plans': daily_plans})
+    return {'subject': 'Toán', 'weekly_plans': weekly_plans}
+
+
+def expand(compact):
+    """Đổi ID trong dạng gọn về lại mục đầy đủ"""
+    return [
+        [
+            ([compact['resources'][i] for i in day['learning_resources']],
+             [compact['exercises'][i] for i in day['practice_exercises']])
+            for day in week['daily_plans']
+        ]
+        for week in compact['weekly_plans']
+    ]
+
+
+def test_compaction_dedups_by_content():
+    compact = compact_learning_path(make_learning_path())
+
+    assert compact['resources'] == {'r0': VIDEO, 'r1': BOOK}
+    assert compact['exercises'] == {'e0': EXERCISE, 'e1': HARD}
+    day = compact['weekly_plans'][1]['daily_plans'][2]
+    assert day['learning_resources'] == ['r0', 'r1']
+    assert day['practice_exercises'] == ['e0', 'e1']
+    assert day['theory_topics'] == ['Hàm số']
+    assert compact['subject'] == 'Toán'
+
+
+def test_ids_resolve_to_original_items():
+    learning_path = make_learning_path()
+    original = copy.deepcopy(learning_path)
+    compact = compact_learning_path(learning_path)
+
+    assert expand(compact) == [
+        [(day['learning_resources'], day['practice_exercises']) for day in week['daily_plans']]
+        for week in original['weekly_plans']
+    ]
+    # Lộ trình đầy đủ không bị thay đổi
+    assert learning_path == original
+
+
+def test_take_new_reports_each_item_once():
+    compactor = PlanCompactor()
+    weeks = make_learning_path()['weekly_plans']
+
+    compactor.compact_week(weeks[0])
+    resources, exercises = compactor.take_new()
+    assert resources == {'r0': VIDEO, 'r1': BOOK}
+    assert exercises == {'e0': EXERCISE, 'e1': HARD}
+
+    compactor.compact_week(weeks[1])
+    assert compactor.take_new() == ({}, {})
+
+
+def test_unhashable_items_and_missing_lists():
+    compactor = PlanCompactor()
+    item = {'name': 'Bài 3', 'tags': ['đồ thị']}
+    week = compactor.compact_week({'daily_plans': [
+        {'practice_exercises': [item, {'name': 'Bài 3', 'tags': ['đồ thị']}]},
+        {'learning_resources': None}
+    ]})
+
+    assert week['daily_plans'][0]['practice_exercises'] == ['e0', 'e0']
+    assert week['daily_plans'][1]['learning_resources'] == []
+    assert week['daily_plans'][1]['practice_exercises'] == []
+
+
+def test_equal_items_share_an_id_whatever_their_values():
+    compactor = PlanCompactor()
+    ids = compactor.exercises.ids([
+        {'name': 'Bài 4', 'tags': ['hàm số'], 'meta': {'page': 12}},
+        {'meta': {'page': 12}, 'tags': ['hàm số'], 'name': 'Bài 4'},
+        {'name': 'Bài 4', 'tags': ['hàm số'], 'meta': {'page': 13}},
+        {'name': 'Bài 4'},
+        {'name': 'Bài 4'}
+    ])
+    assert ids == ['e0', 'e0', 'e1', 'e2', 'e2']
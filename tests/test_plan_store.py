@@ -0,0 +1,145 @@
+import pytest
+
+from plan_store import PlanStore
+from storage import SQLiteBackend
+
+
+def make_learning_path(weeks=2, subject='math'):
+    weekly_plans = []
+    for week in range(1, weeks + 1):
+        daily_plans = []
+        for day in range(7):
+            daily_plans.append({
+                'date': f'2024-05-{(week - 1) * 7 + day + 1:02d}',
+                'theory_topics': [f'Chủ đề {week}.{day}'],
+                'practice_exercises': [{'name': 'Bài 1', 'description': '', 'difficulty': 'basic'}],
+                'theory_hours': 1.0,
+                'practice_hours': 1.0,
+                'learning_resources': [],
+                'topic_details': [{'topic': 'Hàm số', 'lesson': 'Bài 1', 'estimated_hours': 1.0, 'completed': False}]
+            })
+        weekly_plans.append({
+            'week_number': week,
+            'start_date': daily_plans[0]['date'],
+            'end_date': daily_plans[-1]['date'],
+            'level': 'basic',
+            'predicted_success_rate': 72.5,
+            'daily_plans': daily_plans
+        })
+    return {
+        'subject': subject,
+        'grade': '10',
+        'level': 'basic',
+        'predicted_success_rate': 72.5,
+        'total_weeks': weeks,
+        'daily_study_hours': 2.0,
+        'learning_style': 'combined',
+        'weekly_plans': weekly_plans
+    }
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'app.db'))
+    backend.initialize()
+    return backend
+
+
+def test_save_and_load_round_trip(backend):
+    store = PlanStore(backend)
+    learning_path = make_learning_path()
+    path = store.save('SV001', learning_path, 6.0, 8.0)
+
+    assert path['path_id'] == 'LP000001'
+    assert path['start_date'] == '2024-05-01' and path['end_date'] == '2024-05-14'
+    assert backend.count('daily_plans') == 14
+
+    # Một PlanStore mới chỉ đọc từ backend
+    loaded = PlanStore(backend).load_learning_path('LP000001')
+    assert loaded['total_weeks'] == 2
+    assert loaded['predicted_success_rate'] == 72.5
+    week = loaded['weekly_plans'][1]
+    assert week['week_number'] == 2 and week['end_date'] == '2024-05-14'
+    day = week['daily_plans'][0]
+    original = learning_path['weekly_plans'][1]['daily_plans'][0]
+    assert day['plan_id'] == 'LP000001-002-1'
+    assert day['theory_topics'] == original['theory_topics']
+    assert day['practice_exercises'] == original['practice_exercises']
+    assert day['completed'] is False
+
+
+def test_ids_and_user_index(backend):
+    store = PlanStore(backend)
+    store.save('SV001', make_learning_path(1), 6.0, 8.0)
+    reserved = store.new_path_id()
+    store.save('SV002', make_learning_path(1), 5.0, 7.0)
+    store.save('SV001', make_learning_path(1, 'physics'), 6.0, 8.0, path_id=reserved)
+
+    assert reserved == 'LP000002'
+    assert [p['path_id'] for p in store.paths_for_user('SV001')] == ['LP000001', 'LP000002']
+    assert [p['path_id'] for p in store.paths_for_user('SV002')] == ['LP000003']
+    # Đọc lại từ backend thì mã tiếp theo không trùng
+    assert PlanStore(backend).new_path_id() == 'LP000004'
+    assert store.get_path('LP999999') is None
+
+
+def test_with_ids_stamps_every_day(backend):
+    store = PlanStore(backend)
+    week = make_learning_path(1)['weekly_plans'][0]
+    stamped = store.with_ids('LP000007', week)
+
+    assert [day['plan_id'] for day in stamped['daily_plans']] == [f'LP000007-001-{n}' for n in range(1, 8)]
+    assert 'plan_id' not in week['daily_plans'][0]
+
+
+def test_find_day_by_id_or_date(backend):
+    store = PlanStore(backend)
+    store.save('SV001', make_learning_path(), 6.0, 8.0)
+
+    assert store.find_day('LP000001-002-3')['date'] == '2024-05-10'
+    assert store.find_day('LP000001', '2024-05-10')['plan_id'] == 'LP000001-002-3'
+    assert store.find_day('LP000001') is None
+    assert store.find_day('LP000001', '2030-01-01') is None
+    assert store.find_day('LP000404-001-1') is None
+    assert store.get_day('LP000001-001-1')['topic_details'][0]['topic'] == 'Hàm số'
+
+
+def test_cached_days_are_bounded(backend):
+    store = PlanStore(backend, max_cached_paths=2)
+    for _ in range(4):
+        store.save('SV001', make_learning_path(1), 6.0, 8.0)
+    assert list(store._days) == ['LP000003', 'LP000004']
+
+    store.find_day('LP000001-001-1')
+    assert list(store._days) == ['LP000004', 'LP000001']
+    assert len(store.daily_plans('LP000002')) == 7
+    assert list(store._days) == ['LP000001', 'LP000002']
+
+
+def test_unwritten_completion_survives_eviction(backend):
+    store = PlanStore(backend, max_cached_paths=1)
+    store.save('SV001', make_learning_path(1), 6.0, 8.0)
+    store.save('SV001', make_learning_path(1), 6.0, 8.0)
+
+    store.mark_completed({'LP000001-001-1': True})
+    # LP000001 bị đẩy khỏi bộ nhớ trước khi thay đổi được ghi xuống backend
+    store.find_day('LP000002-001-1')
+    assert 'LP000001' not in store._days
+    assert store.get_day('LP000001-001-1')['completed'] is True
+
+    assert store.write_completed({'LP000001-001-1': True}) == 1
+    assert store._unwritten == {}
+    assert PlanStore(backend).get_day('LP000001-001-1')['completed'] is True
+
+
+def test_save_after_invalidate(backend):
+    store = PlanStore(backend)
+    store.save('SV001', make_learning_path(1), 6.0, 8.0)
+    reserved = store.new_path_id()
+    store.invalidate()
+
+    path = store.save('SV001', make_learning_path(1), 6.0, 8.0, path_id=reserved)
+    assert path['path_id'] == 'LP000002'
+    assert [p['path_id'] for p in store.paths_for_user('SV001')] == ['LP000001', 'LP000002']
+    assert store.get_day('LP000002-001-7') is not None
+    assert store.new_path_id() == 'LP000003'
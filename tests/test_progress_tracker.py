@@ -0,0 +1,114 @@
+import pytest
+
+from plan_store import PlanStore, ProgressTracker
+from storage import SQLiteBackend
+from test_plan_store import make_learning_path
+
+
+class CountingBackend(SQLiteBackend):
+    """Đếm số lần update_many, có thể cho lần ghi tiếp theo thất bại"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.update_calls = 0
+        self.fail_next = False
+
+    def update_many(self, *args, **kwargs):
+        self.update_calls += 1
+        if self.fail_next:
+            self.fail_next = False
+            raise IOError('đĩa đầy')
+        return super().update_many(*args, **kwargs)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = CountingBackend(str(tmp_path / 'app.db'))
+    backend.initialize()
+    return backend
+
+
+@pytest.fixture
+def plans(backend):
+    store = PlanStore(backend)
+    store.save('SV001', make_learning_path(), 6.0, 8.0)
+    return store
+
+
+def completed_in_backend(backend):
+    return {row['plan_id']: row['completed'] for row in backend.read_all('daily_plans') if row['completed']}
+
+
+def test_events_coalesce_into_one_write(backend, plans):
+    tracker = ProgressTracker(plans)
+    accepted, errors = tracker.record([
+        {'plan_id': 'LP000001-001-1', 'completed': True},
+        {'plan_id': 'LP000001', 'date': '2024-05-02'},
+        {'plan_id': 'LP000001-001-1', 'completed': False},
+        {'plan_id': 'LP000001-001-3', 'completed': True}
+    ])
+    assert (accepted, errors) == (4, [])
+    assert len(tracker) == 3
+    # Có hiệu lực ngay khi đọc, trước khi ghi xuống backend
+    assert plans.get_day('LP000001-001-2')['completed'] is True
+    assert plans.get_day('LP000001-001-1')['completed'] is False
+    assert backend.update_calls == 0
+
+    assert tracker.flush() == 3
+    assert backend.update_calls == 1
+    assert tracker.flush() == 0
+    assert backend.update_calls == 1
+    assert set(completed_in_backend(backend)) == {'LP000001-001-2', 'LP000001-001-3'}
+    assert tracker.stats()['written'] == 3 and tracker.stats()['flushes'] == 1
+
+
+def test_max_pending_triggers_flush(backend, plans):
+    tracker = ProgressTracker(plans, max_pending=2)
+    tracker.record([{'plan_id': 'LP000001-001-1'}])
+    assert backend.update_calls == 0
+
+    tracker.record([{'plan_id': 'LP000001-001-2'}])
+    assert backend.update_calls == 1
+    assert len(tracker) == 0
+    assert set(completed_in_backend(backend)) == {'LP000001-001-1', 'LP000001-001-2'}
+
+
+@pytest.mark.parametrize('completed', ['false', 'true', 0, 1, None, [True]])
+def test_non_boolean_completed_is_rejected(plans, completed):
+    tracker = ProgressTracker(plans)
+    accepted, errors = tracker.record([{'plan_id': 'LP000001-001-1', 'completed': completed}])
+    assert accepted == 0
+    assert errors[0]['index'] == 0
+    assert len(tracker) == 0
+    assert plans.get_day('LP000001-001-1')['completed'] is False
+
+
+def test_invalid_events_are_reported_by_index(plans):
+    tracker = ProgressTracker(plans)
+    accepted, errors = tracker.record([
+        'LP000001-001-1',
+        {'plan_id': 'LP000404-001-1'},
+        {'completed': True},
+        {'plan_id': 'LP000001-002-7', 'completed': True}
+    ])
+    assert accepted == 1
+    assert [error['index'] for error in errors] == [0, 1, 2]
+
+
+def test_failed_write_is_requeued(backend, plans):
+    tracker = ProgressTracker(plans)
+    tracker.record([
+        {'plan_id': 'LP000001-001-1', 'completed': True},
+        {'plan_id': 'LP000001-001-2', 'completed': True}
+    ])
+    backend.fail_next = True
+    with pytest.raises(IOError):
+        tracker.flush()
+    assert len(tracker) == 2
+    assert completed_in_backend(backend) == {}
+
+    # Sự kiện mới hơn đến sau lần ghi lỗi được ưu tiên
+    tracker.record([{'plan_id': 'LP000001-001-2', 'completed': False}])
+    assert tracker.flush() == 2
+    assert set(completed_in_backend(backend)) == {'LP000001-001-1'}
+    assert PlanStore(backend).get_day('LP000001-001-2')['completed'] is False
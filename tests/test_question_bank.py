@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from question_bank import QuestionBank
+
+
+def question(qid, grade='10', topic='Hàm số', level='basic', answer=0, subject='Toán'):
+    return {
+        'id': qid, 'subject': subject, 'grade': grade, 'topic': topic, 'level': level,
+        'question': f'Câu hỏi {qid}', 'choices': ['A', 'B', 'C', 'D'], 'answer': answer
+    }
+
+
+@pytest.fixture
+def bank(tmp_path):
+    questions = (
+        [question(f'F{i}', answer=i % 4) for i in range(3)]
+        + [question(f'FA{i}', level='advanced') for i in range(2)]
+        + [question(f'G{i}', topic='Lượng giác') for i in range(4)]
+        + [question(f'H{i}', grade='11', topic='Đạo hàm') for i in range(3)]
+        + [question('P0', subject='Vật lý', topic='Động học')]
+    )
+    path = tmp_path / 'question_bank.json'
+    path.write_text(json.dumps({'questions': questions}, ensure_ascii=False), encoding='utf-8')
+    return QuestionBank(str(path))
+
+
+def test_sample_omits_answers(bank):
+    questions = bank.sample('Toán', '10', ['Hàm số'], 'basic', count=3, seed=1)
+    assert len(questions) == 3
+    assert all('answer' not in q for q in questions)
+    assert {q['id'] for q in questions} == {'F0', 'F1', 'F2'}
+
+
+def test_sample_is_deterministic_for_a_seed(bank):
+    first = bank.sample('toán', 10, ['Hàm số'], count=6, seed='SV001-2024-05-01')
+    again = bank.sample('toán', 10, ['Hàm số'], count=6, seed='SV001-2024-05-01')
+    assert [q['id'] for q in first] == [q['id'] for q in again]
+
+
+def test_sample_falls_back_through_tiers(bank):
+    ids = [q['id'] for q in bank.sample('Toán', '10', ['Hàm số'], 'basic', count=8, seed=3)]
+    assert len(ids) == len(set(ids)) == 8
+    # Đúng chủ đề và cấp độ trước, rồi cùng chủ đề, rồi cùng lớp và cấp độ
+    assert set(ids[:3]) == {'F0', 'F1', 'F2'}
+    assert set(ids[3:5]) == {'FA0', 'FA1'}
+    assert all(qid.startswith('G') for qid in ids[5:])
+
+    everything = bank.sample('Toán', count=100, seed=3)
+    assert len(everything) == 12
+    assert bank.sample('Vật lý', '10', ['Không có'], count=5) == [
+        {k: v for k, v in question('P0', subject='Vật lý', topic='Động học').items() if k != 'answer'}
+    ]
+    assert bank.sample('Hóa học', count=5) == []
+
+
+@pytest.mark.parametrize('count', [0, -3])
+def test_sample_non_positive_count(bank, count):
+    assert bank.sample('Toán', '10', ['Hàm số'], count=count) == []
+
+
+def test_score_many_submissions(bank):
+    results = bank.score([
+        {'F0': 0, 'F1': 1, 'F2': 0},
+        {'F1': '1', 'G0': 'x', 'H0': None, 'Q404': 2},
+        {}
+    ])
+
+    assert results[0]['score'] == 2 and results[0]['total'] == 3
+    assert results[0]['percentage'] == 66.7
+    assert results[0]['results'] == {'F0': True, 'F1': True, 'F2': False}
+    assert results[0]['unknown'] == []
+
+    # Lựa chọn không phải số bị chấm sai; mã câu hỏi lạ không tính vào tổng
+    assert results[1]['score'] == 1 and results[1]['total'] == 3
+    assert results[1]['results'] == {'F1': True, 'G0': False, 'H0': False}
+    assert results[1]['unknown'] == ['Q404']
+
+    assert results[2] == {'score': 0, 'total': 0, 'percentage': 0.0, 'results': {}, 'unknown': []}
+
+
+def test_score_out_of_range_choices(bank):
+    results = bank.score([{'F0': float('inf'), 'F1': float('-inf'), 'F2': 10 ** 30, 'G0': -10 ** 30, 'G1': 2}])
+    assert results[0]['total'] == 5
+    assert results[0]['score'] == 0
+    assert not any(results[0]['results'].values())
+
+
+def test_missing_bank_file_is_empty(tmp_path):
+    bank = QuestionBank(str(tmp_path / 'missing.json'))
+    assert len(bank) == 0
+    assert bank.sample('Toán', count=3) == []
+    assert bank.score([{'F0': 0}])[0]['unknown'] == ['F0']
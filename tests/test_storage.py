@@ -0,0 +1,131 @@
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from storage import TABLES, ExcelBackend, JournaledExcelBackend, SQLiteBackend, import_from_excel
+
+
+def _excel(tmp_path):
+    return ExcelBackend(str(tmp_path))
+
+
+def _journaled(tmp_path):
+    return JournaledExcelBackend(str(tmp_path))
+
+
+def _sqlite(tmp_path):
+    return SQLiteBackend(str(tmp_path / 'app.db'))
+
+
+@pytest.fixture(params=[_excel, _journaled, _sqlite], ids=['excel', 'journaled', 'sqlite'])
+def backend(request, tmp_path):
+    backend = request.param(tmp_path)
+    backend.initialize()
+    return backend
+
+
+def _user(number, email=None):
+    return {
+        'student_id': f'SV{number:03d}',
+        'full_name': f'Học sinh {number}',
+        'email': email or f'hs{number}@example.com',
+        'password': 'secret',
+        'dob': '2008-01-01',
+        'join_date': '2024-01-01',
+        'image_url': None
+    }
+
+
+def test_insert_and_read_back(backend):
+    backend.insert('users', _user(1))
+    backend.insert_many('users', [_user(2), _user(3)])
+
+    rows = backend.read_all('users')
+    assert [row['student_id'] for row in rows] == ['SV001', 'SV002', 'SV003']
+    assert rows[0] == _user(1)
+    assert backend.count('users') == 3
+    assert backend.get('users', 'SV002')['email'] == 'hs2@example.com'
+    assert backend.get('users', 'SV999') is None
+    assert [row['student_id'] for row in backend.find('users', 'email', 'hs3@example.com')] == ['SV003']
+
+
+def test_row_as_list_follows_column_order(backend):
+    backend.insert('grade', ['G001', 'Lớp 10'])
+    assert backend.read_all('grade') == [{'ID_grade': 'G001', 'Name_grade': 'Lớp 10'}]
+
+
+def test_update_and_update_many(backend):
+    backend.insert_many('users', [_user(1), _user(2), _user(3)])
+
+    assert backend.update('users', 'email', 'hs1@example.com', {'full_name': 'Mới'}) == 1
+    assert backend.update('users', 'email', 'nobody@example.com', {'full_name': 'X'}) == 0
+    assert backend.update_many('users', 'student_id', [
+        ('SV002', {'password': 'a'}),
+        ('SV003', {'password': 'b', 'image_url': '/avatars/x.png'}),
+        ('SV404', {'password': 'c'}),
+    ]) == 2
+    # Cập nhật sau cho cùng dòng ghi đè cập nhật trước
+    backend.update_many('users', 'student_id', [('SV002', {'password': 'y'}), ('SV002', {'password': 'z'})])
+
+    rows = {row['student_id']: row for row in backend.read_all('users')}
+    assert rows['SV001']['full_name'] == 'Mới'
+    assert rows['SV002']['password'] == 'z'
+    assert rows['SV003']['password'] == 'b'
+    assert rows['SV003']['image_url'] == '/avatars/x.png'
+
+
+def test_replace_all(backend):
+    backend.insert_many('grade', [['G001', 'Lớp 10'], ['G002', 'Lớp 11']])
+    backend.replace_all('grade', [['G009', 'Lớp 12']])
+    assert backend.read_all('grade') == [{'ID_grade': 'G009', 'Name_grade': 'Lớp 12'}]
+
+
+def test_initialize_extends_old_excel_header(tmp_path):
+    # File tạo trước khi learning_path có thêm các cột grade, level, created_at
+    old_columns = TABLES['learning_path']['columns'][:12]
+    wb = Workbook()
+    wb.active.append(old_columns)
+    wb.active.append(['LP000001', 'SV001', 'math'] + [None] * 9)
+    wb.save(tmp_path / TABLES['learning_path']['file'])
+
+    backend = ExcelBackend(str(tmp_path))
+    backend.initialize()
+
+    header = [cell.value for cell in load_workbook(tmp_path / TABLES['learning_path']['file']).active[1]]
+    assert header == TABLES['learning_path']['columns']
+    row = backend.read_all('learning_path')[0]
+    assert row['path_id'] == 'LP000001'
+    assert row['grade'] is None
+
+
+def test_sqlite_initialize_adds_missing_columns(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / 'app.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE "daily_plans" ("plan_id" PRIMARY KEY, "path_id", "date")')
+    conn.commit()
+    conn.close()
+
+    backend = SQLiteBackend(path)
+    backend.initialize()
+    backend.insert('daily_plans', {'plan_id': 'LP000001-001-1', 'path_id': 'LP000001', 'week_number': 1})
+    assert backend.get('daily_plans', 'LP000001-001-1')['week_number'] == 1
+
+
+def test_import_from_excel_skips_missing_workbooks(tmp_path):
+    source = tmp_path / 'xlsx'
+    source.mkdir()
+    ExcelBackend(str(source))._new_workbook('grade').save(source / TABLES['grade']['file'])
+    wb = load_workbook(source / TABLES['grade']['file'])
+    wb.active.append(['G001', 'Lớp 10'])
+    wb.save(source / TABLES['grade']['file'])
+
+    target = _sqlite(tmp_path)
+    target.initialize()
+    target.insert('users', _user(1))
+
+    counts = import_from_excel(target, str(source))
+
+    assert counts == {'grade': 1}
+    # Bảng không có file nguồn giữ nguyên dữ liệu
+    assert target.count('users') == 1
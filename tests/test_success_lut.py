@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+
+from success_lut import SuccessRateLUT
+
+FEATURES = ['subject', 'current_score', 'duration_weeks']
+CATEGORY_SIZES = {'subject': 2}
+AXES = {'current_score': (0.0, 10.0, 1.0), 'duration_weeks': (1.0, 12.0, 1.0)}
+
+
+def linear(X):
+    X = np.asarray(X, dtype=np.float64)
+    return 10 * X[:, 0] + 3 * X[:, 1] - 0.5 * X[:, 2]
+
+
+def curved(X):
+    X = np.asarray(X, dtype=np.float64)
+    return X[:, 0] + X[:, 1] ** 2 + np.sqrt(np.abs(X[:, 2]))
+
+
+def _build(tmp_path, predict, **kwargs):
+    return SuccessRateLUT.build(predict, FEATURES, CATEGORY_SIZES, 'model-1', str(tmp_path / 'lut.npy'),
+                                AXES, check_samples=2000, **kwargs)
+
+
+def test_linear_model_is_reproduced_inside_the_grid(tmp_path):
+    lut = _build(tmp_path, linear)
+    X = np.array([[0, 2.5, 3.3], [1, 9.9, 11.5], [1, 0.0, 1.0], [0, 10.0, 12.0]])
+
+    assert lut.metadata['shape'] == [2, 11, 12]
+    assert lut.metadata['max_abs_error'] < 1e-4
+    np.testing.assert_allclose(lut.predict(X), linear(X), atol=1e-4)
+
+
+def test_error_check_includes_edge_and_off_grid_points(tmp_path):
+    lut = _build(tmp_path, curved)
+    metadata = json.loads((tmp_path / 'lut.json').read_text(encoding='utf-8'))
+
+    assert metadata['check_samples'] == 2000
+    assert metadata['edge_samples'] > 0 and metadata['off_grid_samples'] > 0
+    # Nội suy tuyến tính của x^2 sai tối đa step^2 / 4 giữa các điểm lưới, sqrt thêm một chút
+    assert 0 < metadata['max_abs_error'] <= 0.3
+    assert metadata['max_abs_error'] == lut.metadata['max_abs_error']
+
+
+def test_out_of_grid_rows_use_fallback(tmp_path):
+    lut = _build(tmp_path, linear)
+    X = np.array([[0, 5.0, 40.0], [1, 5.0, 6.0], [0, -1.0, 6.0]])
+    inside = lut.in_grid(X)
+
+    assert inside.tolist() == [False, True, False]
+    np.testing.assert_allclose(lut.predict(X, fallback=linear), linear(X), atol=1e-4)
+    # Không có fallback: giá trị ở biên lưới (40 tuần tra như 12 tuần)
+    clamped = lut.predict(X)
+    assert clamped[0] == pytest.approx(linear(np.array([[0, 5.0, 12.0]]))[0], abs=1e-4)
+    # Một dòng đi đường tra riêng nhưng cũng dùng fallback
+    assert lut.predict(X[0], fallback=linear)[0] == pytest.approx(linear(X[:1])[0])
+
+
+def test_single_row_matches_batch(tmp_path):
+    lut = _build(tmp_path, curved)
+    X = np.column_stack([
+        np.random.default_rng(0).integers(0, 2, 50),
+        np.random.default_rng(1).uniform(0, 10, 50),
+        np.random.default_rng(2).uniform(1, 12, 50),
+    ])
+
+    batch = lut.predict(X)
+    assert [lut.predict(row)[0] for row in X] == pytest.approx(batch.tolist(), abs=1e-9)
+
+
+def test_load_round_trip(tmp_path):
+    built = _build(tmp_path, curved)
+    loaded = SuccessRateLUT.load(str(tmp_path / 'lut.npy'))
+    X = np.array([[1, 3.7, 4.2], [0, 0.5, 11.9]])
+
+    assert loaded.model_id == 'model-1'
+    assert isinstance(loaded.table, np.memmap)
+    np.testing.assert_array_equal(loaded.predict(X), built.predict(X))
+
+
+def test_axis_needs_two_points(tmp_path):
+    with pytest.raises(ValueError):
+        SuccessRateLUT.build(linear, FEATURES, CATEGORY_SIZES, 'model-1', str(tmp_path / 'lut.npy'),
+                             {'current_score': (0.0, 0.5, 1.0)})
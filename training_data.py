@@ -0,0 +1,129 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Các cột dùng để huấn luyện (7 đặc trưng và nhãn), chỉ các cột này được đọc từ file
+TRAINING_COLUMNS = [
+    'subject', 'grade', 'current_score', 'target_score',
+    'duration_weeks', 'daily_study_hours', 'learning_style', 'success_rate'
+]
+CATEGORICAL_COLUMNS = ['subject', 'grade', 'learning_style']
+NUMERIC_DTYPES = {
+    'current_score': 'float64',
+    'target_score': 'float64',
+    'duration_weeks': 'float64',
+    'daily_study_hours': 'float64',
+    'success_rate': 'float64'
+}
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+def data_format(path):
+    """Định dạng file dữ liệu theo đuôi: 'parquet', 'feather' hoặc 'csv'"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.parquet', '.pq'):
+        return 'parquet'
+    if ext in ('.feather', '.arrow'):
+        return 'feather'
+    return 'csv'
+
+
+def _check_columns(columns, path):
+    missing = [col for col in TRAINING_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"Thiếu các cột: {', '.join(missing)} ({path})")
+
+
+def _normalise(df):
+    """Ép kiểu: số thực cho các cột số, category cho các cột phân loại (lớp là số nguyên)"""
+    df = df[TRAINING_COLUMNS].astype(NUMERIC_DTYPES)
+    # File Parquet do generate_training_data tạo lưu lớp dạng chuỗi '10'; mô hình dùng số 10
+    if not pd.api.types.is_integer_dtype(df['grade']):
+        df['grade'] = pd.to_numeric(df['grade'].astype(str)).astype('int64')
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def count_rows(path):
+    """Số dòng dữ liệu của file (Parquet đọc từ metadata, CSV đếm ký tự xuống dòng)"""
+    fmt = data_format(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    if fmt == 'feather':
+        import pyarrow.feather as feather
+        return feather.read_table(path, memory_map=True).num_rows
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(0, lines - 1)
+
+
+def iter_training_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Đọc file dữ liệu huấn luyện theo từng khối DataFrame đã ép kiểu"""
+    fmt = data_format(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        _check_columns(parquet_file.schema_arrow.names, path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=TRAINING_COLUMNS):
+            yield _normalise(batch.to_pandas())
+    elif fmt == 'feather':
+        # Feather được ánh xạ bộ nhớ: chỉ chuyển sang pandas từng khối của các cột cần thiết
+        import pyarrow.feather as feather
+        table = feather.read_table(path, memory_map=True)
+        _check_columns(table.column_names, path)
+        table = table.select(TRAINING_COLUMNS)
+        for start in range(0, table.num_rows, chunk_size):
+            yield _normalise(table.slice(start, chunk_size).to_pandas())
+    else:
+        _check_columns(pd.read_csv(path, nrows=0).columns, path)
+        reader = pd.read_csv(
+            path, usecols=TRAINING_COLUMNS, chunksize=chunk_size,
+            dtype={**NUMERIC_DTYPES, 'subject': 'category', 'learning_style': 'category'}
+        )
+        for chunk in reader:
+            yield _normalise(chunk)
+
+
+def load_training_data(path, sample_frac=None, max_rows=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=42):
+    """Đọc dữ liệu huấn luyện (CSV, Parquet hoặc Feather), chỉ các cột TRAINING_COLUMNS.
+
+    File được đọc theo khối; sample_frac giữ lại ngẫu nhiên một phần mỗi khối và max_rows
+    giới hạn tổng số dòng (lấy mẫu đều trên cả file, không chỉ các dòng đầu), nên dữ liệu lớn
+    hơn bộ nhớ vẫn huấn luyện được. Các cột subject, grade, learning_style có kiểu category.
+    """
+    if max_rows is not None:
+        total = count_rows(path)
+        if total > max_rows:
+            sample_frac = min(sample_frac or 1.0, max_rows / total)
+    rng = np.random.default_rng(seed)
+
+    parts = []
+    for chunk in iter_training_chunks(path, chunk_size):
+        if sample_frac is not None and sample_frac < 1.0:
+            chunk = chunk[rng.random(len(chunk)) < sample_frac]
+        parts.append(chunk)
+    if not parts:
+        raise ValueError(f"File dữ liệu huấn luyện rỗng: {path}")
+
+    # Các khối có thể có tập giá trị category khác nhau: ghép rồi ép kiểu lại
+    df = pd.concat(parts, ignore_index=True)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category').cat.remove_unused_categories()
+    if max_rows is not None and len(df) > max_rows:
+        df = df.iloc[:max_rows].copy()
+        for col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
@@ -0,0 +1,85 @@
+import threading
+from datetime import datetime
+
+
+class UserDirectory:
+    """Danh bạ người dùng trong bộ nhớ.
+
+    Nạp bảng users từ backend ở lần dùng đầu tiên, giữ chỉ mục email -> dòng
+    và bộ đếm mã học sinh tăng dần, nên đăng nhập/đăng ký không phải quét lại
+    toàn bộ danh sách. Mọi thay đổi được ghi xuống backend trước rồi mới cập nhật chỉ mục.
+    """
+
+    STUDENT_ID_PREFIX = 'HS'
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.RLock()
+        self._by_email = None
+        self._last_number = 0
+
+    def _ensure_loaded(self):
+        if self._by_email is None:
+            with self._lock:
+                if self._by_email is None:
+                    by_email = {}
+                    last_number = 0
+                    for user in self.backend.read_all('users'):
+                        by_email.setdefault(user['email'], user)
+                        last_number = max(last_number, self._student_number(user['student_id']))
+                    self._last_number = last_number
+                    self._by_email = by_email
+        return self._by_email
+
+    def _student_number(self, student_id):
+        try:
+            return int(str(student_id)[len(self.STUDENT_ID_PREFIX):])
+        except (TypeError, ValueError):
+            return 0
+
+    def get_by_email(self, email):
+        """Lấy thông tin người dùng theo email (bản sao), None nếu không có"""
+        user = self._ensure_loaded().get(email)
+        return dict(user) if user else None
+
+    def exists(self, email):
+        return email in self._ensure_loaded()
+
+    def add_user(self, name, dob, email, password):
+        """Thêm người dùng mới, trả về dòng vừa thêm. Báo ValueError nếu email đã tồn tại"""
+        self._ensure_loaded()
+        with self._lock:
+            if email in self._by_email:
+                raise ValueError("Email đã tồn tại.")
+            number = self._last_number + 1
+            user = {
+                'student_id': f'{self.STUDENT_ID_PREFIX}{number:04d}',
+                'full_name': name,
+                'email': email,
+                'password': password,
+                'dob': dob,
+                'join_date': datetime.now().strftime('%Y-%m-%d'),
+                'image_url': None
+            }
+            self.backend.insert('users', user)
+            self._last_number = number
+            self._by_email[email] = user
+            return dict(user)
+
+    def update_user(self, email, changes):
+        """Cập nhật các cột của người dùng, trả về dòng sau cập nhật hoặc None nếu không có"""
+        self._ensure_loaded()
+        with self._lock:
+            user = self._by_email.get(email)
+            if user is None:
+                return None
+            self.backend.update('users', 'email', email, changes)
+            # Thay bằng dict mới để người đọc đồng thời không thấy dòng cập nhật dở
+            user = dict(user, **changes)
+            self._by_email[email] = user
+            return dict(user)
+
+    def invalidate(self):
+        """Bỏ chỉ mục để lần dùng sau nạp lại từ backend"""
+        with self._lock:
+            self._by_email = None